@@ -0,0 +1,202 @@
+"""
+Circuit breaker around MongoDB.
+
+BreakerCommandListener feeds the outcome and latency of every command issued
+while serving a request (PyMongo command monitoring) into a CircuitBreaker. Too many connection failures or slow
+commands within the window trip it open; while open, server.py's middleware
+fails writes fast with 503 and answers public reads from LastKnownGoodCache
+instead of waiting out the driver's server-selection timeout. A background
+probe pings MongoDB and moves the breaker to half-open, where a few successful
+commands close it again (any failure re-opens it).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Set by server.py's middleware for the duration of a request. Motor runs
+# commands with a copy of the caller's context, so the listener sees it on the
+# driver thread; background work (change stream getMores that wait for events,
+# counter reconciliation, migrations) is slow by design and never counted.
+in_request: ContextVar[bool] = ContextVar("mongo_breaker_in_request", default=False)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_threshold: int = 10,
+        latency_threshold_ms: float = 2000,
+        window_seconds: float = 30,
+        open_seconds: float = 10,
+        half_open_successes: int = 3,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.latency_threshold_ms = latency_threshold_ms
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_successes = half_open_successes
+
+        # Listener callbacks arrive on driver threads
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_trip_reason: Optional[str] = None
+        self._failures: deque = deque()
+        self._slow_calls: deque = deque()
+        self._half_open_ok = 0
+        self.transitions: Dict[str, int] = {}
+        self.rejected = 0
+
+    def _transition(self, state: str, reason: Optional[str] = None):
+        logger.warning(f"⚡ MongoDB circuit {self.state} -> {state}" + (f" ({reason})" if reason else ""))
+        key = f"{self.state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.last_trip_reason = reason
+        self._failures.clear()
+        self._slow_calls.clear()
+        self._half_open_ok = 0
+
+    def _prune(self, events: deque, now: float):
+        while events and now - events[0] > self.window_seconds:
+            events.popleft()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == OPEN:
+                self.rejected += 1
+                return False
+            return True
+
+    def retry_after(self) -> int:
+        """Seconds until the next probe may close the breaker"""
+        return max(1, int(self.open_seconds - (time.monotonic() - self.opened_at)) + 1)
+
+    def probe_due(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds
+
+    def record_success(self, duration_ms: float):
+        with self._lock:
+            now = time.monotonic()
+            if duration_ms >= self.latency_threshold_ms:
+                if self.state == HALF_OPEN:
+                    self._transition(OPEN, f"slow command in half-open ({duration_ms:.0f} ms)")
+                    return
+                self._slow_calls.append(now)
+                self._prune(self._slow_calls, now)
+                if self.state == CLOSED and len(self._slow_calls) >= self.slow_call_threshold:
+                    self._transition(OPEN, f"{len(self._slow_calls)} commands over {self.latency_threshold_ms:.0f} ms")
+            elif self.state == HALF_OPEN:
+                self._half_open_ok += 1
+                if self._half_open_ok >= self.half_open_successes:
+                    self._transition(CLOSED)
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, reason)
+                return
+            if self.state == OPEN:
+                return
+            self._failures.append(now)
+            self._prune(self._failures, now)
+            if len(self._failures) >= self.failure_threshold:
+                self._transition(OPEN, f"{len(self._failures)} failures, last: {reason}")
+
+    def probe_succeeded(self):
+        with self._lock:
+            if self.state == OPEN:
+                self._transition(HALF_OPEN)
+
+    def probe_failed(self, reason: str):
+        with self._lock:
+            if self.state == OPEN:
+                # Restart the open period so the next probe waits again
+                self.opened_at = time.monotonic()
+                self.last_trip_reason = reason
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "last_trip_reason": self.last_trip_reason,
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else 0,
+                "transitions": dict(self.transitions),
+                "rejected": self.rejected,
+                "recent_failures": len(self._failures),
+                "recent_slow_calls": len(self._slow_calls),
+            }
+
+
+class BreakerCommandListener(monitoring.CommandListener):
+    """Reports request-path command latency and connection-level failures to
+    the breaker.
+
+    Server replies with an error code (duplicate keys, validation...) mean
+    MongoDB is up, so only driver-side failures (network errors, timeouts)
+    count against it. Commands issued outside a request (in_request unset)
+    are ignored.
+    """
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if in_request.get():
+            self.breaker.record_success(event.duration_micros / 1000)
+
+    def failed(self, event):
+        if not in_request.get():
+            return
+        failure = event.failure or {}
+        if "errtype" in failure and "code" not in failure:
+            self.breaker.record_failure(f"{failure['errtype']} on {event.command_name}")
+        else:
+            self.breaker.record_success(event.duration_micros / 1000)
+
+
+class LastKnownGoodCache:
+    """LRU of the latest successful public GET responses: key -> (body, media type, stored_at)"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, key: str, body: bytes, media_type: str):
+        self._entries[key] = (body, media_type, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def metrics(self) -> dict:
+        return {"entries": len(self._entries), "served_stale": self.hits, "stale_misses": self.misses}
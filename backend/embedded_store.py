@@ -0,0 +1,1175 @@
+"""
+Embedded storage backend (SQLite in WAL mode).
+
+With STORAGE_BACKEND=embedded (or =auto when MongoDB is unreachable)
+connect_to_mongo hands the app an EmbeddedDatabase instead of a Motor database.
+It implements the part of Motor's database/collection API the routes use, so
+handlers keep calling `database.<collection>` unchanged:
+
+- every collection is one table of JSON documents
+- INDEX_SPEC entries become SQLite expression indexes over json_extract(), so
+  the same query shapes stay indexed (explain() reports IXSCAN/COLLSCAN)
+- query filters compile to SQL; aggregation pipelines run in Python over the
+  rows matched by their leading $match
+- all SQLite work runs on one background thread, off the event loop
+
+Not supported: change streams (watch raises OperationFailure, as on a
+standalone mongod), transactions and operators the app doesn't use.
+"""
+
+import asyncio
+import functools
+import json
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+# datetimes are stored as tagged, fixed-width ISO strings so they sort and
+# compare correctly in SQL and come back as datetimes
+DATE_TAG = "\u001edate:"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+_ENCODED_DATE_TAG = json.dumps(DATE_TAG)[1:-1]
+
+ITER_BATCH_SIZE = 500
+
+_NAME_PATTERN = re.compile(r"^\w+$")
+_TOKEN_PATTERN = re.compile(r"\w+")
+MISSING = object()
+
+
+# -- document encoding ------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return DATE_TAG + value.strftime(DATE_FORMAT)
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode(document: dict) -> str:
+    return json.dumps(document, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode_value(value):
+    if isinstance(value, str):
+        if value.startswith(DATE_TAG):
+            return datetime.strptime(value[len(DATE_TAG):], DATE_FORMAT)
+        return value
+    if isinstance(value, dict):
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def decode(raw: str) -> dict:
+    document = json.loads(raw)
+    return _decode_value(document) if _ENCODED_DATE_TAG in raw else document
+
+
+def _sql_value(value):
+    if isinstance(value, datetime):
+        return _json_default(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return encode(value)
+    return value
+
+
+# -- field paths ------------------------------------------------------------
+
+def _json_path(field: str) -> str:
+    parts = field.split(".")
+    if not all(_NAME_PATTERN.match(part) for part in parts):
+        raise OperationFailure(f"Unsupported field name for embedded storage: {field!r}")
+    return "$." + ".".join(parts)
+
+
+def field_sql(field: str) -> str:
+    return f"json_extract(doc, '{_json_path(field)}')"
+
+
+def get_path(document, field: str):
+    value = document
+    for part in field.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return MISSING
+    return value
+
+
+def set_path(document: dict, field: str, value):
+    *parents, leaf = field.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[leaf] = value
+
+
+def unset_path(document: dict, field: str):
+    *parents, leaf = field.split(".")
+    for part in parents:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(leaf, None)
+
+
+# -- query filters: SQL -------------------------------------------------------
+
+JSON_TYPES = {
+    "string": ("text",),
+    "number": ("integer", "real"),
+    "int": ("integer",),
+    "long": ("integer",),
+    "double": ("real",),
+    "bool": ("true", "false"),
+    "object": ("object",),
+    "array": ("array",),
+    "null": ("null",),
+}
+
+# The same $type names for documents matched in Python (see matches())
+PYTHON_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "int": int,
+    "long": int,
+    "double": float,
+    "bool": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+def _compile_operator(field: str, op: str, value) -> Tuple[str, list]:
+    expr = field_sql(field)
+    if op == "$eq":
+        return (f"{expr} IS NULL", []) if value is None else (f"{expr} = ?", [_sql_value(value)])
+    if op == "$ne":
+        return (f"{expr} IS NOT NULL", []) if value is None else (f"({expr} IS NULL OR {expr} != ?)", [_sql_value(value)])
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        symbol = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}[op]
+        return f"{expr} {symbol} ?", [_sql_value(value)]
+    if op in ("$in", "$nin"):
+        values = [_sql_value(v) for v in value if v is not None]
+        has_null = len(values) != len(value)
+        in_sql = f"{expr} IN ({', '.join('?' * len(values))})" if values else "0"
+        if op == "$in":
+            return (f"({in_sql} OR {expr} IS NULL)" if has_null else in_sql), values
+        not_in = f"{expr} NOT IN ({', '.join('?' * len(values))})" if values else "1"
+        return (f"({expr} IS NOT NULL AND {not_in})" if has_null else f"({expr} IS NULL OR {not_in})"), values
+    if op == "$exists":
+        return f"json_type(doc, '{_json_path(field)}') IS {'NOT ' if value else ''}NULL", []
+    if op == "$type":
+        types = JSON_TYPES.get(value)
+        if not types:
+            raise OperationFailure(f"Unsupported $type for embedded storage: {value!r}")
+        return f"json_type(doc, '{_json_path(field)}') IN ({', '.join(repr(t) for t in types)})", []
+    raise OperationFailure(f"Unsupported query operator for embedded storage: {op}")
+
+
+def _is_operator_dict(value) -> bool:
+    return isinstance(value, dict) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def compile_filter(query: Optional[dict]) -> Tuple[str, list]:
+    """Mongo filter -> SQL WHERE clause and parameters ($text is left to the caller)"""
+    clauses, params = [], []
+    for key, condition in (query or {}).items():
+        if key in ("$or", "$and", "$nor"):
+            parts = [compile_filter(sub) for sub in condition]
+            joiner = " AND " if key == "$and" else " OR "
+            joined = joiner.join(f"({sql})" for sql, _ in parts) or ("1" if key == "$and" else "0")
+            clauses.append(f"NOT ({joined})" if key == "$nor" else f"({joined})")
+            for _, sub_params in parts:
+                params.extend(sub_params)
+        elif key == "$text":
+            continue
+        elif key.startswith("$"):
+            raise OperationFailure(f"Unsupported query operator for embedded storage: {key}")
+        else:
+            operators = condition if _is_operator_dict(condition) else {"$eq": condition}
+            for op, value in operators.items():
+                sql, op_params = _compile_operator(key, op, value)
+                clauses.append(sql)
+                params.extend(op_params)
+    return " AND ".join(clauses) or "1", params
+
+
+def _sql_literal(value) -> str:
+    value = _sql_value(value)
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def partial_filter_sql(expression: dict) -> str:
+    """Partial index WHERE clause (no bound parameters allowed there).
+
+    $exists/$type become "IS NOT NULL" on the same json_extract() expression
+    the queries use; SQLite can only prove a query implies the index's WHERE
+    for that form.
+    """
+    clauses = []
+    for field, condition in expression.items():
+        operators = condition if _is_operator_dict(condition) else {"$eq": condition}
+        for op, value in operators.items():
+            if op in ("$exists", "$type"):
+                clauses.append(f"{field_sql(field)} IS NOT NULL")
+            else:
+                sql, params = _compile_operator(field, op, value)
+                for param in params:
+                    sql = sql.replace("?", _sql_literal(param), 1)
+                clauses.append(sql)
+    return " AND ".join(clauses)
+
+
+# -- query filters: Python (pipelines, upserts) ------------------------------
+
+def _bracket(value) -> int:
+    if value is None or value is MISSING:
+        return 0
+    if isinstance(value, bool):
+        return 5
+    if isinstance(value, (int, float)):
+        return 1
+    if isinstance(value, str):
+        return 2
+    if isinstance(value, dict):
+        return 3
+    if isinstance(value, list):
+        return 4
+    return 6
+
+
+def sort_key(value):
+    bracket = _bracket(value)
+    if bracket == 0:
+        return (0, 0)
+    if bracket in (3, 4):
+        return (bracket, encode(value))
+    return (bracket, value)
+
+
+def _compare(value, other) -> Optional[int]:
+    if _bracket(value) != _bracket(other) or _bracket(value) == 0:
+        return None
+    left, right = sort_key(value)[1], sort_key(other)[1]
+    return (left > right) - (left < right)
+
+
+def _equals(value, expected) -> bool:
+    if value is MISSING:
+        value = None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _match_operator(value, op: str, expected) -> bool:
+    if op == "$eq":
+        return _equals(value, expected)
+    if op == "$ne":
+        return not _equals(value, expected)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        result = _compare(value, expected)
+        if result is None:
+            return False
+        return {"$gt": result > 0, "$gte": result >= 0, "$lt": result < 0, "$lte": result <= 0}[op]
+    if op == "$in":
+        return any(_equals(value, item) for item in expected)
+    if op == "$nin":
+        return not any(_equals(value, item) for item in expected)
+    if op == "$exists":
+        return (value is not MISSING) == bool(expected)
+    if op == "$type":
+        if expected not in PYTHON_TYPES:
+            raise OperationFailure(f"Unsupported $type for embedded storage: {expected!r}")
+        # bool is an int subclass but never a BSON number
+        return isinstance(value, PYTHON_TYPES[expected]) and (expected == "bool" or not isinstance(value, bool))
+    raise OperationFailure(f"Unsupported query operator for embedded storage: {op}")
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, sub) for sub in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"Unsupported query operator for embedded storage: {key}")
+        else:
+            value = get_path(document, key)
+            operators = condition if _is_operator_dict(condition) else {"$eq": condition}
+            if not all(_match_operator(value, op, expected) for op, expected in operators.items()):
+                return False
+    return True
+
+
+def upsert_seed(query: dict, document: Optional[dict] = None) -> dict:
+    """The new document an upsert starts from: the filter's equality fields"""
+    document = {} if document is None else document
+    for key, condition in query.items():
+        if key == "$and":
+            for sub in condition:
+                upsert_seed(sub, document)
+        elif not key.startswith("$"):
+            if not _is_operator_dict(condition):
+                set_path(document, key, condition)
+            elif "$eq" in condition:
+                set_path(document, key, condition["$eq"])
+    return document
+
+
+# -- aggregation expressions ---------------------------------------------------
+# Expressions compile to closures once per stage rather than being
+# re-interpreted for every document
+
+def _truthy(value) -> bool:
+    return value not in (None, False, 0, MISSING)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_expression(expression) -> Callable[[dict], Any]:
+    if isinstance(expression, str) and expression.startswith("$"):
+        field = expression[1:]
+        if "." not in field:
+            return lambda doc: doc.get(field)
+        return lambda doc: _none_if_missing(get_path(doc, field))
+    if isinstance(expression, list):
+        items = [compile_expression(item) for item in expression]
+        return lambda doc: [item(doc) for item in items]
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            op, args = next(iter(expression.items()))
+            if op.startswith("$"):
+                return _compile_expression_operator(op, args)
+        fields = {key: compile_expression(value) for key, value in expression.items()}
+        return lambda doc: {key: value(doc) for key, value in fields.items()}
+    return lambda doc: expression
+
+
+def evaluate(expression, document):
+    return compile_expression(expression)(document)
+
+
+def _none_if_missing(value):
+    return None if value is MISSING else value
+
+
+def _single_argument(args):
+    return args[0] if isinstance(args, list) and len(args) == 1 else args
+
+
+def _compile_expression_operator(op: str, args) -> Callable[[dict], Any]:
+    if op == "$literal":
+        return lambda doc: args
+    if op == "$cond":
+        if isinstance(args, dict):
+            args = [args["if"], args["then"], args["else"]]
+        condition, then, otherwise = (compile_expression(item) for item in args)
+        return lambda doc: then(doc) if _truthy(condition(doc)) else otherwise(doc)
+    if op == "$ifNull":
+        items = [compile_expression(item) for item in args]
+
+        def if_null(doc):
+            for item in items:
+                value = item(doc)
+                if value is not None:
+                    return value
+            return None
+        return if_null
+    if op in ("$toLower", "$toUpper"):
+        value = compile_expression(_single_argument(args))
+        convert = str.lower if op == "$toLower" else str.upper
+        return lambda doc: "" if value(doc) is None else convert(str(value(doc)))
+    if op in ("$trim", "$ltrim", "$rtrim"):
+        value = compile_expression(args["input"])
+        chars = compile_expression(args["chars"]) if "chars" in args else (lambda doc: None)
+        strip = {"$trim": str.strip, "$ltrim": str.lstrip, "$rtrim": str.rstrip}[op]
+        return lambda doc: None if value(doc) is None else strip(value(doc), chars(doc))
+    if op == "$arrayElemAt":
+        array, index = (compile_expression(item) for item in args)
+
+        def array_elem_at(doc):
+            items, position = array(doc), index(doc)
+            if not isinstance(items, list) or not -len(items) <= position < len(items):
+                return MISSING
+            return items[position]
+        return array_elem_at
+    if op == "$size":
+        value = compile_expression(_single_argument(args))
+        return lambda doc: len(value(doc) or [])
+    if op in ("$eq", "$ne"):
+        left, right = (compile_expression(item) for item in args)
+        if op == "$eq":
+            return lambda doc: left(doc) == right(doc)
+        return lambda doc: left(doc) != right(doc)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        left, right = (compile_expression(item) for item in args)
+        compare = {"$gt": lambda r: r > 0, "$gte": lambda r: r >= 0, "$lt": lambda r: r < 0, "$lte": lambda r: r <= 0}[op]
+
+        def comparison(doc):
+            a, b = sort_key(left(doc)), sort_key(right(doc))
+            return compare((a > b) - (a < b))
+        return comparison
+    if op in ("$and", "$or"):
+        items = [compile_expression(item) for item in args]
+        combine = all if op == "$and" else any
+        return lambda doc: combine(_truthy(item(doc)) for item in items)
+    if op == "$not":
+        value = compile_expression(_single_argument(args))
+        return lambda doc: not _truthy(value(doc))
+    if op in ("$add", "$sum"):
+        items = [compile_expression(item) for item in (args if isinstance(args, list) else [args])]
+
+        def total(doc):
+            values = [item(doc) for item in items]
+            flat = [v for value in values for v in (value if isinstance(value, list) else [value])]
+            return sum(v for v in flat if _is_number(v))
+        return total
+    if op == "$concat":
+        items = [compile_expression(item) for item in args]
+
+        def concat(doc):
+            values = [item(doc) for item in items]
+            return None if any(v is None for v in values) else "".join(values)
+        return concat
+    raise OperationFailure(f"Unsupported aggregation expression for embedded storage: {op}")
+
+
+# -- aggregation stages --------------------------------------------------------
+
+def _sorted(documents: List[dict], spec) -> List[dict]:
+    keys = list(spec.items()) if isinstance(spec, dict) else list(spec)
+    ordered = list(documents)
+    for field, direction in reversed(keys):
+        ordered.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction == -1)
+    return ordered
+
+
+ACCUMULATOR_INITIAL = {"$sum": int, "$push": list, "$addToSet": list, "$avg": lambda: [0, 0]}
+
+
+def _group_key(value):
+    return value if value is None or isinstance(value, (str, int, float)) else encode(value)
+
+
+def _group(documents: List[dict], spec: dict) -> List[dict]:
+    group_id = compile_expression(spec["_id"])
+    accumulators = []
+    for name, accumulator in spec.items():
+        if name == "_id":
+            continue
+        op, expression = next(iter(accumulator.items()))
+        if op not in ("$sum", "$push", "$addToSet", "$first", "$last", "$min", "$max", "$avg"):
+            raise OperationFailure(f"Unsupported $group accumulator for embedded storage: {op}")
+        accumulators.append((name, op, compile_expression(expression)))
+
+    groups: Dict[Any, dict] = {}
+    for document in documents:
+        key_value = group_id(document)
+        key = _group_key(key_value)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"_id": key_value}
+            for name, op, _ in accumulators:
+                group[name] = ACCUMULATOR_INITIAL[op]() if op in ACCUMULATOR_INITIAL else MISSING
+        for name, op, expression in accumulators:
+            value = expression(document)
+            if op == "$sum":
+                if _is_number(value):
+                    group[name] += value
+            elif op == "$push":
+                group[name].append(value)
+            elif op == "$addToSet":
+                if value not in group[name]:
+                    group[name].append(value)
+            elif op == "$first":
+                if group[name] is MISSING:
+                    group[name] = value
+            elif op == "$last":
+                group[name] = value
+            elif op in ("$min", "$max"):
+                current = group[name]
+                if value is not None and (current is MISSING or (sort_key(value) < sort_key(current)) == (op == "$min")):
+                    group[name] = value
+            elif _is_number(value):  # $avg
+                group[name][0] += value
+                group[name][1] += 1
+
+    for group in groups.values():
+        for name, op, _ in accumulators:
+            if op == "$avg":
+                total, count = group[name]
+                group[name] = total / count if count else None
+            elif group[name] is MISSING:
+                group[name] = None
+    return list(groups.values())
+
+
+def project(document: dict, projection: Optional[dict], score: Optional[float] = None) -> dict:
+    if not projection:
+        return document
+    meta_fields = [field for field, value in projection.items() if isinstance(value, dict)]
+    plain = {field: value for field, value in projection.items() if not isinstance(value, dict)}
+    included = [field for field, value in plain.items() if field != "_id" and value]
+    if included or (plain.get("_id") and len(plain) == 1):
+        result = {}
+        if plain.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        for field in included:
+            value = get_path(document, field)
+            if value is not MISSING:
+                set_path(result, field, value)
+    else:
+        result = _without(document, [field for field, value in plain.items() if not value])
+    for field in meta_fields:
+        result[field] = score
+    return result
+
+
+def _without(document: dict, fields: List[str]) -> dict:
+    result = dict(document)
+    for field in fields:
+        head, _, rest = field.partition(".")
+        if rest:
+            if isinstance(result.get(head), dict):
+                result[head] = _without(result[head], [rest])
+        else:
+            result.pop(head, None)
+    return result
+
+
+def _set_fields(documents: List[dict], spec: dict) -> List[dict]:
+    fields = [(field, compile_expression(expression)) for field, expression in spec.items()]
+    results = []
+    for document in documents:
+        result = dict(document)
+        for field, expression in fields:
+            value = expression(document)
+            if value is MISSING:
+                unset_path(result, field)
+            else:
+                set_path(result, field, value)
+        results.append(result)
+    return results
+
+
+# -- collections -----------------------------------------------------------------
+
+class EmbeddedCursor:
+    """find() cursor: chainable sort/skip/limit, to_list and async iteration"""
+
+    def __init__(self, collection: "EmbeddedCollection", query: Optional[dict], projection: Optional[dict]):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, Any]] = []
+        self._skip = 0
+        self._limit = 0
+        self._batch_size = ITER_BATCH_SIZE
+
+    def sort(self, key_or_list, direction=None):
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction if direction is not None else 1)]
+        else:
+            self._sort = list(key_or_list.items()) if isinstance(key_or_list, dict) else list(key_or_list)
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int):
+        self._batch_size = batch_size or ITER_BATCH_SIZE
+        return self
+
+    def _documents(self, limit: int = 0) -> Iterator[dict]:
+        limits = [value for value in (self._limit, limit) if value]
+        return self._collection._iter_find(self._query, self._projection, self._sort, self._skip, min(limits) if limits else 0)
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        return await self._collection.database._run(lambda: list(self._documents(length or 0)))
+
+    async def __aiter__(self):
+        documents = await self._collection.database._run(self._documents)
+        while True:
+            batch = await self._collection.database._run(lambda: list(islice(documents, self._batch_size)))
+            if not batch:
+                return
+            for document in batch:
+                yield document
+
+    async def explain(self) -> dict:
+        return await self._collection.database._run(self._collection._explain, self._query, self._sort)
+
+
+class EmbeddedAggregateCursor:
+    def __init__(self, collection: "EmbeddedCollection", pipeline: List[dict]):
+        self._collection = collection
+        self._pipeline = pipeline
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        documents = await self._collection.database._run(self._collection._aggregate, self._pipeline)
+        return documents[:length] if length else documents
+
+    async def __aiter__(self):
+        for document in await self.to_list():
+            yield document
+
+
+class EmbeddedCollection:
+    def __init__(self, database: "EmbeddedDatabase", name: str):
+        if not _NAME_PATTERN.match(name):
+            raise OperationFailure(f"Invalid collection name for embedded storage: {name!r}")
+        self.database = database
+        self.name = name
+        self._table = f'"{name}"'
+        self._created = False
+
+    # All underscore methods run on the database thread
+
+    def _ensure_table(self):
+        if self._created:
+            return
+        conn = self.database._conn
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (doc TEXT NOT NULL)")
+        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{self.name}.__id_" ON {self._table} ({field_sql("_id")})')
+        self._created = True
+
+    def _text_index(self) -> Optional[dict]:
+        for key, options in self.database._index_metadata(self.name).values():
+            if any(kind == "text" for _, kind in key):
+                return {"fields": [field for field, kind in key if kind == "text"], "weights": options.get("weights", {})}
+        return None
+
+    def _partial_index_hints(self, query: dict) -> List[str]:
+        """WHERE terms of partial indexes this query's equality fields satisfy.
+
+        SQLite only uses a partial index when the query repeats its WHERE
+        clause; these terms are redundant for the rows they match.
+        """
+        hints = []
+        seed = upsert_seed(query)
+        for _, options in self.database._index_metadata(self.name).values():
+            expression = options.get("partialFilterExpression")
+            if expression and all(get_path(seed, field) is not MISSING for field in expression) and matches(seed, expression):
+                hints.append(partial_filter_sql(expression))
+        return hints
+
+    def _rows(self, query: dict, sort=None, skip: int = 0, limit: int = 0, columns: str = "rowid, doc"):
+        self._ensure_table()
+        where, params = compile_filter(query)
+        where = " AND ".join([where, *self._partial_index_hints(query)])
+        sql = f"SELECT {columns} FROM {self._table} WHERE {where}"
+        if sort:
+            sql += " ORDER BY " + ", ".join(f"{field_sql(f)} {'DESC' if d == -1 else 'ASC'}" for f, d in sort)
+        if limit or skip:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit or -1, skip]
+        return self.database._conn.execute(sql, params)
+
+    def _text_search(self, query: dict, projection, sort, skip: int, limit: int) -> List[dict]:
+        text_index = self._text_index()
+        if not text_index:
+            raise OperationFailure("text index required for $text query", code=27)
+        terms = {term.lower() for term in _TOKEN_PATTERN.findall(query["$text"]["$search"])}
+        if not terms:
+            return []
+        # SQL narrows to rows containing any term in any text field; ranking
+        # weights whole-token matches per field like Mongo's textScore
+        where, params = compile_filter(query)
+        like = " OR ".join(f"{field_sql(field)} LIKE ?" for field in text_index["fields"] for _ in terms)
+        like_params = [f"%{term}%" for _ in text_index["fields"] for term in terms]
+        self._ensure_table()
+        rows = self.database._conn.execute(
+            f"SELECT doc FROM {self._table} WHERE {where} AND ({like})", params + like_params
+        )
+        scored = []
+        for (raw,) in rows:
+            document = decode(raw)
+            score = 0.0
+            for field in text_index["fields"]:
+                tokens = _TOKEN_PATTERN.findall(str(get_path(document, field) or "").lower())
+                hits = sum(1 for token in tokens if token in terms)
+                score += text_index["weights"].get(field, 1) * hits
+            if score:
+                document["\u001escore"] = score
+                scored.append(document)
+        for field, direction in reversed(sort or []):
+            if isinstance(direction, dict):
+                scored.sort(key=lambda doc: doc["\u001escore"], reverse=True)
+            else:
+                scored.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction == -1)
+        scored = scored[skip:skip + limit] if limit else scored[skip:]
+        return [project(document, projection, document.pop("\u001escore")) for document in scored]
+
+    def _iter_find(self, query: dict, projection, sort, skip: int = 0, limit: int = 0) -> Iterator[dict]:
+        if "$text" in query:
+            yield from self._text_search(query, projection, sort, skip, limit)
+            return
+        for _, raw in self._rows(query, sort, skip, limit):
+            yield project(decode(raw), projection)
+
+    def _explain(self, query: dict, sort=None) -> dict:
+        self._ensure_table()
+        where, params = compile_filter(query)
+        sql = f"SELECT doc FROM {self._table} WHERE {where}"
+        if sort:
+            sql += " ORDER BY " + ", ".join(f"{field_sql(f)} {'DESC' if d == -1 else 'ASC'}" for f, d in sort
+                                            if not isinstance(d, dict))
+        details = [row[-1] for row in self.database._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        stages = []
+        for detail in details:
+            if detail.startswith("SCAN") and "INDEX" not in detail:
+                stages.append({"stage": "COLLSCAN", "detail": detail})
+            elif "INDEX" in detail:
+                stages.append({"stage": "IXSCAN", "detail": detail})
+            elif "TEMP B-TREE" in detail:
+                stages.append({"stage": "SORT", "detail": detail})
+        return {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStages": stages}}, "sqlite": details}
+
+    def _insert(self, document: dict):
+        self._ensure_table()
+        if "_id" not in document:
+            document["_id"] = str(ObjectId())
+        try:
+            self.database._conn.execute(f"INSERT INTO {self._table} (doc) VALUES (?)", (encode(document),))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} ({e})", 11000)
+        return document["_id"]
+
+    def _update(self, query: dict, update, upsert: bool, multi: bool, return_document: Optional[bool] = None,
+                projection=None, sort=None):
+        """Returns (matched, modified, upserted_id, document)"""
+        rows = list(self._rows(query, sort, limit=0 if multi else 1))
+        if not rows:
+            if not upsert:
+                return 0, 0, None, None
+            document = apply_update(upsert_seed(query), update, is_insert=True)
+            upserted_id = self._insert(document)
+            return 0, 0, upserted_id, (project(document, projection) if return_document else None)
+
+        modified = 0
+        before_document = after_document = None
+        for rowid, raw in rows:
+            before = decode(raw)
+            after = apply_update(decode(raw), update, is_insert=False)
+            after["_id"] = before.get("_id")
+            encoded = encode(after)
+            if encoded != raw:
+                try:
+                    self.database._conn.execute(f"UPDATE {self._table} SET doc = ? WHERE rowid = ?", (encoded, rowid))
+                except sqlite3.IntegrityError as e:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} ({e})", 11000)
+                modified += 1
+            before_document, after_document = before, after
+        document = after_document if return_document else before_document
+        return len(rows), modified, None, project(document, projection)
+
+    def _delete(self, query: dict, multi: bool) -> int:
+        self._ensure_table()
+        where, params = compile_filter(query)
+        if multi:
+            return self.database._conn.execute(f"DELETE FROM {self._table} WHERE {where}", params).rowcount
+        return self.database._conn.execute(
+            f"DELETE FROM {self._table} WHERE rowid IN (SELECT rowid FROM {self._table} WHERE {where} LIMIT 1)", params
+        ).rowcount
+
+    def _bulk_write(self, operations: list, ordered: bool) -> BulkWriteResult:
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+                  "upserted": [], "writeErrors": [], "writeConcernErrors": []}
+        with self.database._transaction():
+            for index, operation in enumerate(operations):
+                try:
+                    if isinstance(operation, InsertOne):
+                        self._insert(operation._doc)
+                        result["nInserted"] += 1
+                    elif isinstance(operation, (UpdateOne, UpdateMany, ReplaceOne)):
+                        matched, modified, upserted_id, _ = self._update(
+                            operation._filter, operation._doc, bool(operation._upsert),
+                            multi=isinstance(operation, UpdateMany)
+                        )
+                        result["nMatched"] += matched
+                        result["nModified"] += modified
+                        if upserted_id is not None:
+                            result["nUpserted"] += 1
+                            result["upserted"].append({"index": index, "_id": upserted_id})
+                    elif isinstance(operation, (DeleteOne, DeleteMany)):
+                        result["nRemoved"] += self._delete(operation._filter, multi=isinstance(operation, DeleteMany))
+                    else:
+                        raise OperationFailure(f"Unsupported bulk operation: {type(operation).__name__}")
+                except DuplicateKeyError as e:
+                    result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e), "op": operation})
+                    if ordered:
+                        break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    def _aggregate(self, pipeline: List[dict]) -> List[dict]:
+        stages = list(pipeline)
+        query = stages.pop(0)["$match"] if stages and "$match" in stages[0] else {}
+        documents = [decode(raw) for _, raw in self._rows(query)]
+        return self._run_pipeline(documents, stages)
+
+    def _run_pipeline(self, documents: List[dict], stages: List[dict]) -> List[dict]:
+        for stage in stages:
+            (name, spec), = stage.items()
+            if name == "$match":
+                documents = [doc for doc in documents if matches(doc, spec)]
+            elif name == "$sort":
+                documents = _sorted(documents, spec)
+            elif name == "$group":
+                documents = _group(documents, spec)
+            elif name == "$facet":
+                documents = [{key: self._run_pipeline(documents, sub) for key, sub in spec.items()}]
+            elif name == "$lookup":
+                foreign = self.database[spec["from"]]
+                documents = [
+                    {**doc, spec["as"]: list(foreign._iter_find(
+                        {spec["foreignField"]: _none_if_missing(get_path(doc, spec["localField"]))}, None, None
+                    ))}
+                    for doc in documents
+                ]
+            elif name in ("$set", "$addFields"):
+                documents = _set_fields(documents, spec)
+            elif name == "$unset":
+                documents = [_without(doc, [spec] if isinstance(spec, str) else spec) for doc in documents]
+            elif name == "$project":
+                documents = _project_stage(documents, spec)
+            elif name == "$unwind":
+                path = (spec if isinstance(spec, str) else spec["path"])[1:]
+                documents = [
+                    {**doc, path: item} for doc in documents
+                    for item in (get_path(doc, path) if isinstance(get_path(doc, path), list) else [])
+                ]
+            elif name == "$skip":
+                documents = documents[spec:]
+            elif name == "$limit":
+                documents = documents[:spec]
+            elif name == "$count":
+                documents = [{spec: len(documents)}] if documents else []
+            else:
+                raise OperationFailure(f"Unsupported aggregation stage for embedded storage: {name}")
+        return documents
+
+    # Motor-compatible async API
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> EmbeddedCursor:
+        return EmbeddedCursor(self, filter, projection)
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None):
+        cursor = self.find(filter, projection)
+        if sort:
+            cursor.sort(sort)
+        documents = await cursor.limit(1).to_list(length=1)
+        return documents[0] if documents else None
+
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        inserted_id = await self.database._run(self._write, self._insert, document)
+        return InsertOneResult(inserted_id, True)
+
+    async def insert_many(self, documents: list, ordered: bool = True) -> InsertManyResult:
+        await self.database._run(self._bulk_write, [InsertOne(document) for document in documents], ordered)
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def _update_result(self, filter, update, upsert: bool, multi: bool) -> UpdateResult:
+        matched, modified, upserted_id, _ = await self.database._run(
+            self._write, self._update, filter, update, upsert, multi
+        )
+        raw = {"n": matched + (1 if upserted_id is not None else 0), "nModified": modified}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def update_one(self, filter: dict, update, upsert: bool = False) -> UpdateResult:
+        return await self._update_result(filter, update, upsert, multi=False)
+
+    async def update_many(self, filter: dict, update, upsert: bool = False) -> UpdateResult:
+        return await self._update_result(filter, update, upsert, multi=True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False) -> UpdateResult:
+        return await self._update_result(filter, replacement, upsert, multi=False)
+
+    async def find_one_and_update(self, filter: dict, update, projection: Optional[dict] = None, sort=None,
+                                  upsert: bool = False, return_document: bool = False):
+        sort = [(sort, 1)] if isinstance(sort, str) else sort
+        _, _, _, document = await self.database._run(
+            self._write, self._update, filter, update, upsert, False, return_document, projection, sort
+        )
+        return document
+
+    async def delete_one(self, filter: dict) -> DeleteResult:
+        return DeleteResult({"n": await self.database._run(self._write, self._delete, filter, False)}, True)
+
+    async def delete_many(self, filter: dict) -> DeleteResult:
+        return DeleteResult({"n": await self.database._run(self._write, self._delete, filter, True)}, True)
+
+    async def bulk_write(self, requests: list, ordered: bool = True) -> BulkWriteResult:
+        return await self.database._run(self._bulk_write, list(requests), ordered)
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        if "$text" in filter:
+            return len(await self.find(filter).to_list(length=None))
+        return await self.database._run(lambda: self._rows(filter, columns="COUNT(*)").fetchone()[0])
+
+    async def estimated_document_count(self) -> int:
+        return await self.count_documents({})
+
+    async def distinct(self, key: str, filter: Optional[dict] = None) -> list:
+        def run():
+            rows = self._rows(filter or {}, columns=f"DISTINCT {field_sql(key)}")
+            return [_decode_value(value) for (value,) in rows if value is not None]
+        return await self.database._run(run)
+
+    def aggregate(self, pipeline: List[dict], **kwargs) -> EmbeddedAggregateCursor:
+        return EmbeddedAggregateCursor(self, pipeline)
+
+    def _write(self, operation, *args):
+        with self.database._transaction():
+            return operation(*args)
+
+    def _create_index(self, model_document: dict):
+        self._ensure_table()
+        name = model_document["name"]
+        key = list(model_document["key"].items())
+        options = {k: v for k, v in model_document.items() if k not in ("key", "name")}
+        if any(kind == "text" for _, kind in key):
+            # Text search ranks in Python (_text_search); only the metadata is kept
+            self.database._save_index_metadata(self.name, name, key, options)
+            return name
+        columns = ", ".join(f"{field_sql(field)}{' DESC' if direction == -1 else ''}" for field, direction in key)
+        where = ""
+        if "partialFilterExpression" in options:
+            where = f" WHERE {partial_filter_sql(options['partialFilterExpression'])}"
+        elif options.get("sparse"):
+            where = " WHERE " + " AND ".join(f"{field_sql(field)} IS NOT NULL" for field, _ in key)
+        unique = "UNIQUE " if options.get("unique") else ""
+        try:
+            self.database._conn.execute(
+                f'CREATE {unique}INDEX IF NOT EXISTS "{self.name}.{name}" ON {self._table} ({columns}){where}'
+            )
+        except sqlite3.IntegrityError as e:
+            raise OperationFailure(f"E11000 duplicate key error building index {self.name}.{name}: {e}", 11000)
+        self.database._save_index_metadata(self.name, name, key, options)
+        return name
+
+    async def create_indexes(self, indexes: list) -> List[str]:
+        return [await self.database._run(self._write, self._create_index, model.document) for model in indexes]
+
+    async def create_index(self, keys, **kwargs) -> str:
+        from pymongo import IndexModel
+        return (await self.create_indexes([IndexModel(keys, **kwargs)]))[0]
+
+    async def index_information(self) -> dict:
+        def run():
+            info = {"_id_": {"key": [("_id", 1)]}}
+            for name, (key, options) in self.database._index_metadata(self.name).items():
+                info[name] = {"key": key, **options}
+            return info
+        return await self.database._run(run)
+
+    async def drop_index(self, name: str):
+        def run():
+            self.database._conn.execute(f'DROP INDEX IF EXISTS "{self.name}.{name}"')
+            self.database._conn.execute("DELETE FROM _index_metadata WHERE collection = ? AND name = ?", (self.name, name))
+            self.database._index_cache.pop(self.name, None)
+        await self.database._run(self._write, run)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("Change streams are not available with embedded storage", code=40573)
+
+
+def apply_update(document: dict, update, is_insert: bool) -> dict:
+    if isinstance(update, list):
+        for stage in update:
+            (name, spec), = stage.items()
+            if name in ("$set", "$addFields"):
+                document = _set_fields([document], spec)[0]
+            elif name == "$unset":
+                document = _without(document, [spec] if isinstance(spec, str) else spec)
+            else:
+                raise OperationFailure(f"Unsupported update pipeline stage for embedded storage: {name}")
+        return document
+    if update and not any(key.startswith("$") for key in update):
+        # Replacement document
+        return {"_id": document.get("_id"), **update} if "_id" in document else dict(update)
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not is_insert:
+            continue
+        for field, value in fields.items():
+            if op in ("$set", "$setOnInsert"):
+                set_path(document, field, value)
+            elif op == "$unset":
+                unset_path(document, field)
+            elif op == "$inc":
+                current = get_path(document, field)
+                set_path(document, field, (0 if current is MISSING or current is None else current) + value)
+            elif op == "$push":
+                current = get_path(document, field)
+                set_path(document, field, ([] if current is MISSING else list(current)) + [value])
+            else:
+                raise OperationFailure(f"Unsupported update operator for embedded storage: {op}")
+    return document
+
+
+def _project_stage(documents: List[dict], spec: dict) -> List[dict]:
+    computed = [(field, compile_expression(value)) for field, value in spec.items() if isinstance(value, (dict, str))]
+    # Computed fields put the projection in inclusion mode, like in Mongo
+    projection = {field: 1 if isinstance(value, (dict, str)) else value for field, value in spec.items()}
+    results = []
+    for document in documents:
+        projected = project(document, projection)
+        for field, expression in computed:
+            value = expression(document)
+            if value is MISSING:
+                unset_path(projected, field)
+            else:
+                set_path(projected, field, value)
+        results.append(projected)
+    return results
+
+
+class EmbeddedDatabase:
+    """SQLite-backed stand-in for a Motor database"""
+
+    def __init__(self, path, name: str = "embedded"):
+        self.path = str(path)
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedded-store")
+        self._collections: Dict[str, EmbeddedCollection] = {}
+        self._index_cache: Dict[str, dict] = {}
+        self._conn = self._executor.submit(self._connect).result()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS _index_metadata "
+            "(collection TEXT NOT NULL, name TEXT NOT NULL, key TEXT NOT NULL, options TEXT NOT NULL, "
+            "PRIMARY KEY (collection, name))"
+        )
+        return conn
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(function, *args))
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def _index_metadata(self, collection: str) -> dict:
+        if collection not in self._index_cache:
+            rows = self._conn.execute(
+                "SELECT name, key, options FROM _index_metadata WHERE collection = ?", (collection,)
+            )
+            self._index_cache[collection] = {
+                name: ([tuple(item) for item in json.loads(key)], json.loads(options)) for name, key, options in rows
+            }
+        return self._index_cache[collection]
+
+    def _save_index_metadata(self, collection: str, name: str, key: list, options: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO _index_metadata (collection, name, key, options) VALUES (?, ?, ?, ?)",
+            (collection, name, json.dumps(key), encode(options)),
+        )
+        self._index_cache.pop(collection, None)
+
+    def __getitem__(self, name: str) -> EmbeddedCollection:
+        if name not in self._collections:
+            self._collections[name] = EmbeddedCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> EmbeddedCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> EmbeddedCollection:
+        return self[name]
+
+    def with_options(self, **kwargs) -> "EmbeddedDatabase":
+        # Read preferences and write concerns mean nothing for a local file
+        return self
+
+    async def command(self, command, value=1, **kwargs) -> dict:
+        if command == "ping":
+            return {"ok": 1.0}
+        if command == "aggregate" and kwargs.get("explain"):
+            pipeline = kwargs.get("pipeline") or []
+            query = pipeline[0]["$match"] if pipeline and "$match" in pipeline[0] else {}
+            return await self._run(self[value]._explain, query)
+        raise OperationFailure(f"Command {command!r} is not supported by embedded storage")
+
+    async def list_collection_names(self) -> List[str]:
+        def run():
+            rows = self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_%' ESCAPE '\\'")
+            return [name for (name,) in rows if not name.startswith("sqlite_")]
+        return await self._run(run)
+
+    async def drop_collection(self, name: str):
+        def run():
+            self._conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            self._conn.execute("DELETE FROM _index_metadata WHERE collection = ?", (name,))
+            self._index_cache.pop(name, None)
+            self[name]._created = False
+        await self._run(run)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("Change streams are not available with embedded storage", code=40573)
+
+    def close(self):
+        self._executor.submit(self._conn.close).result()
+        self._executor.shutdown(wait=True)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, or a no-op when nested"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._owner = False
+
+    def __enter__(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._owner = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._owner:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Declarative MongoDB index spec.
+
+INDEX_SPEC lists every index the API's query shapes rely on. startup_event
+applies it idempotently (apply_indexes); QUERY_SHAPES mirrors the queries the
+route handlers issue so the CLI can check each one is served by an index:
+
+    python indexes.py apply     # create anything missing
+    python indexes.py verify    # explain() every query shape, fail on COLLSCAN
+                                # or on collections that don't exist yet
+                                # (--skip-missing to skip those instead)
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from queries import (
+    GUESTBOOK_PAGE_SORT, MODERATION_QUEUE_SORT, PENDING_MODERATION_QUERY, PENDING_MODERATION_SORT,
+    RSVP_IDENTITY_FIELDS, RSVP_PAGE_SORT, guest_email_rsvps_query, guest_responses_pipeline,
+    guest_upsert_query, guestbook_page_query, guestbook_search_query, invitation_code_query,
+    moderation_queue_query, rsvp_identity_filters, rsvp_page_query, rsvp_summary_pipeline, wedding_key_query,
+)
+from wedding_arrays import ARRAY_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+GUESTBOOK_TEXT_INDEX = [("wedding_id", 1), ("status", 1), ("name", "text"), ("relationship", "text"), ("message", "text")]
+GUESTBOOK_TEXT_WEIGHTS = {"name": 10, "relationship": 5, "message": 1}
+
+INDEX_SPEC = {
+    "users": [
+        IndexModel("username", unique=True),
+        IndexModel("id", unique=True),
+    ],
+    "sessions": [
+        IndexModel("session_id", unique=True),
+    ],
+    "weddings": [
+        IndexModel("id", unique=True),
+        IndexModel("user_id"),
+        IndexModel("shareable_id", unique=True, partialFilterExpression={"shareable_id": {"$type": "string"}}),
+    ],
+    "rsvps": [
+        IndexModel([("wedding_id", 1), ("submitted_at", 1), ("id", 1)]),
+        IndexModel([("wedding_id", 1), ("guest_email_normalized", 1)], unique=True,
+                   partialFilterExpression={"guest_email_normalized": {"$gt": ""}}),
+        IndexModel([("wedding_id", 1), ("idempotency_key", 1)], unique=True,
+                   partialFilterExpression={"idempotency_key": {"$exists": True}}),
+        IndexModel("guest_id", unique=True, partialFilterExpression={"guest_id": {"$exists": True}}),
+    ],
+    "rsvp_counters": [
+        IndexModel("wedding_id", unique=True),
+    ],
+    "guests": [
+        IndexModel("invitation_code", unique=True),
+        IndexModel([("wedding_id", 1), ("name", 1)]),
+        IndexModel([("wedding_id", 1), ("email_normalized", 1)], unique=True,
+                   partialFilterExpression={"email_normalized": {"$gt": ""}}),
+    ],
+    "guestbook": [
+        IndexModel([("wedding_id", 1), ("status", 1), ("created_at", -1), ("id", -1)]),
+        IndexModel([("status", 1), ("created_at", 1)]),
+        IndexModel("moderation_claim", sparse=True),
+        IndexModel(GUESTBOOK_TEXT_INDEX, weights=GUESTBOOK_TEXT_WEIGHTS),
+    ],
+    # Items split out of the wedding document (see wedding_arrays.py)
+    **{
+        collection: [IndexModel([("wedding_id", 1), ("position", 1)], unique=True)]
+        for collection in ARRAY_COLLECTIONS.values()
+    },
+}
+
+# (route, collection, filter, sort) or (route, collection, pipeline) for aggregations,
+# built with the same helpers the handlers use (queries.py). Values are
+# placeholders - only the shape matters to the query planner.
+_CURSOR = ("t", "x")
+_RSVP_IDENTITIES = rsvp_identity_filters({"wedding_id": "x", **{field: "x" for field in RSVP_IDENTITY_FIELDS}})
+
+QUERY_SHAPES = [
+    ("register / username routes", "users", {"username": "x"}, None),
+    ("login", "users", {"username": "x", "password": "x"}, None),
+    ("get_current_user_simple", "users", {"id": "x"}, None),
+    ("session restore", "sessions", {"session_id": "x"}, None),
+    ("wedding by owner", "weddings", {"user_id": "x"}, None),
+    ("public wedding", "weddings", {"id": "x"}, None),
+    ("shareable resolver", "weddings", {"shareable_id": "x"}, None),
+    ("wedding filter exact check", "weddings", wedding_key_query("x"), None),
+    ("rsvp list", "rsvps", rsvp_page_query("x"), RSVP_PAGE_SORT),
+    ("rsvp list (after cursor)", "rsvps", rsvp_page_query("x", _CURSOR), RSVP_PAGE_SORT),
+    *[(f"rsvp upsert ({field})", "rsvps", identity, None)
+      for field, identity in zip(RSVP_IDENTITY_FIELDS, _RSVP_IDENTITIES)],
+    ("rsvp summary", "rsvps", rsvp_summary_pipeline("x")),
+    ("rsvp counters", "rsvp_counters", {"wedding_id": "x"}, None),
+    ("invitation code", "guests", invitation_code_query("x"), None),
+    ("guest list", "guests", guest_responses_pipeline("x")),
+    ("guest list (email RSVPs)", "rsvps", guest_email_rsvps_query("x", ["x", "y"]), None),
+    ("guest upload upsert", "guests", guest_upsert_query("x", "x"), None),
+    ("guestbook list", "guestbook", guestbook_page_query("x"), GUESTBOOK_PAGE_SORT),
+    ("guestbook list (before cursor)", "guestbook", guestbook_page_query("x", _CURSOR), GUESTBOOK_PAGE_SORT),
+    ("guestbook search", "guestbook", guestbook_search_query("x", "x"), None),
+    ("moderation claim", "guestbook", PENDING_MODERATION_QUERY, PENDING_MODERATION_SORT),
+    ("moderation batch", "guestbook", {"moderation_claim": "x"}, None),
+    ("moderation queue", "guestbook", moderation_queue_query(["x", "y"]), MODERATION_QUEUE_SORT),
+    *[(f"wedding {field}", collection, {"wedding_id": "x"}, [("position", 1)])
+      for field, collection in ARRAY_COLLECTIONS.items()],
+]
+
+
+async def _drop_superseded_text_index(collection, model: IndexModel):
+    # A collection can hold only one text index, so a changed text spec has to
+    # replace the old one rather than sit next to it
+    wanted = model.document["name"]
+    for name, info in (await collection.index_information()).items():
+        if name != wanted and any(kind == "text" for _, kind in info["key"]):
+            logger.info(f"🔁 Dropping superseded text index {collection.name}.{name}")
+            await collection.drop_index(name)
+
+
+async def apply_indexes(database, collections: Optional[Iterable[str]] = None) -> List[str]:
+    """Create every index in INDEX_SPEC (idempotent); returns the specs that failed"""
+    failed = []
+    for collection_name in collections or INDEX_SPEC:
+        collection = database[collection_name]
+        for model in INDEX_SPEC[collection_name]:
+            name = model.document["name"]
+            try:
+                if any(kind == "text" for kind in model.document["key"].values()):
+                    await _drop_superseded_text_index(collection, model)
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicates blocking a unique index - the rest still apply
+                logger.error(f"❌ Index {collection_name}.{name} not created: {e}")
+                failed.append(f"{collection_name}.{name}")
+    return failed
+
+
+def _plan_stages(plan) -> List[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def explain_shape(database, shape) -> List[str]:
+    if len(shape) == 3:
+        _, collection_name, pipeline = shape
+        explained = await database.command("aggregate", collection_name, pipeline=pipeline, explain=True)
+    else:
+        _, collection_name, query, sort = shape
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = await cursor.explain()
+    # Only the winning plans matter; rejected plans may legitimately scan
+    plans = explained.get("queryPlanner", {}).get("winningPlan") or [
+        stage.get("$cursor", {}).get("queryPlanner", {}).get("winningPlan") for stage in explained.get("stages", [])
+    ]
+    return _plan_stages(plans)
+
+
+async def verify_indexes(database, skip_missing: bool = False) -> bool:
+    """explain() every shape; a COLLSCAN fails, and so does a shape whose plan
+    can't be checked (missing collection, EOF plan) unless skip_missing"""
+    ok = True
+    existing = set(await database.list_collection_names())
+    for shape in QUERY_SHAPES:
+        stages = await explain_shape(database, shape) if shape[1] in existing else []
+        if "COLLSCAN" in stages:
+            ok = False
+            print(f"❌ {shape[0]:<38} {shape[1]:<14} COLLSCAN ({' > '.join(stages)})")
+        elif not stages or stages == ["EOF"]:
+            reason = "collection missing" if shape[1] not in existing else "no plan to check"
+            if skip_missing:
+                print(f"⏭️ {shape[0]:<38} {shape[1]:<14} skipped, {reason}")
+            else:
+                ok = False
+                print(f"❌ {shape[0]:<38} {shape[1]:<14} {reason}, plan not checked")
+        else:
+            print(f"✅ {shape[0]:<38} {shape[1]:<14} {' > '.join(stages)}")
+    return ok
+
+
+def _connect():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    if os.getenv("STORAGE_BACKEND") == "embedded":
+        from embedded_store import EmbeddedDatabase
+
+        database = EmbeddedDatabase(os.getenv("EMBEDDED_DB_PATH", str(Path(__file__).parent / 'weddingcard.db')))
+        return database, database
+    client = AsyncIOMotorClient(os.getenv("MONGO_URL"))
+    return client, client[os.getenv("DB_NAME", "weddingcard")]
+
+
+async def _run(command: str, skip_missing: bool = False) -> int:
+    client, database = _connect()
+    try:
+        if command == "apply":
+            failed = await apply_indexes(database)
+            print("✅ Indexes applied" if not failed else f"❌ Failed: {', '.join(failed)}")
+            return 1 if failed else 0
+        return 0 if await verify_indexes(database, skip_missing) else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="MongoDB index bootstrap and verification")
+
+    @cli.command()
+    def apply():
+        """Create every index in INDEX_SPEC"""
+        raise typer.Exit(asyncio.run(_run("apply")))
+
+    @cli.command()
+    def verify(
+        skip_missing: bool = typer.Option(False, help="Skip shapes on collections that don't exist yet instead of failing"),
+    ):
+        """explain() each route's query shape; exit 1 if any does a COLLSCAN or can't be checked"""
+        raise typer.Exit(asyncio.run(_run("verify", skip_missing)))
+
+    cli()
@@ -0,0 +1,251 @@
+"""
+Live RSVP / guestbook feed.
+
+FeedBroker is an in-process pub/sub: every SSE connection subscribes to one
+wedding and gets new RSVPs and guestbook messages pushed to it. Events are fed
+either by the request handlers directly or, when Mongo runs as a replica set,
+by a change stream watcher (watch_change_streams) so writes from other workers
+are seen too.
+
+Each subscription has a bounded queue. A client that cannot keep up is
+disconnected instead of buffering without limit; it reconnects with
+Last-Event-ID and catches up from the per-wedding replay buffer. Replay buffers
+of weddings nobody has published to or watched for replay_ttl seconds are
+evicted.
+
+Event ids are "<seconds>-<n>": the operation's clusterTime for change stream
+events, so ids agree across workers and restarts, and wall-clock seconds plus
+a process counter for in-process events.
+
+A subscription can be limited to some event kinds and fields (the public
+guestbook view); owner subscriptions get every event in full.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+FEED_COLLECTIONS = {"rsvps": "rsvp", "guestbook": "guestbook"}
+
+
+# Event kind -> fields a subscriber may see (None: the whole document)
+EventFields = Optional[Dict[str, Optional[FrozenSet[str]]]]
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[int, int]]:
+    seconds, _, n = (event_id or "").partition("-")
+    if not (seconds.isdigit() and n.isdigit()):
+        return None
+    return int(seconds), int(n)
+
+
+def visible_event(event: dict, fields: EventFields) -> Optional[dict]:
+    """event as a subscriber limited to fields sees it, or None if it may not"""
+    if fields is None:
+        return event
+    if event["type"] not in fields:
+        return None
+    allowed = fields[event["type"]]
+    if allowed is None:
+        return event
+    return {**event, "data": {k: v for k, v in event["data"].items() if k in allowed}}
+
+
+class Subscription:
+    def __init__(self, wedding_id: str, max_queue: int, fields: EventFields = None):
+        self.wedding_id = wedding_id
+        self.fields = fields
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        if self.overflowed:
+            return
+        event = visible_event(event, self.fields)
+        if event is None:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: stop buffering and let the stream close
+            self.overflowed = True
+
+
+class FeedBroker:
+    def __init__(self, max_queue: int = 100, replay_size: int = 200, replay_ttl: float = 3600, max_replay_weddings: int = 10000):
+        self._max_queue = max_queue
+        self._replay_size = replay_size
+        self._replay_ttl = replay_ttl
+        self._max_replay_weddings = max_replay_weddings
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # wedding id -> recent events, least recently active first
+        self._recent: "OrderedDict[str, deque]" = OrderedDict()
+        self._last_active: Dict[str, float] = {}
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.dropped_subscribers = 0
+        self.evicted_replay_buffers = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, wedding_id: str, fields: EventFields = None) -> Subscription:
+        subscription = Subscription(wedding_id, self._max_queue, fields)
+        self._subscribers.setdefault(wedding_id, set()).add(subscription)
+        self._touch(wedding_id)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self._subscribers.get(subscription.wedding_id)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._subscribers[subscription.wedding_id]
+        if subscription.overflowed:
+            self.dropped_subscribers += 1
+        self._touch(subscription.wedding_id)
+
+    def _touch(self, wedding_id: str):
+        if wedding_id in self._recent:
+            self._last_active[wedding_id] = time.monotonic()
+            self._recent.move_to_end(wedding_id)
+        self._evict_idle()
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self._replay_ttl
+        while self._recent:
+            wedding_id = next(iter(self._recent))
+            if len(self._recent) <= self._max_replay_weddings:
+                if self._last_active[wedding_id] >= cutoff:
+                    return
+                if wedding_id in self._subscribers:
+                    # Still watched: keep its buffer for reconnects
+                    self._last_active[wedding_id] = time.monotonic()
+                    self._recent.move_to_end(wedding_id)
+                    continue
+            del self._recent[wedding_id]
+            del self._last_active[wedding_id]
+            self.evicted_replay_buffers += 1
+
+    def next_event_id(self) -> str:
+        return f"{int(time.time())}-{next(self._sequence)}"
+
+    def publish(self, wedding_id: str, kind: str, document: dict, event_id: Optional[str] = None):
+        event = {
+            "id": event_id or self.next_event_id(),
+            "type": kind,
+            "data": {k: v for k, v in document.items() if k != "_id"},
+        }
+        recent = self._recent.get(wedding_id)
+        if recent is None:
+            recent = self._recent[wedding_id] = deque(maxlen=self._replay_size)
+        recent.append(event)
+        self._touch(wedding_id)
+        self.published += 1
+        for subscription in self._subscribers.get(wedding_id, ()):
+            subscription.push(event)
+
+    def replay_after(self, wedding_id: str, last_event_id: Optional[str], fields: EventFields = None):
+        """Buffered events newer than last_event_id (nothing if it is unknown)"""
+        last = parse_event_id(last_event_id)
+        if last is None:
+            return []
+        events = (visible_event(event, fields) for event in self._recent.get(wedding_id, ()) if parse_event_id(event["id"]) > last)
+        return [event for event in events if event is not None]
+
+    def metrics(self) -> dict:
+        return {
+            "subscribers": self.subscriber_count,
+            "weddings": len(self._subscribers),
+            "replay_buffers": len(self._recent),
+            "evicted_replay_buffers": self.evicted_replay_buffers,
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+def format_sse(event: dict) -> str:
+    data = json.dumps(event["data"], default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def stream_events(
+    broker: FeedBroker,
+    wedding_id: str,
+    last_event_id: Optional[str],
+    is_disconnected,
+    heartbeat: float = 15.0,
+    fields: EventFields = None,
+) -> AsyncIterator[str]:
+    subscription = broker.subscribe(wedding_id, fields)
+    try:
+        yield "retry: 3000\n\n"
+        for event in broker.replay_after(wedding_id, last_event_id, fields):
+            yield format_sse(event)
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def watch_change_streams(
+    database,
+    broker: FeedBroker,
+    ready: asyncio.Event,
+    resolve_wedding_id: Optional[Callable[[str], Awaitable[str]]] = None,
+):
+    """Publish inserted RSVPs/guestbook messages from a Mongo change stream.
+
+    Documents are published under resolve_wedding_id(document["wedding_id"]),
+    since guests may post under a wedding's shareable_id. Sets `ready` once the
+    stream is open. Returns immediately if the server does not support change
+    streams (standalone mongod).
+    """
+    pipeline = [{"$match": {
+        "operationType": {"$in": ["insert", "update", "replace"]},
+        "ns.coll": {"$in": list(FEED_COLLECTIONS)},
+    }}]
+    resume_token = None
+    while True:
+        try:
+            async with database.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                ready.set()
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    document = change.get("fullDocument")
+                    # Guestbook messages only go live once moderation publishes them
+                    if document and document.get("status", "published") != "published":
+                        continue
+                    if document and document.get("wedding_id"):
+                        # clusterTime orders events the same way on every worker
+                        cluster_time = change.get("clusterTime")
+                        event_id = f"{cluster_time.time}-{cluster_time.inc}" if cluster_time else None
+                        wedding_id = document["wedding_id"]
+                        if resolve_wedding_id:
+                            wedding_id = await resolve_wedding_id(wedding_id)
+                        broker.publish(wedding_id, FEED_COLLECTIONS[change["ns"]["coll"]], document, event_id)
+        except OperationFailure as e:
+            if not ready.is_set():
+                logger.info(f"ℹ️ Change streams unavailable, live feed uses in-process events: {e}")
+                return
+            logger.error(f"❌ Change stream failed, resuming: {e}")
+        except PyMongoError as e:
+            logger.error(f"❌ Change stream error, resuming: {e}")
+        await asyncio.sleep(1)
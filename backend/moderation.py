@@ -0,0 +1,68 @@
+"""
+Guestbook moderation filter.
+
+Messages are posted in a "pending" state and checked in batches by the
+moderation workers in server.py. ModerationFilter holds the configurable rules:
+a blocked word list (a set lookup per token, so cost doesn't grow with the
+list; multi-word phrases go through one alternation regex), extra regex
+patterns and a limit on links per message.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+TOKEN_PATTERN = re.compile(r"[\w']+")
+URL_PATTERN = re.compile(r"(https?://|www\.)\S+|\b[\w-]+\.(com|net|org|info|biz|ru|xyz|top|click)\b", re.IGNORECASE)
+MODERATED_FIELDS = ("name", "relationship", "message")
+
+
+class ModerationFilter:
+    def __init__(
+        self,
+        blocked_words: Iterable[str] = (),
+        blocked_patterns: Iterable[str] = (),
+        max_urls: int = 1,
+    ):
+        words = {" ".join(w.lower().split()) for w in blocked_words if w.strip()}
+        self.blocked_words = {w for w in words if " " not in w}
+        phrases = sorted((w for w in words if " " in w), key=len, reverse=True)
+        self.phrase_pattern: Optional[re.Pattern] = (
+            re.compile(r"\b(" + "|".join(re.escape(p).replace(r"\ ", r"\s+") for p in phrases) + r")\b", re.IGNORECASE)
+            if phrases else None
+        )
+        self.patterns: List[re.Pattern] = [re.compile(p, re.IGNORECASE) for p in blocked_patterns if p]
+        self.max_urls = max_urls
+
+    @classmethod
+    def from_env(cls) -> "ModerationFilter":
+        """Build the filter from MODERATION_* environment variables"""
+        words = [w for w in os.getenv("MODERATION_BLOCKED_WORDS", "").split(",")]
+        wordlist_file = os.getenv("MODERATION_WORDLIST_FILE")
+        if wordlist_file and Path(wordlist_file).exists():
+            words += Path(wordlist_file).read_text().splitlines()
+        patterns = [p for p in os.getenv("MODERATION_BLOCKED_PATTERNS", "").split("\n")]
+        return cls(words, patterns, int(os.getenv("MODERATION_MAX_URLS", "1")))
+
+    def check(self, message: dict) -> List[str]:
+        """Reasons a message should be held for review (empty list = publish)"""
+        text = "\n".join(str(message.get(field) or "") for field in MODERATED_FIELDS)
+        reasons = []
+        if self.blocked_words:
+            hit = next((t for t in TOKEN_PATTERN.findall(text.lower()) if t in self.blocked_words), None)
+            if hit:
+                reasons.append(f"blocked word: {hit}")
+        if self.phrase_pattern:
+            match = self.phrase_pattern.search(text)
+            if match:
+                reasons.append(f"blocked phrase: {' '.join(match.group(0).lower().split())}")
+        for pattern in self.patterns:
+            if pattern.search(text):
+                reasons.append(f"blocked pattern: {pattern.pattern}")
+        if len(URL_PATTERN.findall(text)) > self.max_urls:
+            reasons.append("too many links")
+        return reasons
+
+    def check_batch(self, messages: List[dict]) -> List[List[str]]:
+        return [self.check(message) for message in messages]
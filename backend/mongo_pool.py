@@ -0,0 +1,125 @@
+"""
+MongoDB connection pool settings and CMAP metrics.
+
+mongo_client_options() turns MONGO_* environment variables into
+AsyncIOMotorClient keyword arguments. PoolMetricsListener subscribes to
+PyMongo's connection monitoring (CMAP) events so /api/metrics can tell
+connection wait time apart from server time.
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from pymongo import monitoring
+
+# env var -> MongoClient option
+POOL_ENV_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),  # e.g. "zstd,snappy"
+}
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def mongo_client_options() -> dict:
+    options = {}
+    for env_name, (option, cast) in POOL_ENV_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Counts pool connections and measures how long checkouts wait.
+
+    PyMongo emits checkout events synchronously on the thread doing the
+    checkout, so a thread-local start time pairs "started" with its outcome.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.pool_clears = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _finish_wait(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._finish_wait()
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if waited <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.checkouts += 1
+            self.connections_in_use += 1
+            self.wait_total_ms += waited
+            self.wait_max_ms = max(self.wait_max_ms, waited)
+            self.wait_buckets[bucket] += 1
+
+    def connection_check_out_failed(self, event):
+        self._finish_wait()
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def metrics(self) -> dict:
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            buckets["gt_5000ms"] = self.wait_buckets[-1]
+            return {
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pool_clears": self.pool_clears,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": buckets,
+            }
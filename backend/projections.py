@@ -0,0 +1,37 @@
+"""
+Named projections for every single-document lookup in server.py.
+
+Wedding documents carry large arrays (gallery, registry, timeline...), so
+handlers ask for exactly the fields their use case reads instead of the whole
+document. find_projected() is the one entry point; tests/test_projections.py
+checks that no handler is handed a field it never touches.
+"""
+
+from typing import Optional
+
+PROJECTIONS = {
+    # Existence checks - only the always-present _id comes back
+    "exists": {"_id": 1},
+    # Sessions restored from MongoDB into active_sessions (only user_id is read)
+    "session": {"_id": 0, "user_id": 1},
+    # get_current_user_simple -> CurrentUser
+    "session_user": {"_id": 0, "id": 1, "username": 1, "created_at": 1},
+    "login": {"_id": 0, "id": 1, "username": 1},
+    # Username routes only need the id to find the wedding
+    "user_id": {"_id": 0, "id": 1},
+    # shareable_id resolution and ownership checks
+    "wedding_id": {"_id": 0, "id": 1},
+    "wedding_keys": {"_id": 0, "id": 1, "shareable_id": 1},
+    # Fields update_wedding_data carries over from the stored document
+    "wedding_update": {"_id": 0, "id": 1, "shareable_id": 1, "created_at": 1},
+    # Revalidating a cached public page (see public_bootstrap_script)
+    "wedding_version": {"_id": 0, "updated_at": 1},
+    # Full documents: the owner dashboard and public pages render everything
+    "wedding_owner": {"_id": 0},
+    "wedding_public": {"_id": 0, "user_id": 0},
+}
+
+
+async def find_projected(collection, query: dict, use_case: str) -> Optional[dict]:
+    """find_one() returning only the fields of the named use case"""
+    return await collection.find_one(query, PROJECTIONS[use_case])
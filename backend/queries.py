@@ -0,0 +1,145 @@
+"""
+Query builders shared by the route handlers in server.py and indexes.QUERY_SHAPES.
+
+Every filter, sort and pipeline a handler sends to MongoDB is built here, so
+`python indexes.py verify` explains exactly the queries the API issues instead
+of hand-copied lookalikes.
+"""
+
+from typing import List, Optional, Tuple
+
+
+def wedding_key_query(wedding_key: str) -> dict:
+    """A wedding addressed by either its id or its shareable_id"""
+    return {"$or": [{"id": wedding_key}, {"shareable_id": wedding_key}]}
+
+
+# RSVPs
+RSVP_IDENTITY_FIELDS = ("guest_id", "guest_email_normalized", "idempotency_key")
+RSVP_PAGE_SORT = [("submitted_at", 1), ("id", 1)]
+
+
+def rsvp_identity_filters(rsvp: dict) -> List[dict]:
+    """Every unique identity an RSVP carries, strongest first"""
+    return [
+        {"wedding_id": rsvp["wedding_id"], field: rsvp[field]}
+        for field in RSVP_IDENTITY_FIELDS
+        if rsvp.get(field)
+    ]
+
+
+def rsvp_page_query(wedding_id: str, after: Optional[Tuple[str, str]] = None, attendance: Optional[str] = None) -> dict:
+    """One wedding's RSVPs in RSVP_PAGE_SORT order, after a (submitted_at, id) position"""
+    query = {"wedding_id": wedding_id}
+    if attendance:
+        query["attendance"] = attendance
+    if after:
+        submitted_at, rsvp_id = after
+        query["$or"] = [
+            {"submitted_at": {"$gt": submitted_at}},
+            {"submitted_at": submitted_at, "id": {"$gt": rsvp_id}},
+        ]
+    return query
+
+
+# $group accumulators shared by the summary endpoint and the counter reconciler
+RSVP_COUNT_ACCUMULATORS = {
+    "responses": {"$sum": 1},
+    "attending": {"$sum": {"$cond": [{"$eq": ["$attendance", "yes"]}, 1, 0]}},
+    "not_attending": {"$sum": {"$cond": [{"$eq": ["$attendance", "no"]}, 1, 0]}},
+    "total_guests": {"$sum": {"$cond": [
+        {"$eq": ["$attendance", "yes"]},
+        {"$ifNull": ["$guest_count", 1]},
+        0
+    ]}},
+}
+
+
+def rsvp_summary_pipeline(wedding_id: str) -> list:
+    """Aggregation that computes dashboard RSVP stats server-side"""
+    return [
+        {"$match": {"wedding_id": wedding_id}},
+        {"$facet": {
+            "totals": [
+                {"$group": {"_id": None, **RSVP_COUNT_ACCUMULATORS}}
+            ],
+            "dietary_restrictions": [
+                {"$match": {"attendance": "yes", "dietary_restrictions": {"$nin": [None, ""]}}},
+                {"$group": {
+                    "_id": {"$toLower": {"$trim": {"input": "$dietary_restrictions"}}},
+                    "count": {"$sum": 1},
+                    "guests": {"$sum": {"$ifNull": ["$guest_count", 1]}},
+                }},
+                {"$match": {"_id": {"$ne": ""}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+        }},
+    ]
+
+
+# What the guest list shows of each guest's RSVP
+GUEST_RSVP_FIELDS = ("attendance", "guest_count", "submitted_at")
+
+
+def guest_responses_pipeline(wedding_id: str) -> list:
+    """Join the guest list to RSVPs submitted with invitation codes"""
+    return [
+        {"$match": {"wedding_id": wedding_id}},
+        {"$sort": {"name": 1}},
+        # Equality join served by the unique rsvps.guest_id index
+        {"$lookup": {"from": "rsvps", "localField": "id", "foreignField": "guest_id", "as": "rsvp"}},
+        {"$set": {"rsvp": {"$arrayElemAt": ["$rsvp", 0]}}},
+        {"$project": {
+            "_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1, "party_size": 1, "invitation_code": 1,
+            **{f"rsvp.{field}": 1 for field in GUEST_RSVP_FIELDS},
+        }},
+    ]
+
+
+def guest_email_rsvps_query(wedding_id: str, emails: List[str]) -> dict:
+    """RSVPs sent without an invitation code by guests on the list, matched by
+    normalized email - served by the unique (wedding_id, guest_email_normalized)
+    index, which a $lookup on the email alone could not use"""
+    return {"wedding_id": wedding_id, "guest_email_normalized": {"$in": list(emails)}}
+
+
+def guest_upsert_query(wedding_id: str, email_normalized: str) -> dict:
+    """A guest on the list, keyed by email so re-uploads update instead of duplicating"""
+    return {"wedding_id": wedding_id, "email_normalized": email_normalized}
+
+
+def invitation_code_query(code: str) -> dict:
+    return {"invitation_code": code.strip().upper()}
+
+
+# Guestbook
+GUESTBOOK_PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+
+def guestbook_page_query(wedding_id: str, before: Optional[Tuple[str, str]] = None) -> dict:
+    """A wedding's published messages in GUESTBOOK_PAGE_SORT order, before a (created_at, id) position"""
+    query = {"wedding_id": wedding_id, "status": "published"}
+    if before:
+        created_at, message_id = before
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": message_id}},
+        ]
+    return query
+
+
+def guestbook_search_query(wedding_id: str, text: str) -> dict:
+    return {"wedding_id": wedding_id, "status": "published", "$text": {"$search": text}}
+
+
+# Messages waiting for a moderation worker, oldest first
+PENDING_MODERATION_QUERY = {"status": "pending"}
+PENDING_MODERATION_SORT = [("created_at", 1)]
+# Held messages the couple can decide on, including ones a worker is still checking
+MODERATION_QUEUE_STATUSES = ["flagged", "pending", "processing"]
+MODERATION_QUEUE_SORT = [("created_at", -1)]
+
+
+def moderation_queue_query(wedding_keys: List[str]) -> dict:
+    """The couple's review queue"""
+    return {"wedding_id": {"$in": list(wedding_keys)}, "status": {"$in": MODERATION_QUEUE_STATUSES}}
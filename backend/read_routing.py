@@ -0,0 +1,79 @@
+"""
+Read-preference routing for public traffic.
+
+Guest-facing reads (public/share/username pages, guestbook, RSVP lists) can be
+a little stale, so with MONGO_PUBLIC_READ_PREFERENCE=secondaryPreferred they
+go to a secondary at most MONGO_MAX_STALENESS_SECONDS behind the primary.
+Owners who just wrote are kept on the primary for that long (RecentWriters) so
+they always see their own edits. The default ("primary") leaves routing off.
+"""
+
+import os
+import time
+from typing import Dict
+
+from pymongo.read_preferences import Nearest, Primary, SecondaryPreferred
+
+PUBLIC_READ_PREFERENCES = {
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Driver minimum: heartbeatFrequencyMS (10s) + idle write period (10s), floored at 90s
+MIN_MAX_STALENESS_SECONDS = 90
+
+RECENT_WRITERS_MAX_ENTRIES = 10000
+
+
+def public_read_mode() -> str:
+    return os.getenv("MONGO_PUBLIC_READ_PREFERENCE", "primary")
+
+
+def max_staleness_seconds() -> int:
+    return max(int(os.getenv("MONGO_MAX_STALENESS_SECONDS", str(MIN_MAX_STALENESS_SECONDS))), MIN_MAX_STALENESS_SECONDS)
+
+
+def public_read_preference():
+    """Read preference for staleness-tolerant public reads"""
+    mode = public_read_mode()
+    if mode == "primary":
+        return Primary()
+    if mode not in PUBLIC_READ_PREFERENCES:
+        raise ValueError(
+            f"MONGO_PUBLIC_READ_PREFERENCE must be one of: primary, {', '.join(PUBLIC_READ_PREFERENCES)}"
+        )
+    return PUBLIC_READ_PREFERENCES[mode](max_staleness=max_staleness_seconds())
+
+
+class RecentWriters:
+    """Users who wrote within the last window_seconds.
+
+    A secondary may lag the primary by up to the max staleness bound, so an
+    owner's reads stay on the primary for that long after each write.
+    """
+
+    def __init__(self, window_seconds: float, max_entries: int = RECENT_WRITERS_MAX_ENTRIES):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._written_at: Dict[str, float] = {}
+
+    def mark(self, user_id: str):
+        self._written_at.pop(user_id, None)
+        self._written_at[user_id] = time.monotonic()
+        if len(self._written_at) > self.max_entries:
+            self.prune()
+
+    def prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        # Insertion order is write order, so expired entries sit at the front
+        for user_id in list(self._written_at):
+            if self._written_at[user_id] >= cutoff and len(self._written_at) <= self.max_entries:
+                break
+            del self._written_at[user_id]
+
+    def wrote_recently(self, user_id: str) -> bool:
+        written_at = self._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.window_seconds
+
+    def __len__(self):
+        return len(self._written_at)
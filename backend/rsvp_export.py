@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+RSVP export - incremental CSV / NDJSON encoding of a Motor cursor.
+
+Used by GET /api/rsvp/{wedding_id}/export (as a StreamingResponse body) and as
+a CLI for bulk export of every wedding:
+
+    python rsvp_export.py --format csv --out-dir exports/
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from queries import RSVP_PAGE_SORT, rsvp_page_query
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_FIELDS = [
+    "id",
+    "guest_name",
+    "guest_email",
+    "guest_phone",
+    "attendance",
+    "guest_count",
+    "dietary_restrictions",
+    "special_message",
+    "submitted_at",
+]
+
+EXPORT_BATCH_SIZE = 500
+
+
+def export_cursor(rsvps_collection, wedding_id: str):
+    """Cursor over one wedding's RSVPs, oldest first, only the exported fields"""
+    projection = {"_id": 0, **{field: 1 for field in EXPORT_FIELDS}}
+    return (
+        rsvps_collection.find(rsvp_page_query(wedding_id), projection)
+        .sort(RSVP_PAGE_SORT)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+
+async def iter_export_chunks(cursor, fmt: str) -> AsyncIterator[bytes]:
+    """Encode cursor documents into byte chunks of at most EXPORT_BATCH_SIZE rows"""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+
+    rows = 0
+    async for rsvp in cursor:
+        if writer:
+            writer.writerow(rsvp)
+        else:
+            buffer.write(json.dumps(rsvp, default=str))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode("utf-8")
+
+
+async def export_all_weddings(fmt: str, out_dir: Path, wedding_id: Optional[str] = None):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.getenv("MONGO_URL"))
+    database = client[os.getenv("DB_NAME", "weddingcard")]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        if wedding_id:
+            wedding_ids = [wedding_id]
+        else:
+            wedding_ids = await database.rsvps.distinct("wedding_id")
+
+        for current_id in wedding_ids:
+            target = out_dir / f"rsvps-{current_id}.{fmt}"
+            with open(target, "wb") as f:
+                async for chunk in iter_export_chunks(export_cursor(database.rsvps, current_id), fmt):
+                    f.write(chunk)
+            print(f"✅ Exported {current_id} -> {target}")
+        print(f"📦 Exported {len(wedding_ids)} wedding(s) to {out_dir}")
+    finally:
+        client.close()
+
+
+def main(
+    format: str = "csv",
+    out_dir: Path = Path("exports"),
+    wedding_id: Optional[str] = None,
+):
+    """Export RSVPs for every wedding (or a single --wedding-id) to files"""
+    if format not in EXPORT_FORMATS:
+        raise SystemExit(f"❌ Unsupported format '{format}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    asyncio.run(export_all_weddings(format, out_dir, wedding_id))
+
+
+if __name__ == "__main__":
+    import typer
+
+    typer.run(main)
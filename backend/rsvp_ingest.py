@@ -0,0 +1,249 @@
+"""
+Batched RSVP ingestion.
+
+In queue mode submit_rsvp validates the RSVP, hands it to an RSVPIngestQueue and
+answers immediately with the RSVP id. A single background task flushes the
+queue with unordered bulk writes, so a deadline-day burst turns into a few
+large writes instead of one round trip per guest. RSVPs that have a dedupe
+identity (upsert_filter) are written as upserts so client retries stay no-ops:
+a resubmission still in the queue shares the queued RSVP's id, only the latest
+one per identity is written, and on_updated gets (previous, new) pairs for
+upserts that matched a stored RSVP. An upsert that collides with a different
+stored RSVP on a unique index is handed to on_conflict, which merges it and
+returns the RSVP it replaced.
+
+Every queued RSVP has already been acknowledged, so a failed batch is retried
+with capped backoff until the database is back - the bounded queue turns new
+submissions away with 503 meanwhile. Only documents the server itself rejects
+(write errors other than duplicate keys) are given up on after max_retries.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the queue is at capacity (or draining) and cannot accept more RSVPs"""
+
+
+class RSVPIngestQueue:
+    def __init__(
+        self,
+        collection_getter: Callable[[], object],
+        on_inserted: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+        on_updated: Optional[Callable[[List[Tuple[dict, dict]]], Awaitable[None]]] = None,
+        on_conflict: Optional[Callable[[dict], Awaitable[Optional[dict]]]] = None,
+        upsert_filter: Optional[Callable[[dict], Optional[dict]]] = None,
+        upsert_update: Optional[Callable[[dict], dict]] = None,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_retries: int = 3,
+        max_backoff: float = 5.0,
+    ):
+        self._collection_getter = collection_getter
+        self._on_inserted = on_inserted
+        self._on_updated = on_updated
+        self._on_conflict = on_conflict
+        self._upsert_filter = upsert_filter
+        self._upsert_update = upsert_update
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+        # Dedupe identity -> id of the queued RSVP carrying it
+        self._queued_ids: Dict[tuple, str] = {}
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._task is None:
+            self._accepting = True
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, document: dict) -> str:
+        """Queue an RSVP; returns the id it will be stored under"""
+        if not self._accepting:
+            raise IngestQueueFull("RSVP ingestion is shutting down")
+        key = self._key(self._upsert_filter(document) if self._upsert_filter else None)
+        if key in self._queued_ids:
+            document["id"] = self._queued_ids[key]
+        try:
+            self._queue.put_nowait(document)
+        except asyncio.QueueFull:
+            raise IngestQueueFull("RSVP ingestion queue is full")
+        if key is not None:
+            self._queued_ids[key] = document["id"]
+        return document["id"]
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Stop accepting RSVPs and flush everything already acknowledged
+        (giving up after timeout seconds if the database stays down)"""
+        self._accepting = False
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ RSVP queue not drained after {timeout}s, {self.depth} RSVP(s) still queued")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval
+        while len(batch) < self._batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _key(upsert_filter: Optional[dict]) -> Optional[tuple]:
+        return tuple(sorted(upsert_filter.items())) if upsert_filter else None
+
+    def _operation(self, document: dict):
+        """(write, upsert filter or None for a plain insert)"""
+        upsert_filter = self._upsert_filter(document) if self._upsert_filter else None
+        if upsert_filter is None:
+            return InsertOne(document), None
+        return UpdateOne(upsert_filter, self._upsert_update(document), upsert=True), upsert_filter
+
+    def _operations(self, documents: List[dict]) -> Tuple[List[dict], list]:
+        """(documents that could be turned into writes, their operations) -
+        only the latest document per dedupe identity is kept"""
+        latest = {}
+        for document in documents:
+            try:
+                operation = self._operation(document)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ Dropped malformed RSVP {document.get('id')}: {e}")
+                continue
+            latest[self._key(operation[1]) or id(document)] = (document, operation)
+        return [document for document, _ in latest.values()], [operation for _, operation in latest.values()]
+
+    async def _stored(self, collection, operations: list) -> Dict[tuple, dict]:
+        """Dedupe identity -> RSVP already stored under it, for the upserts in a batch"""
+        filters = [upsert_filter for _, upsert_filter in operations if upsert_filter]
+        if not filters or self._on_updated is None:
+            return {}
+        key_fields = {tuple(sorted(upsert_filter)) for upsert_filter in filters}
+        stored = {}
+        async for document in collection.find({"$or": filters}, {"_id": 0}):
+            for fields in key_fields:
+                stored[tuple((field, document.get(field)) for field in fields)] = document
+        return stored
+
+    async def _flush(self, batch: List[dict]):
+        pending, operations = self._operations(batch)
+        attempts = {}
+        outage = 0
+        while pending:
+            conflicts = []
+            try:
+                collection = self._collection_getter()
+                stored = await self._stored(collection, operations)
+                result = await collection.bulk_write(
+                    [operation for operation, _ in operations], ordered=False
+                )
+                failed_indexes = set()
+                upserted_indexes = set(result.upserted_ids)
+                retry = []
+            except BulkWriteError as e:
+                # Unordered: everything except the reported documents went in.
+                # Duplicate keys (code 11000) are merged by on_conflict, not retried.
+                errors = e.details.get("writeErrors", [])
+                failed_indexes = {error["index"] for error in errors}
+                upserted_indexes = {item["index"] for item in e.details.get("upserted", [])}
+                retry = []
+                for error in errors:
+                    if error.get("code") == 11000:
+                        if operations[error["index"]][1] is not None and self._on_conflict:
+                            conflicts.append(pending[error["index"]])
+                        continue
+                    document = pending[error["index"]]
+                    attempts[id(document)] = attempts.get(id(document), 0) + 1
+                    if attempts[id(document)] < self._max_retries:
+                        retry.append(document)
+                    else:
+                        self.failed += 1
+                        self._queued_ids.pop(self._key(operations[error["index"]][1]), None)
+                        logger.error(f"❌ Dropped RSVP {document.get('id')} rejected {self._max_retries} times: {error.get('errmsg')}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The whole batch failed (database unreachable) - keep it until it's back
+                outage += 1
+                delay = min(0.1 * 2 ** (outage - 1), self._max_backoff)
+                logger.error(f"❌ RSVP batch write failed (attempt {outage}, retrying in {delay:.1f}s): {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            outage = 0
+            inserted, updated = [], []
+            for i, (document, (_, upsert_filter)) in enumerate(zip(pending, operations)):
+                if i in failed_indexes:
+                    continue
+                key = self._key(upsert_filter)
+                if key is not None and self._queued_ids.get(key) == document["id"]:
+                    del self._queued_ids[key]
+                if upsert_filter is None or i in upserted_indexes:
+                    inserted.append(document)
+                elif key in stored:
+                    updated.append((stored[key], document))
+            for document in conflicts:
+                try:
+                    previous = await self._on_conflict(document)
+                except Exception as e:
+                    logger.error(f"❌ RSVP conflict merge failed, retrying: {e}")
+                    retry.append(document)
+                    continue
+                self._queued_ids.pop(self._key(self._upsert_filter(document)), None)
+                if previous is None:
+                    self.failed += 1
+                    logger.error(f"❌ Dropped RSVP {document.get('id')}: conflicts with another stored RSVP")
+                else:
+                    updated.append((previous, document))
+            pending, operations = self._operations(retry)
+
+            self.inserted += len(inserted)
+            self.updated += len(updated)
+            for hook, written in ((self._on_inserted, inserted), (self._on_updated, updated)):
+                if written and hook:
+                    try:
+                        await hook(written)
+                    except Exception as e:
+                        logger.error(f"❌ RSVP post-write hook failed: {e}")
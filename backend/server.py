@@ -1,18 +1,48 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request, Response, Header, Cookie, UploadFile, File
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, BulkWriteError, ConnectionFailure
+from typing import List, Optional, Tuple
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import hashlib
+import csv
+import io
+import secrets
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
 import asyncio
+from itertools import islice
+from collections import OrderedDict
+from rsvp_export import EXPORT_FORMATS, export_cursor, iter_export_chunks
+from rsvp_ingest import RSVPIngestQueue, IngestQueueFull
+from wedding_filter import WeddingIdFilter
+from projections import PROJECTIONS, find_projected
+from wedding_arrays import attach_arrays, save_arrays, split_arrays
+from static_manifest import StaticManifest
+from live_feed import FeedBroker, stream_events, watch_change_streams
+from moderation import ModerationFilter
+from queries import (
+    GUEST_RSVP_FIELDS, GUESTBOOK_PAGE_SORT, MODERATION_QUEUE_SORT, PENDING_MODERATION_QUERY,
+    PENDING_MODERATION_SORT, RSVP_COUNT_ACCUMULATORS, RSVP_PAGE_SORT, guest_email_rsvps_query,
+    guest_responses_pipeline, guest_upsert_query, guestbook_page_query, guestbook_search_query,
+    invitation_code_query, moderation_queue_query, rsvp_identity_filters, rsvp_page_query,
+    rsvp_summary_pipeline, wedding_key_query,
+)
+from indexes import apply_indexes
+from mongo_pool import mongo_client_options, PoolMetricsListener
+from read_routing import RecentWriters, max_staleness_seconds, public_read_mode, public_read_preference
+from embedded_store import EmbeddedDatabase
+from circuit_breaker import CircuitBreaker, BreakerCommandListener, LastKnownGoodCache, in_request as breaker_in_request
+from pymongo import InsertOne, UpdateOne
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -21,16 +51,69 @@ load_dotenv(ROOT_DIR / '.env')
 MONGO_URL = os.getenv("MONGO_URL")
 DB_NAME = os.getenv("DB_NAME", "weddingcard")
 
+# Storage backend: "mongo" (default) or "embedded" for the SQLite store
+# (embedded_store.py). "auto" opts in to falling back to the embedded store when
+# MongoDB can't be reached - writes made there stay local to this process
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+EMBEDDED_DB_PATH = os.getenv("EMBEDDED_DB_PATH", str(ROOT_DIR / 'weddingcard.db'))
+
 # MongoDB client and database
 mongodb_client = None
 database = None
+# Same database with the public read preference (see read_routing.py); guest
+# page reads go through get_read_db, everything else uses `database`
+public_db = None
+PUBLIC_READ_MODE = public_read_mode()
+
+# Pool settings come from MONGO_* env vars (see mongo_pool.py); CMAP events
+# feed the pool section of /api/metrics
+mongo_pool_metrics = PoolMetricsListener()
+
+# Circuit breaker around MongoDB (see circuit_breaker.py): trips on connection
+# failures or slow commands so requests fail fast instead of waiting out the
+# server-selection timeout
+MONGO_BREAKER_ENABLED = os.getenv("MONGO_BREAKER_ENABLED", "true").lower() == "true"
+MONGO_BREAKER_PROBE_TIMEOUT_SECONDS = float(os.getenv("MONGO_BREAKER_PROBE_TIMEOUT_SECONDS", "2"))
+mongo_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("MONGO_BREAKER_FAILURE_THRESHOLD", "5")),
+    slow_call_threshold=int(os.getenv("MONGO_BREAKER_SLOW_CALL_THRESHOLD", "10")),
+    latency_threshold_ms=float(os.getenv("MONGO_BREAKER_LATENCY_MS", "2000")),
+    window_seconds=float(os.getenv("MONGO_BREAKER_WINDOW_SECONDS", "30")),
+    open_seconds=float(os.getenv("MONGO_BREAKER_OPEN_SECONDS", "10")),
+    half_open_successes=int(os.getenv("MONGO_BREAKER_HALF_OPEN_SUCCESSES", "3")),
+)
+last_known_good = LastKnownGoodCache(int(os.getenv("MONGO_BREAKER_CACHE_SIZE", "1000")))
+mongo_breaker_probe_task = None
+
+def use_embedded_storage():
+    global mongodb_client, database, public_db
+    if mongodb_client:
+        mongodb_client.close()
+        mongodb_client = None
+    database = EmbeddedDatabase(EMBEDDED_DB_PATH, DB_NAME)
+    public_db = database
+    print(f"💾 Using embedded SQLite storage: {EMBEDDED_DB_PATH}")
+    logger.info(f"💾 Using embedded SQLite storage: {EMBEDDED_DB_PATH}")
 
 async def connect_to_mongo():
-    global mongodb_client, database
+    global mongodb_client, database, public_db
+    if STORAGE_BACKEND == "embedded":
+        use_embedded_storage()
+        return
     try:
         print(f"🔄 Attempting to connect to MongoDB: {MONGO_URL}")
-        mongodb_client = AsyncIOMotorClient(MONGO_URL)
+        pool_options = mongo_client_options()
+        if pool_options:
+            logger.info(f"MongoDB client options: {pool_options}")
+        mongodb_client = AsyncIOMotorClient(
+            MONGO_URL,
+            event_listeners=[mongo_pool_metrics, BreakerCommandListener(mongo_breaker)],
+            **pool_options
+        )
         database = mongodb_client[DB_NAME]
+        public_db = mongodb_client.get_database(DB_NAME, read_preference=public_read_preference())
+        if PUBLIC_READ_MODE != "primary":
+            logger.info(f"Public reads use {PUBLIC_READ_MODE} (maxStalenessSeconds={max_staleness_seconds()})")
         # Test the connection
         await database.command("ping")
         print(f"✅ Connected to MongoDB database: {DB_NAME}")
@@ -38,13 +121,15 @@ async def connect_to_mongo():
     except Exception as e:
         print(f"❌ Error connecting to MongoDB: {e}")
         logger.error(f"❌ Error connecting to MongoDB: {e}")
-        # Don't raise the error, just continue with JSON files
-        pass
+        if STORAGE_BACKEND == "auto":
+            use_embedded_storage()
 
 async def close_mongo_connection():
     global mongodb_client
     if mongodb_client:
         mongodb_client.close()
+    elif isinstance(database, EmbeddedDatabase):
+        database.close()
 
 # JSON file for simple user storage (backup)
 USERS_FILE = ROOT_DIR / 'users.json'
@@ -71,6 +156,12 @@ async def get_collections():
 # Simple session storage (in production, use Redis or similar)
 active_sessions = {}
 
+# Session transport: clients send the session via "Authorization: Bearer <id>"
+# or the session cookie. The legacy ?session_id= query parameter and the
+# "session_id" JSON body field are still accepted for older clients.
+SESSION_COOKIE_NAME = "session_id"
+SESSION_COOKIE_MAX_AGE = 60 * 60 * 24 * 30  # 30 days
+
 # Models
 class UserRegister(BaseModel):
     username: str
@@ -86,6 +177,12 @@ class User(BaseModel):
     password: str  # Simple plain text password
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class CurrentUser(BaseModel):
+    """The signed-in user as handlers see it - never carries the password"""
+    id: str
+    username: str
+    created_at: datetime
+
 class RSVPResponse(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     wedding_id: str
@@ -96,6 +193,9 @@ class RSVPResponse(BaseModel):
     guest_count: int = 1
     dietary_restrictions: Optional[str] = ""
     special_message: Optional[str] = ""
+    guest_email_normalized: Optional[str] = ""  # dedupe key, see rsvp_upsert_filter
+    idempotency_key: Optional[str] = None  # optional client-supplied retry key
+    guest_id: Optional[str] = None  # set when the guest RSVPs with an invitation code
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
 
 class WeddingData(BaseModel):
@@ -199,7 +299,7 @@ async def get_current_user_simple(session_id: str = None):
             users_coll, weddings_coll = await get_collections()
             if users_coll is not None:
                 sessions_collection = database.sessions
-                session_data = await sessions_collection.find_one({"session_id": session_id})
+                session_data = await find_projected(sessions_collection, {"session_id": session_id}, "session")
                 if session_data:
                     # Restore to memory cache
                     active_sessions[session_id] = session_data
@@ -215,7 +315,7 @@ async def get_current_user_simple(session_id: str = None):
         )
     
     users_coll, weddings_coll = await get_collections()
-    user_data = await users_coll.find_one({"id": session["user_id"]})
+    user_data = await find_projected(users_coll, {"id": session["user_id"]}, "session_user")
     
     if not user_data:
         raise HTTPException(
@@ -223,15 +323,133 @@ async def get_current_user_simple(session_id: str = None):
             detail="User not found"
         )
     
-    return User(**user_data)
+    return CurrentUser(id=user_data["id"], username=user_data["username"], created_at=user_data["created_at"])
+
+async def get_credential_session_id(
+    authorization: Optional[str] = Header(None),
+    session_cookie: Optional[str] = Cookie(None, alias=SESSION_COOKIE_NAME),
+) -> Optional[str]:
+    """Session id from the Authorization header or cookie only - for routes
+    whose URLs end up in logs (a ?session_id= is ignored)"""
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() in ("bearer", "session") and token.strip():
+            return token.strip()
+    return session_cookie
+
+async def get_session_id(
+    authorization: Optional[str] = Header(None),
+    session_cookie: Optional[str] = Cookie(None, alias=SESSION_COOKIE_NAME),
+    session_id: Optional[str] = None,
+) -> Optional[str]:
+    """Resolve the session id from the Authorization header, cookie or legacy query param"""
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() in ("bearer", "session") and token.strip():
+            return token.strip()
+    if session_cookie:
+        return session_cookie
+    return session_id
+
+# Owners stay on the primary for the staleness bound after each write so their
+# own public pages never show an older version than the dashboard
+recent_writers = RecentWriters(window_seconds=max_staleness_seconds())
+read_routing_stats = {"primary": 0, "public": 0}
+
+async def get_read_db(session_id: Optional[str] = Depends(get_session_id)):
+    """Database handle for a staleness-tolerant public read"""
+    target = public_db
+    if public_db is None or PUBLIC_READ_MODE == "primary":
+        target = database
+    elif session_id:
+        # Sessions from another worker aren't in memory - treat as a recent writer
+        session = active_sessions.get(session_id)
+        if session is None or recent_writers.wrote_recently(session["user_id"]):
+            target = database
+    read_routing_stats["primary" if target is database else "public"] += 1
+    return target
+
+def set_session_cookie(response: Response, session_id: str):
+    response.set_cookie(
+        key=SESSION_COOKIE_NAME,
+        value=session_id,
+        max_age=SESSION_COOKIE_MAX_AGE,
+        httponly=True,
+        samesite="lax",
+    )
+
+def compute_etag(data) -> str:
+    """Weak ETag over the JSON representation of a response body"""
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+# shareable_id -> wedding id resolver. shareable_ids never change once
+# assigned, so resolved ids are cached for the life of the process (LRU-bounded).
+SHAREABLE_ID_CACHE_SIZE = int(os.getenv("SHAREABLE_ID_CACHE_SIZE", "100000"))
+shareable_id_cache = OrderedDict()
+
+def remember_shareable_id(shareable_id: str, wedding_id: str):
+    shareable_id_cache[shareable_id] = wedding_id
+    shareable_id_cache.move_to_end(shareable_id)
+    if len(shareable_id_cache) > SHAREABLE_ID_CACHE_SIZE:
+        shareable_id_cache.popitem(last=False)
+
+async def resolve_shareable_id(shareable_id: str) -> Optional[str]:
+    """Wedding id for a shareable_id, or None if no wedding has it"""
+    wedding_id = shareable_id_cache.get(shareable_id)
+    if wedding_id is not None:
+        shareable_id_cache.move_to_end(shareable_id)
+        return wedding_id
+    
+    users_coll, weddings_coll = await get_collections()
+    wedding = await find_projected(weddings_coll, {"shareable_id": shareable_id}, "wedding_id")
+    if not wedding:
+        # Misses are not cached - the wedding may be created later
+        return None
+    remember_shareable_id(shareable_id, wedding["id"])
+    return wedding["id"]
+
+# Any wedding key (id or shareable_id) -> wedding id, for the live feed: guests
+# post under whichever key their link carries, the feed is keyed by wedding id
+wedding_key_cache = OrderedDict()
+
+async def canonical_wedding_id(wedding_key: str) -> str:
+    """The wedding id behind an id or shareable_id (the key itself if unknown)"""
+    wedding_id = shareable_id_cache.get(wedding_key) or wedding_key_cache.get(wedding_key)
+    if wedding_id is not None:
+        return wedding_id
+    users_coll, weddings_coll = await get_collections()
+    wedding = await find_projected(weddings_coll, wedding_key_query(wedding_key), "wedding_id")
+    if not wedding:
+        return wedding_key
+    wedding_key_cache[wedding_key] = wedding["id"]
+    if len(wedding_key_cache) > SHAREABLE_ID_CACHE_SIZE:
+        wedding_key_cache.popitem(last=False)
+    return wedding["id"]
+
+async def require_shareable_wedding_id(shareable_id: str) -> str:
+    wedding_id = await resolve_shareable_id(shareable_id)
+    if not wedding_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wedding not found"
+        )
+    return wedding_id
 
 # Auth Routes - MongoDB-based
 @api_router.post("/auth/register", response_model=AuthResponse)
-async def register(user_data: UserRegister):
+async def register(user_data: UserRegister, response: Response):
     users_coll, weddings_coll = await get_collections()
     
     # Check if user already exists
-    existing_user = await users_coll.find_one({"username": user_data.username})
+    existing_user = await find_projected(users_coll, {"username": user_data.username}, "exists")
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -298,7 +516,12 @@ async def register(user_data: UserRegister):
     wedding_dict["created_at"] = wedding_dict["created_at"].isoformat()
     wedding_dict["updated_at"] = wedding_dict["updated_at"].isoformat()
     
-    await weddings_coll.insert_one(wedding_dict)
+    # The new wedding's arrays are all empty - only the core document is stored
+    await weddings_coll.insert_one(split_arrays(wedding_dict)[0])
+    wedding_id_filter.add(default_wedding_data.id, shareable_id)
+    remember_shareable_id(shareable_id, default_wedding_data.id)
+    recent_writers.mark(user.id)
+    forget_public_bootstrap(default_wedding_data.id, user.username, f"share/{shareable_id}")
     
     # Also save to JSON as backup
     weddings = load_json_file(WEDDINGS_FILE)
@@ -307,6 +530,7 @@ async def register(user_data: UserRegister):
     
     # Create simple session
     session_id = await create_simple_session(user.id)
+    set_session_cookie(response, session_id)
     
     return AuthResponse(
         session_id=session_id,
@@ -316,14 +540,14 @@ async def register(user_data: UserRegister):
     )
 
 @api_router.post("/auth/login", response_model=AuthResponse)
-async def login(user_data: UserLogin):
+async def login(user_data: UserLogin, response: Response):
     users_coll, weddings_coll = await get_collections()
     
     # Simple string comparison authentication
-    user_found = await users_coll.find_one({
+    user_found = await find_projected(users_coll, {
         "username": user_data.username,
         "password": user_data.password
-    })
+    }, "login")
     
     if not user_found:
         raise HTTPException(
@@ -333,6 +557,7 @@ async def login(user_data: UserLogin):
     
     # Create simple session
     session_id = await create_simple_session(user_found["id"])
+    set_session_cookie(response, session_id)
     
     return AuthResponse(
         session_id=session_id,
@@ -343,8 +568,8 @@ async def login(user_data: UserLogin):
 
 # MongoDB-based Wedding Data Routes
 @api_router.post("/wedding")
-async def create_wedding_data(request_data: dict):
-    session_id = request_data.get('session_id')
+async def create_wedding_data(request_data: dict, session_id: Optional[str] = Depends(get_session_id)):
+    session_id = request_data.get('session_id') or session_id
     if not session_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -355,7 +580,7 @@ async def create_wedding_data(request_data: dict):
     users_coll, weddings_coll = await get_collections()
     
     # Check if user already has wedding data
-    existing_wedding = await weddings_coll.find_one({"user_id": current_user.id})
+    existing_wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "exists")
     if existing_wedding:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -379,9 +604,15 @@ async def create_wedding_data(request_data: dict):
     wedding_dict["created_at"] = wedding_dict["created_at"].isoformat()
     wedding_dict["updated_at"] = wedding_dict["updated_at"].isoformat()
     
-    # Save to MongoDB
-    result = await weddings_coll.insert_one(wedding_dict)
+    # Save to MongoDB - gallery/registry/RSVP arrays go to their own collections
+    wedding_core, wedding_arrays = split_arrays(wedding_dict)
+    result = await weddings_coll.insert_one(wedding_core)
+    await save_arrays(database, wedding.id, wedding_arrays)
     wedding_dict["_id"] = str(result.inserted_id)
+    wedding_id_filter.add(wedding.id, shareable_id)
+    remember_shareable_id(shareable_id, wedding.id)
+    recent_writers.mark(current_user.id)
+    forget_public_bootstrap(wedding.id, current_user.username, f"share/{shareable_id}")
     
     # Also save to JSON as backup
     weddings = load_json_file(WEDDINGS_FILE)
@@ -393,8 +624,8 @@ async def create_wedding_data(request_data: dict):
     return response_data
 
 @api_router.put("/wedding")
-async def update_wedding_data(request_data: dict):
-    session_id = request_data.get('session_id')
+async def update_wedding_data(request_data: dict, session_id: Optional[str] = Depends(get_session_id)):
+    session_id = request_data.get('session_id') or session_id
     if not session_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -405,7 +636,7 @@ async def update_wedding_data(request_data: dict):
     users_coll, weddings_coll = await get_collections()
     
     # Find existing wedding
-    existing_wedding = await weddings_coll.find_one({"user_id": current_user.id})
+    existing_wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "wedding_update")
     if not existing_wedding:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -426,11 +657,16 @@ async def update_wedding_data(request_data: dict):
     if "created_at" in existing_wedding:
         updated_data["created_at"] = existing_wedding["created_at"]
     
-    # Update in MongoDB
-    await weddings_coll.update_one(
-        {"user_id": current_user.id},
-        {"$set": updated_data}
-    )
+    # Update in MongoDB - only changed array items are written, and arrays
+    # still stored inline from before the split are moved out
+    wedding_core, wedding_arrays = split_arrays(updated_data)
+    await save_arrays(database, existing_wedding["id"], wedding_arrays)
+    wedding_update = {"$set": wedding_core}
+    if wedding_arrays:
+        wedding_update["$unset"] = {field: "" for field in wedding_arrays}
+    await weddings_coll.update_one({"user_id": current_user.id}, wedding_update)
+    recent_writers.mark(current_user.id)
+    forget_public_bootstrap(existing_wedding["id"])
     
     # Also update JSON backup
     weddings = load_json_file(WEDDINGS_FILE)
@@ -440,54 +676,61 @@ async def update_wedding_data(request_data: dict):
     return updated_data
 
 @api_router.get("/wedding")
-async def get_wedding_data(session_id: str):
+async def get_wedding_data(request: Request, response: Response, session_id: Optional[str] = Depends(get_session_id)):
     current_user = await get_current_user_simple(session_id)
     users_coll, weddings_coll = await get_collections()
     
-    wedding_data = await weddings_coll.find_one({"user_id": current_user.id})
-    if not wedding_data:
+    response_data = await find_projected(weddings_coll, {"user_id": current_user.id}, "wedding_owner")
+    if not response_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wedding data not found"
         )
-    
-    # Remove _id from response
-    response_data = {k: v for k, v in wedding_data.items() if k != "_id"}
+    await attach_arrays(database, response_data)
+    
+    # Private caching: the dashboard revalidates with If-None-Match instead of
+    # re-downloading the whole document on every mount
+    etag = compute_etag(response_data)
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization, Cookie",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    response.headers.update(cache_headers)
     return response_data
 
 @api_router.get("/wedding/public/{wedding_id}")
-async def get_public_wedding_data(wedding_id: str):
-    users_coll, weddings_coll = await get_collections()
-    
+async def get_public_wedding_data(wedding_id: str, read_db=Depends(get_read_db)):
     # Try MongoDB first
-    wedding = await weddings_coll.find_one({"id": wedding_id})
+    wedding = await find_projected(read_db.weddings, {"id": wedding_id}, "wedding_public")
+    if wedding:
+        return await attach_arrays(read_db, wedding)
     
-    if not wedding:
-        # Fallback to JSON file
-        weddings = load_json_file(WEDDINGS_FILE)
-        if wedding_id not in weddings:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Wedding not found"
-            )
-        wedding = weddings[wedding_id]
+    # Fallback to JSON file
+    weddings = load_json_file(WEDDINGS_FILE)
+    if wedding_id not in weddings:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wedding not found"
+        )
     
     # Remove sensitive data for public access
-    public_data = {k: v for k, v in wedding.items() if k not in ["user_id", "_id"]}
+    public_data = {k: v for k, v in weddings[wedding_id].items() if k not in ["user_id", "_id"]}
     return public_data
 
 # Add shareable link endpoint 
 @api_router.get("/wedding/share/{shareable_id}")
-async def get_wedding_by_shareable_id(shareable_id: str):
-    users_coll, weddings_coll = await get_collections()
-    
+async def get_wedding_by_shareable_id(shareable_id: str, read_db=Depends(get_read_db)):
     # Search for wedding by shareable_id ONLY (8-character system)
-    wedding = await weddings_coll.find_one({"shareable_id": shareable_id})
+    wedding = None
+    wedding_id = await resolve_shareable_id(shareable_id)
+    if wedding_id:
+        wedding = await find_projected(read_db.weddings, {"id": wedding_id}, "wedding_public")
     
     if wedding:
-        # Remove sensitive data for public access
-        public_data = {k: v for k, v in wedding.items() if k not in ["user_id", "_id"]}
-        return public_data
+        return await attach_arrays(read_db, wedding)
     
     # Fallback to JSON file for shareable_id ONLY
     weddings = load_json_file(WEDDINGS_FILE)
@@ -500,12 +743,10 @@ async def get_wedding_by_shareable_id(shareable_id: str):
 
 # Username-based routing endpoints
 @api_router.get("/wedding/user/{username}")
-async def get_wedding_by_username(username: str):
+async def get_wedding_by_username(username: str, read_db=Depends(get_read_db)):
     """Get wedding data by username for personalized URLs"""
-    users_coll, weddings_coll = await get_collections()
-    
     # Find user by username
-    user = await users_coll.find_one({"username": username})
+    user = await find_projected(read_db.users, {"username": username}, "user_id")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -513,22 +754,17 @@ async def get_wedding_by_username(username: str):
         )
     
     # Get user's wedding data
-    wedding = await weddings_coll.find_one({"user_id": user["id"]})
+    wedding = await find_projected(read_db.weddings, {"user_id": user["id"]}, "wedding_public")
     if not wedding:
         # Return default wedding data if user hasn't customized yet
         return get_default_wedding_data()
-    
-    # Remove sensitive data for public access
-    public_data = {k: v for k, v in wedding.items() if k not in ["user_id", "_id"]}
-    return public_data
+    return await attach_arrays(read_db, wedding)
 
 @api_router.get("/wedding/user/{username}/{section}")
-async def get_wedding_section_by_username(username: str, section: str):
+async def get_wedding_section_by_username(username: str, section: str, read_db=Depends(get_read_db)):
     """Get specific section data by username for section-based URLs"""
-    users_coll, weddings_coll = await get_collections()
-    
     # Find user by username
-    user = await users_coll.find_one({"username": username})
+    user = await find_projected(read_db.users, {"username": username}, "user_id")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -536,8 +772,10 @@ async def get_wedding_section_by_username(username: str, section: str):
         )
     
     # Get user's wedding data
-    wedding = await weddings_coll.find_one({"user_id": user["id"]})
-    if not wedding:
+    wedding = await find_projected(read_db.weddings, {"user_id": user["id"]}, "wedding_public")
+    if wedding:
+        await attach_arrays(read_db, wedding)
+    else:
         # Return default wedding data if user hasn't customized yet
         wedding = get_default_wedding_data()
     
@@ -741,7 +979,7 @@ def get_default_wedding_data():
 
 # Get user profile - MongoDB version
 @api_router.get("/profile")
-async def get_profile(session_id: str):
+async def get_profile(session_id: Optional[str] = Depends(get_session_id)):
     current_user = await get_current_user_simple(session_id)
     return {
         "id": current_user.id,
@@ -750,10 +988,174 @@ async def get_profile(session_id: str):
     }
 
 # RSVP Endpoints
+# Known-wedding filter - RSVP and guestbook writes for unknown wedding ids are
+# rejected before any insert (see wedding_filter.py). Both wedding ids and
+# shareable_ids are valid targets since public pages post either.
+WEDDING_FILTER_REFRESH_SECONDS = int(os.getenv("WEDDING_FILTER_REFRESH_SECONDS", "30"))
+WEDDING_FILTER_NEGATIVE_TTL = float(os.getenv("WEDDING_FILTER_NEGATIVE_TTL", "5"))
+wedding_filter_refresher_task = None
+
+async def wedding_exists(wedding_id: str) -> bool:
+    users_coll, weddings_coll = await get_collections()
+    wedding = await find_projected(weddings_coll, wedding_key_query(wedding_id), "exists")
+    return wedding is not None
+
+wedding_id_filter = WeddingIdFilter(exact_check=wedding_exists, negative_ttl=WEDDING_FILTER_NEGATIVE_TTL)
+
+async def refresh_wedding_id_filter():
+    users_coll, weddings_coll = await get_collections()
+    ids = []
+    async for wedding in weddings_coll.find({}, PROJECTIONS["wedding_keys"]):
+        ids.append(wedding.get("id"))
+        ids.append(wedding.get("shareable_id"))
+    wedding_id_filter.rebuild(ids)
+
+async def run_wedding_filter_refresher():
+    # Periodic rebuilds pick up weddings created by other workers - until then
+    # writes to them are rejected, hence the short interval
+    while True:
+        try:
+            if database is not None:
+                await refresh_wedding_id_filter()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Wedding id filter refresh failed: {e}")
+        await asyncio.sleep(WEDDING_FILTER_REFRESH_SECONDS)
+
+async def ensure_known_wedding(wedding_id: str):
+    if not await wedding_id_filter.contains(wedding_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wedding not found"
+        )
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+# Fields that only the first submission of an RSVP sets
+RSVP_INSERT_ONLY_FIELDS = ("id", "submitted_at")
+
+def rsvp_upsert_filter(rsvp: dict) -> Optional[dict]:
+    """Identity of an RSVP for idempotent resubmission, or None for a plain insert"""
+    filters = rsvp_identity_filters(rsvp)
+    return filters[0] if filters else None
+
+def rsvp_upsert_update(rsvp: dict) -> dict:
+    return {
+        "$set": {k: v for k, v in rsvp.items() if k not in RSVP_INSERT_ONLY_FIELDS},
+        "$setOnInsert": {k: rsvp[k] for k in RSVP_INSERT_ONLY_FIELDS},
+    }
+
+async def upsert_rsvp(rsvp_dict: dict) -> str:
+    """Insert or update an RSVP keyed on its dedupe identity; returns the stored RSVP id"""
+    rsvps_collection = database.rsvps
+    upsert_filter = rsvp_upsert_filter(rsvp_dict)
+    
+    if upsert_filter is None:
+        await rsvps_collection.insert_one(rsvp_dict)
+        await increment_rsvp_counters(rsvp_dict["wedding_id"], rsvp_counter_increments(rsvp_dict))
+        return rsvp_dict["id"]
+    
+    update = rsvp_upsert_update(rsvp_dict)
+    update["$set"]["updated_at"] = datetime.utcnow().isoformat()
+    try:
+        previous = await rsvps_collection.find_one_and_update(
+            upsert_filter, update, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        previous = await merge_conflicting_rsvp(rsvp_dict, update)
+        if previous is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This RSVP conflicts with another guest's response"
+            )
+    
+    await increment_rsvp_counters(rsvp_dict["wedding_id"], rsvp_counter_change(previous, rsvp_dict))
+    
+    return previous["id"] if previous is not None else rsvp_dict["id"]
+
+async def merge_conflicting_rsvp(rsvp_dict: dict, update: Optional[dict] = None) -> Optional[dict]:
+    """Write an RSVP whose upsert hit a unique index into the RSVP it collided with.
+    
+    Either a concurrent retry of the same RSVP got there first, or another
+    identity matched: e.g. an invitation-code RSVP from an email that already
+    responded, which attaches the guest_id to that RSVP. Returns the stored RSVP
+    as it was before the write, or None if no identity could take it.
+    """
+    update = update or rsvp_upsert_update(rsvp_dict)
+    for identity in rsvp_identity_filters(rsvp_dict):
+        try:
+            previous = await database.rsvps.find_one_and_update(
+                identity, update, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Merging here would collide with yet another RSVP
+            continue
+        if previous is not None:
+            return previous
+    return None
+
+async def collapse_duplicate_rsvps():
+    """Backfill dedupe keys, keep the latest RSVP per (wedding_id, email) and add the unique indexes"""
+    rsvps_collection = database.rsvps
+    await rsvps_collection.update_many(
+        {"guest_email_normalized": {"$exists": False}},
+        [{"$set": {"guest_email_normalized": {"$toLower": {"$trim": {"input": {"$ifNull": ["$guest_email", ""]}}}}}}]
+    )
+    
+    pipeline = [
+        {"$match": {"guest_email_normalized": {"$gt": ""}}},
+        {"$sort": {"submitted_at": -1}},
+        {"$group": {
+            "_id": {"wedding_id": "$wedding_id", "email": "$guest_email_normalized"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in rsvps_collection.aggregate(pipeline, allowDiskUse=True):
+        # ids are newest first - the latest submission wins
+        result = await rsvps_collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    
+    # The unique rsvps indexes could not be built while duplicates existed
+    await apply_indexes(database, ["rsvps"])
+    
+    if removed:
+        logger.info(f"🧹 Collapsed {removed} duplicate RSVP(s)")
+        await reconcile_rsvp_counters()
+    return removed
+
+# One-off migration for databases written before RSVPs were deduplicated: it
+# deletes all but the latest RSVP per guest email, so it only runs when asked
+RSVP_DEDUPE_ON_STARTUP = os.getenv("RSVP_DEDUPE_ON_STARTUP", "false").lower() == "true"
+rsvp_dedupe_task = None
+
+async def run_rsvp_dedupe_job():
+    try:
+        await collapse_duplicate_rsvps()
+    except Exception as e:
+        logger.error(f"❌ RSVP duplicate collapse failed: {e}")
+
 @api_router.post("/rsvp")
-async def submit_rsvp(rsvp_data: dict):
+async def submit_rsvp(rsvp_data: dict, idempotency_key: Optional[str] = Header(None)):
     users_coll, weddings_coll = await get_collections()
     
+    # Invitation codes identify the guest (and wedding) on the couple's list
+    guest = None
+    if rsvp_data.get('invitation_code'):
+        guest = await resolve_invitation_code(rsvp_data['invitation_code'])
+        rsvp_data = {
+            **rsvp_data,
+            "wedding_id": guest["wedding_id"],
+            "guest_name": rsvp_data.get('guest_name') or guest.get("name", ""),
+            "guest_email": rsvp_data.get('guest_email') or guest.get("email", ""),
+        }
+    else:
+        await ensure_known_wedding(rsvp_data.get('wedding_id', ''))
+    
     # Create RSVP response
     rsvp_response = RSVPResponse(
         wedding_id=rsvp_data.get('wedding_id', ''),
@@ -763,61 +1165,478 @@ async def submit_rsvp(rsvp_data: dict):
         attendance=rsvp_data.get('attendance', ''),
         guest_count=int(rsvp_data.get('guest_count', 1)),
         dietary_restrictions=rsvp_data.get('dietary_restrictions', ''),
-        special_message=rsvp_data.get('special_message', '')
+        special_message=rsvp_data.get('special_message', ''),
+        guest_email_normalized=normalize_email(rsvp_data.get('guest_email', '')),
+        idempotency_key=rsvp_data.get('idempotency_key') or idempotency_key,
+        guest_id=guest["id"] if guest else None
     )
     
     # Convert to dict
     rsvp_dict = rsvp_response.dict()
     rsvp_dict["submitted_at"] = rsvp_dict["submitted_at"].isoformat()
+    for optional_key in ("idempotency_key", "guest_id"):
+        if not rsvp_dict[optional_key]:
+            # Keep unset keys out of the document so the partial unique indexes ignore it
+            del rsvp_dict[optional_key]
+    
+    # Queue mode: acknowledge now, the ingest task writes it with the next batch.
+    # No lookup on the request path - a resubmission is collapsed into the
+    # guest's stored RSVP by the batch's upsert (which keeps the stored id)
+    if rsvp_ingest_queue is not None:
+        try:
+            rsvp_id = rsvp_ingest_queue.submit(rsvp_dict)
+        except IngestQueueFull as e:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"success": False, "message": str(e)},
+                headers={"Retry-After": str(RSVP_QUEUE_RETRY_AFTER)}
+            )
+        return {"success": True, "message": "RSVP submitted successfully", "rsvp_id": rsvp_id, "queued": True}
     
-    # Store RSVP in separate collection
-    rsvps_collection = database.rsvps
-    await rsvps_collection.insert_one(rsvp_dict)
+    # Store RSVP in separate collection - resubmissions update the existing RSVP
+    # and the per-wedding headline counters are kept in step with the write
+    rsvp_id = await upsert_rsvp(rsvp_dict)
+    await publish_live_event(rsvp_dict["wedding_id"], "rsvp", {**rsvp_dict, "id": rsvp_id})
     
-    return {"success": True, "message": "RSVP submitted successfully", "rsvp_id": rsvp_response.id}
+    return {"success": True, "message": "RSVP submitted successfully", "rsvp_id": rsvp_id}
 
-@api_router.get("/rsvp/{wedding_id}")
-async def get_wedding_rsvps(wedding_id: str):
-    """Get all RSVPs for a specific wedding (for admin/couple view)"""
-    users_coll, weddings_coll = await get_collections()
+# RSVP ingestion mode: "direct" inserts inline, "queue" batches inserts in the
+# background (see rsvp_ingest.py) for deadline-day surges
+RSVP_INGEST_MODE = os.getenv("RSVP_INGEST_MODE", "direct")
+RSVP_QUEUE_MAX_SIZE = int(os.getenv("RSVP_QUEUE_MAX_SIZE", "10000"))
+RSVP_QUEUE_BATCH_SIZE = int(os.getenv("RSVP_QUEUE_BATCH_SIZE", "500"))
+RSVP_QUEUE_FLUSH_INTERVAL = float(os.getenv("RSVP_QUEUE_FLUSH_INTERVAL", "0.05"))
+RSVP_QUEUE_RETRY_AFTER = int(os.getenv("RSVP_QUEUE_RETRY_AFTER", "2"))
+RSVP_QUEUE_DRAIN_SECONDS = float(os.getenv("RSVP_QUEUE_DRAIN_SECONDS", "30"))
+rsvp_ingest_queue = None
+
+async def increment_rsvp_counters_for_batch(changes: list):
+    """Fold a batch of (previous or None, written RSVP) pairs into one $inc per wedding"""
+    per_wedding = {}
+    for previous, rsvp in changes:
+        totals = per_wedding.setdefault(rsvp["wedding_id"], {})
+        for field, delta in rsvp_counter_change(previous, rsvp).items():
+            totals[field] = totals.get(field, 0) + delta
+    for wedding_id, increments in per_wedding.items():
+        await increment_rsvp_counters(wedding_id, {field: delta for field, delta in increments.items() if delta})
+
+async def handle_rsvp_batch_inserted(rsvps: list):
+    await increment_rsvp_counters_for_batch([(None, rsvp) for rsvp in rsvps])
+    for rsvp in rsvps:
+        await publish_live_event(rsvp["wedding_id"], "rsvp", rsvp)
+
+async def handle_rsvp_batch_updated(changes: list):
+    await increment_rsvp_counters_for_batch(changes)
+    for previous, rsvp in changes:
+        await publish_live_event(rsvp["wedding_id"], "rsvp", {**rsvp, "id": previous["id"]})
+
+def start_rsvp_ingest_queue():
+    global rsvp_ingest_queue
+    if RSVP_INGEST_MODE != "queue" or database is None:
+        return
+    rsvp_ingest_queue = RSVPIngestQueue(
+        collection_getter=lambda: database.rsvps,
+        upsert_filter=rsvp_upsert_filter,
+        upsert_update=rsvp_upsert_update,
+        on_inserted=handle_rsvp_batch_inserted,
+        on_updated=handle_rsvp_batch_updated,
+        on_conflict=merge_conflicting_rsvp,
+        max_size=RSVP_QUEUE_MAX_SIZE,
+        batch_size=RSVP_QUEUE_BATCH_SIZE,
+        flush_interval=RSVP_QUEUE_FLUSH_INTERVAL,
+    )
+    rsvp_ingest_queue.start()
+    logger.info(f"✅ RSVP ingestion queue started (max {RSVP_QUEUE_MAX_SIZE}, batch {RSVP_QUEUE_BATCH_SIZE})")
+
+# RSVP counters - one small document per wedding, maintained with $inc on every
+# RSVP write so headline stats are a single indexed lookup. The reconciler below
+# recomputes them from the rsvps collection to correct any drift.
+RSVP_COUNTER_FIELDS = ("responses", "attending", "not_attending", "total_guests")
+RSVP_COUNTER_RECONCILE_SECONDS = int(os.getenv("RSVP_COUNTER_RECONCILE_SECONDS", "600"))
+rsvp_counter_reconciler_task = None
+
+def rsvp_counter_increments(rsvp: dict, sign: int = 1) -> dict:
+    """Counter deltas contributed by a single RSVP document"""
+    increments = {"responses": sign}
+    if rsvp.get("attendance") == "yes":
+        increments["attending"] = sign
+        increments["total_guests"] = sign * int(rsvp.get("guest_count") or 1)
+    elif rsvp.get("attendance") == "no":
+        increments["not_attending"] = sign
+    return increments
+
+def rsvp_counter_change(previous: Optional[dict], rsvp: dict) -> dict:
+    """Counter deltas for writing rsvp over previous: a new RSVP adds its
+    contribution, a resubmission swaps the old contribution for the new one
+    (nothing at all for an exact retry)"""
+    increments = rsvp_counter_increments(rsvp)
+    if previous is not None:
+        for field, delta in rsvp_counter_increments(previous, sign=-1).items():
+            increments[field] = increments.get(field, 0) + delta
+    return {field: delta for field, delta in increments.items() if delta}
+
+async def increment_rsvp_counters(wedding_id: str, increments: dict):
+    if not increments:
+        return
+    try:
+        await database.rsvp_counters.update_one(
+            {"wedding_id": wedding_id},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow().isoformat()}},
+            upsert=True
+        )
+    except Exception as e:
+        # The reconciler will repair the counters on its next pass
+        logger.error(f"❌ Failed to update RSVP counters for {wedding_id}: {e}")
+
+async def reconcile_rsvp_counters():
+    """Recompute every wedding's RSVP counters from the rsvps collection.
+    
+    Counters bumped while the pass runs are left alone (their $inc may not be
+    in the aggregation yet) - the next pass picks them up.
+    """
+    pass_started = datetime.utcnow().isoformat()
+    untouched_since_start = {"$or": [{"updated_at": {"$lt": pass_started}}, {"updated_at": {"$exists": False}}]}
+    pipeline = [{"$group": {"_id": "$wedding_id", **RSVP_COUNT_ACCUMULATORS}}]
+    corrected = 0
+    seen = set()
+    async for row in database.rsvps.aggregate(pipeline):
+        seen.add(row["_id"])
+        counts = {field: row[field] for field in RSVP_COUNTER_FIELDS}
+        stored = await database.rsvp_counters.find_one(
+            {"wedding_id": row["_id"]}, {"_id": 0, **{field: 1 for field in RSVP_COUNTER_FIELDS}}
+        )
+        if stored is None:
+            # A concurrent first $inc wins over the insert
+            result = await database.rsvp_counters.update_one(
+                {"wedding_id": row["_id"]}, {"$setOnInsert": counts}, upsert=True
+            )
+            corrected += result.upserted_id is not None
+            continue
+        if all(stored.get(field, 0) == counts[field] for field in RSVP_COUNTER_FIELDS):
+            continue
+        result = await database.rsvp_counters.update_one(
+            {"wedding_id": row["_id"], **untouched_since_start},
+            {"$set": counts}
+        )
+        corrected += result.modified_count
     
-    # Get RSVPs for this wedding
+    # Counters for weddings whose RSVPs have all been removed (not ones created mid-pass)
+    stale = await database.rsvp_counters.delete_many({"wedding_id": {"$nin": list(seen)}, **untouched_since_start})
+    corrected += stale.deleted_count
+    return corrected
+
+async def run_rsvp_counter_reconciler():
+    while True:
+        try:
+            await asyncio.sleep(RSVP_COUNTER_RECONCILE_SECONDS)
+            if database is not None and mongo_breaker.state != "open":
+                corrected = await reconcile_rsvp_counters()
+                if corrected:
+                    logger.info(f"🔧 Reconciled RSVP counters for {corrected} wedding(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ RSVP counter reconciliation failed: {e}")
+
+@api_router.get("/rsvp/{wedding_id}/counts")
+async def get_rsvp_counts(wedding_id: str):
+    """Headline RSVP numbers in constant time (dashboard header, public badge)"""
+    counters = await database.rsvp_counters.find_one(
+        {"wedding_id": wedding_id},
+        {"_id": 0, **{field: 1 for field in RSVP_COUNTER_FIELDS}}
+    )
+    counters = counters or {}
+    return {
+        "success": True,
+        "wedding_id": wedding_id,
+        **{field: counters.get(field, 0) for field in RSVP_COUNTER_FIELDS}
+    }
+
+@api_router.get("/rsvp/{wedding_id}/summary")
+async def get_rsvp_summary(wedding_id: str):
+    """Get RSVP statistics for a wedding without transferring the RSVP list"""
     rsvps_collection = database.rsvps
-    rsvps = await rsvps_collection.find({"wedding_id": wedding_id}).to_list(length=None)
+    results = await rsvps_collection.aggregate(rsvp_summary_pipeline(wedding_id)).to_list(length=1)
     
-    # Remove _id from response and format dates
-    response_data = []
-    for rsvp in rsvps:
-        clean_rsvp = {k: v for k, v in rsvp.items() if k != "_id"}
-        response_data.append(clean_rsvp)
+    facets = results[0] if results else {}
+    totals = facets.get("totals") or [{}]
+    totals = totals[0]
     
-    return {"success": True, "rsvps": response_data, "total_count": len(response_data)}
+    return {
+        "success": True,
+        "wedding_id": wedding_id,
+        "total": totals.get("responses", 0),
+        "attending": totals.get("attending", 0),
+        "not_attending": totals.get("not_attending", 0),
+        "total_guests": totals.get("total_guests", 0),
+        "dietary_restrictions": [
+            {"restriction": item["_id"], "count": item["count"], "guests": item["guests"]}
+            for item in facets.get("dietary_restrictions", [])
+        ],
+    }
 
-@api_router.get("/rsvp/shareable/{shareable_id}")  
-async def get_rsvps_by_shareable_id(shareable_id: str):
-    """Get RSVPs using shareable ID (for dashboard admin view)"""
-    users_coll, weddings_coll = await get_collections()
+# RSVP listing is keyset-paginated on (submitted_at, id) so each page is a
+# bounded range scan of the (wedding_id, submitted_at, id) index
+RSVP_PAGE_DEFAULT_LIMIT = 100
+RSVP_PAGE_MAX_LIMIT = 500
+
+def parse_keyset_cursor(cursor: Optional[str]):
+    """Split a "<timestamp>,<id>" cursor into its two parts"""
+    if not cursor:
+        return None
+    timestamp, sep, doc_id = cursor.rpartition(",")
+    if not sep or not timestamp or not doc_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor, expected '<timestamp>,<id>'"
+        )
+    return timestamp, doc_id
+
+async def list_rsvps_page(read_db, wedding_id: str, after: Optional[str], limit: int, attendance: Optional[str]):
+    limit = max(1, min(limit, RSVP_PAGE_MAX_LIMIT))
+    query = rsvp_page_query(wedding_id, parse_keyset_cursor(after), attendance)
     
-    # First find the wedding by shareable_id
-    wedding = await weddings_coll.find_one({"shareable_id": shareable_id})
+    rsvps_collection = read_db.rsvps
+    cursor = rsvps_collection.find(query, {"_id": 0}).sort(RSVP_PAGE_SORT).limit(limit + 1)
+    rsvps = await cursor.to_list(length=limit + 1)
     
-    if not wedding:
+    next_cursor = None
+    if len(rsvps) > limit:
+        rsvps = rsvps[:limit]
+        next_cursor = f"{rsvps[-1]['submitted_at']},{rsvps[-1]['id']}"
+    
+    # Totals come from the counters document rather than a count scan
+    counter_field = {"yes": "attending", "no": "not_attending"}.get(attendance, "responses")
+    counters = await read_db.rsvp_counters.find_one({"wedding_id": wedding_id}, {"_id": 0, counter_field: 1})
+    
+    return {
+        "success": True,
+        "rsvps": rsvps,
+        "total_count": (counters or {}).get(counter_field, 0),
+        "next_cursor": next_cursor,
+    }
+
+@api_router.get("/rsvp/{wedding_id}")
+async def get_wedding_rsvps(
+    wedding_id: str,
+    after: Optional[str] = None,
+    limit: int = RSVP_PAGE_DEFAULT_LIMIT,
+    attendance: Optional[str] = None,
+    read_db=Depends(get_read_db),
+):
+    """Get a page of RSVPs for a specific wedding (for admin/couple view)"""
+    return await list_rsvps_page(read_db, wedding_id, after, limit, attendance)
+
+@api_router.get("/rsvp/{wedding_id}/export")
+async def export_wedding_rsvps(wedding_id: str, format: str = "csv", session_id: Optional[str] = Depends(get_session_id)):
+    """Stream all RSVPs for the couple's wedding as CSV or NDJSON (for caterers/planners)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format, expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    # Guest names, emails and phone numbers - only for the wedding's owner
+    if wedding_id not in await get_owned_wedding_keys(session_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wedding not found"
         )
     
-    # Get RSVPs for this wedding
-    rsvps_collection = database.rsvps
-    rsvps = await rsvps_collection.find({"wedding_id": wedding["id"]}).to_list(length=None)
-    
-    # Remove _id from response
-    response_data = []
-    for rsvp in rsvps:
-        clean_rsvp = {k: v for k, v in rsvp.items() if k != "_id"}
-        response_data.append(clean_rsvp)
-    
-    return {"success": True, "rsvps": response_data, "total_count": len(response_data)}
+    cursor = export_cursor(database.rsvps, wedding_id)
+    filename = "".join(char for char in wedding_id if char.isascii() and (char.isalnum() or char in "-_"))
+    return StreamingResponse(
+        iter_export_chunks(cursor, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="rsvps-{filename}.{format}"'}
+    )
+
+@api_router.get("/rsvp/shareable/{shareable_id}")  
+async def get_rsvps_by_shareable_id(
+    shareable_id: str,
+    after: Optional[str] = None,
+    limit: int = RSVP_PAGE_DEFAULT_LIMIT,
+    attendance: Optional[str] = None,
+    read_db=Depends(get_read_db),
+):
+    """Get a page of RSVPs using shareable ID (for dashboard admin view)"""
+    # Resolve the wedding id (cached, projection-only lookup on a miss)
+    wedding_id = await require_shareable_wedding_id(shareable_id)
+    
+    return await list_rsvps_page(read_db, wedding_id, after, limit, attendance)
+
+# Guest list & invitation codes
+GUEST_UPLOAD_BATCH_SIZE = 500
+# No 0/O/1/I so codes survive being read aloud or typed from a printed card
+INVITATION_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+INVITATION_CODE_LENGTH = 8
+
+class Guest(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    wedding_id: str
+    name: str
+    email: Optional[str] = ""
+    email_normalized: Optional[str] = ""
+    phone: Optional[str] = ""
+    party_size: int = 1
+    invitation_code: str = Field(default_factory=lambda: generate_invitation_code())
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+def generate_invitation_code() -> str:
+    return "".join(secrets.choice(INVITATION_CODE_ALPHABET) for _ in range(INVITATION_CODE_LENGTH))
+
+async def resolve_invitation_code(code: str) -> dict:
+    guest = await database.guests.find_one(
+        invitation_code_query(code),
+        {"_id": 0, "id": 1, "wedding_id": 1, "name": 1, "email": 1}
+    )
+    if not guest:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invitation code not found"
+        )
+    return guest
+
+def guest_from_csv_row(wedding_id: str, row: dict) -> Optional[dict]:
+    row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+    if not row.get("name"):
+        return None
+    try:
+        party_size = int(row.get("party_size") or 1)
+    except ValueError:
+        party_size = 1
+    guest = Guest(
+        wedding_id=wedding_id,
+        name=row["name"],
+        email=row.get("email", ""),
+        email_normalized=normalize_email(row.get("email")),
+        phone=row.get("phone", ""),
+        party_size=party_size
+    )
+    guest_dict = guest.dict()
+    guest_dict["created_at"] = guest_dict["created_at"].isoformat()
+    return guest_dict
+
+def read_guest_rows(reader, wedding_id: str, limit: int) -> Tuple[List[dict], int]:
+    """Up to limit rows of an upload as guests, plus how many rows were unusable.
+    Blocking (the upload is spooled to disk), so it runs in a worker thread."""
+    guests = []
+    skipped = 0
+    for row in islice(reader, limit):
+        guest = guest_from_csv_row(wedding_id, row)
+        if guest is None:
+            skipped += 1
+        else:
+            guests.append(guest)
+    return guests, skipped
+
+# Re-uploading a row only refreshes these; the guest keeps its id and invitation code
+GUEST_UPLOAD_FIELDS = ("name", "email", "phone", "party_size")
+
+def guest_write(guest: dict):
+    """Upsert keyed on the guest's email, or a plain insert when there is none"""
+    if not guest["email_normalized"]:
+        return InsertOne(guest)
+    return UpdateOne(
+        guest_upsert_query(guest["wedding_id"], guest["email_normalized"]),
+        {
+            "$set": {field: guest[field] for field in GUEST_UPLOAD_FIELDS},
+            "$setOnInsert": {k: v for k, v in guest.items() if k not in GUEST_UPLOAD_FIELDS},
+        },
+        upsert=True
+    )
+
+async def upsert_guest_batch(guests: list) -> Tuple[int, int]:
+    """Write a batch of uploaded guests, regenerating any invitation codes that
+    collide; returns (inserted, updated)"""
+    guests_collection = database.guests
+    pending = guests
+    inserted = updated = 0
+    while pending:
+        try:
+            result = (await guests_collection.bulk_write([guest_write(guest) for guest in pending], ordered=False)).bulk_api_result
+            pending = []
+        except BulkWriteError as e:
+            result = e.details
+            errors = result.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            # A colliding code (or a concurrent upload of the same email, which
+            # the retry then matches as an update)
+            pending = [pending[error["index"]] for error in errors]
+            for guest in pending:
+                guest["invitation_code"] = generate_invitation_code()
+        inserted += result.get("nInserted", 0) + result.get("nUpserted", 0)
+        updated += result.get("nMatched", 0)
+    return inserted, updated
+
+async def get_owned_wedding_id(session_id: Optional[str]) -> str:
+    current_user = await get_current_user_simple(session_id)
+    users_coll, weddings_coll = await get_collections()
+    wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "wedding_id")
+    if not wedding:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wedding data not found"
+        )
+    return wedding["id"]
+
+@api_router.post("/guests/upload")
+async def upload_guest_list(file: UploadFile = File(...), session_id: Optional[str] = Depends(get_session_id)):
+    """Bulk-load the couple's guest list from a CSV (name, email, phone, party_size)"""
+    wedding_id = await get_owned_wedding_id(session_id)
+    
+    # UploadFile spools to disk, so rows are parsed incrementally from the
+    # spooled file (in a worker thread, off the event loop) and written in batches
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    inserted = updated = skipped = 0
+    while True:
+        try:
+            guests, unusable = await asyncio.to_thread(read_guest_rows, reader, wedding_id, GUEST_UPLOAD_BATCH_SIZE)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not read the guest list as a UTF-8 CSV file: {e}"
+            )
+        if not guests and not unusable:
+            break
+        # A guest listed twice in the file: the later row wins
+        unique = {guest["email_normalized"] or guest["id"]: guest for guest in guests}
+        skipped += unusable + len(guests) - len(unique)
+        batch_inserted, batch_updated = await upsert_guest_batch(list(unique.values()))
+        inserted += batch_inserted
+        updated += batch_updated
+    
+    return {"success": True, "inserted": inserted, "updated": updated, "skipped": skipped}
+
+@api_router.get("/guests")
+async def get_guest_responses(session_id: Optional[str] = Depends(get_session_id)):
+    """Invited-vs-responded view of the couple's guest list"""
+    wedding_id = await get_owned_wedding_id(session_id)
+    guests = await database.guests.aggregate(guest_responses_pipeline(wedding_id)).to_list(length=None)
+    
+    # Guests who answered from the RSVP form rather than their invitation code
+    unmatched = {}
+    for guest in guests:
+        email = normalize_email(guest.get("email"))
+        if not guest.get("rsvp") and email:
+            unmatched[email] = guest
+    if unmatched:
+        rsvps = await database.rsvps.find(
+            guest_email_rsvps_query(wedding_id, list(unmatched)),
+            {"_id": 0, "guest_email_normalized": 1, **{field: 1 for field in GUEST_RSVP_FIELDS}}
+        ).to_list(length=None)
+        for rsvp in rsvps:
+            unmatched[rsvp.pop("guest_email_normalized")]["rsvp"] = rsvp
+    
+    responded = [guest for guest in guests if guest.get("rsvp")]
+    return {
+        "success": True,
+        "guests": guests,
+        "invited": len(guests),
+        "responded": len(responded),
+        "attending": sum(1 for guest in responded if guest["rsvp"].get("attendance") == "yes"),
+        "awaiting": len(guests) - len(responded),
+    }
 
 # Guestbook Models
 class GuestbookMessage(BaseModel):
@@ -826,6 +1645,7 @@ class GuestbookMessage(BaseModel):
     name: str
     relationship: Optional[str] = ""
     message: str
+    status: str = "pending"  # pending -> published | flagged -> published | rejected
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Guestbook Endpoints
@@ -833,73 +1653,281 @@ class GuestbookMessage(BaseModel):
 async def create_guestbook_message(message_data: dict):
     """Create a new guestbook message"""
     users_coll, weddings_coll = await get_collections()
+    await ensure_known_wedding(message_data.get('wedding_id', ''))
     
     # Create guestbook message
     guestbook_message = GuestbookMessage(
         wedding_id=message_data.get('wedding_id', ''),
         name=message_data.get('name', ''),
         relationship=message_data.get('relationship', ''),
-        message=message_data.get('message', '')
+        message=message_data.get('message', ''),
+        status="pending" if MODERATION_ENABLED else "published"
     )
     
     # Convert to dict
     message_dict = guestbook_message.dict()
     message_dict["created_at"] = message_dict["created_at"].isoformat()
     
-    # Store message in guestbook collection
+    # Store message in guestbook collection - moderation workers publish it
     guestbook_collection = database.guestbook
     await guestbook_collection.insert_one(message_dict)
+    if MODERATION_ENABLED:
+        moderation_wakeup.set()
+    else:
+        await publish_live_event(message_dict["wedding_id"], "guestbook", message_dict)
     
-    return {"success": True, "message": "Guestbook message added successfully", "message_id": guestbook_message.id}
+    return {
+        "success": True,
+        "message": "Guestbook message added successfully",
+        "message_id": guestbook_message.id,
+        "status": message_dict["status"]
+    }
 
-@api_router.get("/guestbook/{wedding_id}")
-async def get_guestbook_messages(wedding_id: str):
-    """Get all guestbook messages for a specific wedding"""
-    users_coll, weddings_coll = await get_collections()
-    
-    # Get messages for this wedding
+# Guestbook moderation - posts are a single "pending" insert; a pool of
+# background workers claims pending messages in batches, runs them through the
+# ModerationFilter (see moderation.py) off the event loop and either publishes
+# them or flags them for the couple's moderation queue.
+MODERATION_ENABLED = os.getenv("MODERATION_ENABLED", "true").lower() == "true"
+MODERATION_WORKERS = int(os.getenv("MODERATION_WORKERS", "2"))
+MODERATION_BATCH_SIZE = int(os.getenv("MODERATION_BATCH_SIZE", "100"))
+MODERATION_POLL_SECONDS = float(os.getenv("MODERATION_POLL_SECONDS", "2"))
+MODERATION_CLAIM_TIMEOUT_SECONDS = int(os.getenv("MODERATION_CLAIM_TIMEOUT_SECONDS", "300"))
+moderation_filter = ModerationFilter.from_env()
+moderation_wakeup = asyncio.Event()
+moderation_tasks = []
+moderation_stats = {"published": 0, "flagged": 0, "batches": 0}
+
+async def claim_pending_messages(limit: int) -> list:
+    """Atomically move up to `limit` pending messages into this worker's claim"""
     guestbook_collection = database.guestbook
-    messages = await guestbook_collection.find({"wedding_id": wedding_id}).sort("created_at", -1).to_list(length=None)
-    
-    # Remove _id from response and format dates
-    response_data = []
-    for msg in messages:
-        clean_msg = {k: v for k, v in msg.items() if k != "_id"}
-        response_data.append(clean_msg)
-    
-    return {"success": True, "messages": response_data, "total_count": len(response_data)}
+    claim = str(uuid.uuid4())
+    pending = await guestbook_collection.find(
+        PENDING_MODERATION_QUERY, {"_id": 0, "id": 1}
+    ).sort(PENDING_MODERATION_SORT).limit(limit).to_list(length=limit)
+    if not pending:
+        return []
+    await guestbook_collection.update_many(
+        {"id": {"$in": [doc["id"] for doc in pending]}, "status": "pending"},
+        {"$set": {"status": "processing", "moderation_claim": claim, "claimed_at": datetime.utcnow().isoformat()}}
+    )
+    return await guestbook_collection.find({"moderation_claim": claim}, {"_id": 0}).to_list(length=limit)
 
-@api_router.get("/guestbook/shareable/{shareable_id}")  
-async def get_guestbook_by_shareable_id(shareable_id: str):
-    """Get guestbook messages using shareable ID"""
+async def moderate_batch(messages: list):
+    verdicts = await asyncio.to_thread(moderation_filter.check_batch, messages)
+    operations = []
+    for message, reasons in zip(messages, verdicts):
+        message["status"] = "flagged" if reasons else "published"
+        operations.append(UpdateOne(
+            {"id": message["id"], "moderation_claim": message["moderation_claim"]},
+            {"$set": {"status": message["status"], "moderation_reasons": reasons},
+             "$unset": {"moderation_claim": "", "claimed_at": ""}}
+        ))
+    result = await database.guestbook.bulk_write(operations, ordered=False)
+    
+    published_ids = {message["id"] for message in messages if message["status"] == "published"}
+    if result.modified_count < len(operations) and published_ids:
+        # The couple decided some of these meanwhile - only announce what is still published
+        published_ids = {
+            message["id"] async for message in database.guestbook.find(
+                {"id": {"$in": list(published_ids)}, "status": "published"}, {"_id": 0, "id": 1}
+            )
+        }
+    moderation_stats["batches"] += 1
+    for message in messages:
+        moderation_stats[message["status"]] += 1
+        if message["id"] in published_ids:
+            message.pop("moderation_claim", None)
+            message.pop("claimed_at", None)
+            await publish_live_event(message["wedding_id"], "guestbook", message)
+
+async def run_moderation_worker():
+    while True:
+        try:
+            if mongo_breaker.state == "open":
+                await asyncio.sleep(MODERATION_POLL_SECONDS)
+                continue
+            messages = await claim_pending_messages(MODERATION_BATCH_SIZE)
+            if messages:
+                await moderate_batch(messages)
+                continue
+            moderation_wakeup.clear()
+            try:
+                await asyncio.wait_for(moderation_wakeup.wait(), MODERATION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Guestbook moderation worker failed: {e}")
+            await asyncio.sleep(MODERATION_POLL_SECONDS)
+
+async def release_stale_moderation_claims():
+    """Return messages claimed by a worker that died mid-batch to the queue"""
+    while True:
+        try:
+            cutoff = (datetime.utcnow() - timedelta(seconds=MODERATION_CLAIM_TIMEOUT_SECONDS)).isoformat()
+            await database.guestbook.update_many(
+                {"status": "processing", "claimed_at": {"$lt": cutoff}},
+                {"$set": {"status": "pending"}, "$unset": {"moderation_claim": "", "claimed_at": ""}}
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Releasing stale moderation claims failed: {e}")
+        await asyncio.sleep(MODERATION_CLAIM_TIMEOUT_SECONDS)
+
+def start_moderation_workers():
+    if not MODERATION_ENABLED or database is None:
+        return
+    for _ in range(MODERATION_WORKERS):
+        moderation_tasks.append(asyncio.create_task(run_moderation_worker()))
+    moderation_tasks.append(asyncio.create_task(release_stale_moderation_claims()))
+    logger.info(f"✅ Guestbook moderation started with {MODERATION_WORKERS} worker(s)")
+
+async def get_owned_wedding_keys(session_id: Optional[str]) -> list:
+    """Both ids a guestbook message for the user's wedding may be filed under"""
+    current_user = await get_current_user_simple(session_id)
     users_coll, weddings_coll = await get_collections()
-    
-    # First find the wedding by shareable_id
-    wedding = await weddings_coll.find_one({"shareable_id": shareable_id})
-    
+    wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "wedding_keys")
     if not wedding:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wedding not found"
+            detail="Wedding data not found"
         )
-    
-    # Get guestbook messages for this wedding
-    guestbook_collection = database.guestbook
-    messages = await guestbook_collection.find({"wedding_id": wedding["id"]}).sort("created_at", -1).to_list(length=None)
-    
-    # Remove _id from response
-    response_data = []
-    for msg in messages:
-        clean_msg = {k: v for k, v in msg.items() if k != "_id"}
-        response_data.append(clean_msg)
-    
-    return {"success": True, "messages": response_data, "total_count": len(response_data)}
+    return [key for key in (wedding["id"], wedding.get("shareable_id")) if key]
+
+@api_router.get("/guestbook/moderation/queue")
+async def get_moderation_queue(session_id: Optional[str] = Depends(get_session_id)):
+    """Messages held for the couple's review"""
+    wedding_keys = await get_owned_wedding_keys(session_id)
+    messages = await database.guestbook.find(
+        moderation_queue_query(wedding_keys),
+        {"_id": 0, "moderation_claim": 0, "claimed_at": 0}
+    ).sort(MODERATION_QUEUE_SORT).to_list(length=500)
+    return {"success": True, "messages": messages, "total_count": len(messages)}
+
+@api_router.post("/guestbook/moderation/{message_id}")
+async def moderate_guestbook_message(message_id: str, request_data: dict, session_id: Optional[str] = Depends(get_session_id)):
+    """Approve or reject a held message"""
+    action = request_data.get("action")
+    if action not in ("approve", "reject"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Action must be 'approve' or 'reject'"
+        )
+    session_id = session_id or request_data.get("session_id")
+    wedding_keys = await get_owned_wedding_keys(session_id)
+    new_status = "published" if action == "approve" else "rejected"
+    
+    # Dropping the claim stops a worker still holding the message from
+    # overwriting the couple's decision
+    message = await database.guestbook.find_one_and_update(
+        {"id": message_id, "wedding_id": {"$in": wedding_keys}},
+        {"$set": {"status": new_status}, "$unset": {"moderation_claim": "", "claimed_at": ""}},
+        projection={"_id": 0, "moderation_claim": 0, "claimed_at": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found"
+        )
+    recent_writers.mark(active_sessions[session_id]["user_id"])
+    if new_status == "published":
+        await publish_live_event(message["wedding_id"], "guestbook", message)
+    return {"success": True, "message": message}
+
+# Guestbook listing is keyset-paginated newest first on (created_at, id),
+# served by the (wedding_id, status, created_at desc, id desc) index
+GUESTBOOK_PAGE_DEFAULT_LIMIT = 50
+GUESTBOOK_PAGE_MAX_LIMIT = 200
+
+async def list_guestbook_page(read_db, wedding_id: str, before: Optional[str], limit: int):
+    limit = max(1, min(limit, GUESTBOOK_PAGE_MAX_LIMIT))
+    position = parse_keyset_cursor(before)
+    query = guestbook_page_query(wedding_id, position)
+    
+    guestbook_collection = read_db.guestbook
+    cursor = guestbook_collection.find(query, {"_id": 0}).sort(GUESTBOOK_PAGE_SORT).limit(limit + 1)
+    messages = await cursor.to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = f"{messages[-1]['created_at']},{messages[-1]['id']}"
+    
+    response = {"success": True, "messages": messages, "next_cursor": next_cursor}
+    if not position:
+        # Index-only count, first page only
+        response["total_count"] = await guestbook_collection.count_documents(guestbook_page_query(wedding_id))
+    return response
+
+@api_router.get("/guestbook/{wedding_id}")
+async def get_guestbook_messages(
+    wedding_id: str,
+    before: Optional[str] = None,
+    limit: int = GUESTBOOK_PAGE_DEFAULT_LIMIT,
+    read_db=Depends(get_read_db),
+):
+    """Get a page of guestbook messages for a specific wedding, newest first"""
+    return await list_guestbook_page(read_db, wedding_id, before, limit)
+
+# Guestbook search - Mongo text index prefixed by wedding_id, so a search only
+# touches one wedding's entries (spec in indexes.py). Name matches outrank
+# message-body matches.
+GUESTBOOK_SEARCH_MAX_LIMIT = 50
+GUESTBOOK_SEARCH_MAX_OFFSET = 500
+
+@api_router.get("/guestbook/{wedding_id}/search")
+async def search_guestbook_messages(
+    wedding_id: str,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    read_db=Depends(get_read_db),
+):
+    """Ranked full-text search over a wedding's guestbook messages"""
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query required"
+        )
+    limit = max(1, min(limit, GUESTBOOK_SEARCH_MAX_LIMIT))
+    offset = max(0, min(offset, GUESTBOOK_SEARCH_MAX_OFFSET))
+    
+    guestbook_collection = read_db.guestbook
+    cursor = guestbook_collection.find(
+        guestbook_search_query(wedding_id, q),
+        {"_id": 0, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"}), ("created_at", -1)]).skip(offset).limit(limit + 1)
+    messages = await cursor.to_list(length=limit + 1)
+    
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    return {
+        "success": True,
+        "messages": messages,
+        "next_offset": offset + limit if has_more and offset + limit <= GUESTBOOK_SEARCH_MAX_OFFSET else None,
+    }
+
+@api_router.get("/guestbook/shareable/{shareable_id}")  
+async def get_guestbook_by_shareable_id(
+    shareable_id: str,
+    before: Optional[str] = None,
+    limit: int = GUESTBOOK_PAGE_DEFAULT_LIMIT,
+    read_db=Depends(get_read_db),
+):
+    """Get a page of guestbook messages using shareable ID"""
+    # Resolve the wedding id (cached, projection-only lookup on a miss)
+    wedding_id = await require_shareable_wedding_id(shareable_id)
+    
+    return await list_guestbook_page(read_db, wedding_id, before, limit)
 
 # Wedding Party Management Endpoints
 @api_router.put("/wedding/party")
-async def update_wedding_party(request_data: dict):
+async def update_wedding_party(request_data: dict, session_id: Optional[str] = Depends(get_session_id)):
     """Update wedding party data (bridal_party, groom_party, special_roles)"""
-    session_id = request_data.get('session_id')
+    session_id = request_data.get('session_id') or session_id
     if not session_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -910,7 +1938,7 @@ async def update_wedding_party(request_data: dict):
     users_coll, weddings_coll = await get_collections()
     
     # Find existing wedding
-    existing_wedding = await weddings_coll.find_one({"user_id": current_user.id})
+    existing_wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "exists")
     if not existing_wedding:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -933,9 +1961,12 @@ async def update_wedding_party(request_data: dict):
         {"user_id": current_user.id},
         {"$set": update_fields}
     )
+    recent_writers.mark(current_user.id)
     
     # Get updated wedding data
-    updated_wedding = await weddings_coll.find_one({"user_id": current_user.id})
+    updated_wedding = await find_projected(weddings_coll, {"user_id": current_user.id}, "wedding_owner")
+    await attach_arrays(database, updated_wedding)
+    forget_public_bootstrap(updated_wedding["id"])
     
     # Also update JSON backup
     weddings = load_json_file(WEDDINGS_FILE)
@@ -943,21 +1974,348 @@ async def update_wedding_party(request_data: dict):
         weddings[updated_wedding["id"]].update(update_fields)
         save_json_file(WEDDINGS_FILE, weddings)
     
-    # Remove _id from response
-    response_data = {k: v for k, v in updated_wedding.items() if k != "_id"}
-    return {"success": True, "wedding_data": response_data}
+    return {"success": True, "wedding_data": updated_wedding}
+
+# Live feed - Server-Sent Events per wedding (see live_feed.py)
+LIVE_FEED_HEARTBEAT_SECONDS = float(os.getenv("LIVE_FEED_HEARTBEAT_SECONDS", "15"))
+LIVE_FEED_CONNECTION_QUEUE = int(os.getenv("LIVE_FEED_CONNECTION_QUEUE", "100"))
+LIVE_FEED_REPLAY_TTL_SECONDS = float(os.getenv("LIVE_FEED_REPLAY_TTL_SECONDS", "3600"))
+live_feed = FeedBroker(max_queue=LIVE_FEED_CONNECTION_QUEUE, replay_ttl=LIVE_FEED_REPLAY_TTL_SECONDS)
+change_stream_ready = asyncio.Event()
+change_stream_task = None
+
+async def publish_live_event(wedding_key: str, kind: str, document: dict):
+    # With a change stream open, events arrive from Mongo (including writes
+    # made by other workers); publishing here as well would duplicate them
+    if not change_stream_ready.is_set():
+        live_feed.publish(await canonical_wedding_id(wedding_key), kind, document)
+
+# What a visitor without the owner's session sees: published guestbook
+# messages, as the public guestbook lists them (RSVPs carry guest contact details)
+PUBLIC_LIVE_EVENT_FIELDS = {"guestbook": frozenset(GuestbookMessage.model_fields)}
+
+@api_router.get("/live/{wedding_id}")
+async def live_wedding_feed(
+    wedding_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    session_id: Optional[str] = Depends(get_credential_session_id),
+):
+    """Stream new RSVPs and guestbook messages for a wedding as Server-Sent Events.
+    The owner's dashboard authenticates with the session cookie (withCredentials)"""
+    wedding_id = await canonical_wedding_id(wedding_id)
+    fields = PUBLIC_LIVE_EVENT_FIELDS
+    if session_id:
+        try:
+            if wedding_id in await get_owned_wedding_keys(session_id):
+                fields = None
+        except HTTPException:
+            pass
+    return StreamingResponse(
+        stream_events(
+            live_feed,
+            wedding_id,
+            last_event_id or request.query_params.get("last_event_id"),
+            request.is_disconnected,
+            heartbeat=LIVE_FEED_HEARTBEAT_SECONDS,
+            fields=fields,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Operational counters
+@api_router.get("/metrics")
+async def get_metrics():
+    return {
+        "wedding_filter": wedding_id_filter.metrics(),
+        "live_feed": {**live_feed.metrics(), "change_stream": change_stream_ready.is_set()},
+        "moderation": moderation_stats,
+        "mongo_pool": mongo_pool_metrics.metrics(),
+        "static_assets": static_manifest.metrics(),
+        "mongo_breaker": {**mongo_breaker.metrics(), "last_known_good": last_known_good.metrics()},
+        "read_routing": {
+            "public_read_preference": PUBLIC_READ_MODE,
+            "max_staleness_seconds": max_staleness_seconds(),
+            "reads": dict(read_routing_stats),
+            "recent_writers": len(recent_writers),
+        },
+    }
 
 # Test endpoint to verify connectivity
 @api_router.get("/test")
 async def test_endpoint():
     return {"status": "ok", "message": "Backend is working", "timestamp": datetime.utcnow()}
 
-# Serve React static files (production setup)
-FRONTEND_BUILD_PATH = ROOT_DIR.parent / "frontend" / "build"
+# Serve React static files (production setup). The build is scanned once at
+# startup (see static_manifest.py) and rescanned when index.html changes.
+FRONTEND_BUILD_PATH = Path(os.getenv("FRONTEND_BUILD_PATH", str(ROOT_DIR.parent / "frontend" / "build")))
+STATIC_MANIFEST_CHECK_SECONDS = float(os.getenv("STATIC_MANIFEST_CHECK_SECONDS", "2"))
+static_manifest = StaticManifest(FRONTEND_BUILD_PATH)
+static_manifest_watcher_task = None
+
+async def run_static_manifest_watcher():
+    while True:
+        try:
+            await asyncio.sleep(STATIC_MANIFEST_CHECK_SECONDS)
+            if static_manifest.index_changed():
+                files = await asyncio.to_thread(static_manifest.scan)
+                logger.info(f"🔄 Frontend build changed, rescanned {files} files")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Frontend build rescan failed: {e}")
+
+# Public wedding pages get their API response inlined into index.html so the
+# first render doesn't refetch it (frontend/src/utils/bootstrapData.js).
+# Entries: API endpoint -> (wedding id, script tag, stored_at, hero image URL,
+# wedding updated_at). Edits made on another worker don't reach this cache, so a
+# hit is only served after an indexed lookup of the wedding's updated_at still
+# matches. Entries no stored wedding backs - default data, or a wedding the
+# lookup finds missing - have nothing to compare and fall back to the TTL. Unknown
+# usernames and shareable ids are remembered briefly so probes for them don't
+# hit the database on every page load.
+PUBLIC_BOOTSTRAP_CACHE_SECONDS = float(os.getenv("PUBLIC_BOOTSTRAP_CACHE_SECONDS", "30"))
+PUBLIC_BOOTSTRAP_MISS_SECONDS = float(os.getenv("PUBLIC_BOOTSTRAP_MISS_SECONDS", "5"))
+PUBLIC_BOOTSTRAP_CACHE_SIZE = int(os.getenv("PUBLIC_BOOTSTRAP_CACHE_SIZE", "1000"))
+# First path segments the React router owns - never usernames
+SPA_RESERVED_PATHS = {
+    "login", "register", "dashboard", "share", "wedding", "rsvp", "story",
+    "gallery", "party", "schedule", "registry", "faq", "guestbook",
+}
+public_bootstrap_cache = OrderedDict()
+# API endpoint -> monotonic time it was last found to have no wedding
+public_bootstrap_misses = OrderedDict()
+
+def forget_public_bootstrap(wedding_id: str, *page_paths: str):
+    """Drop the cached pages of a wedding, plus anything cached for page_paths
+    (usernames or share/ links that may have just come into existence)"""
+    for endpoint in [key for key, entry in public_bootstrap_cache.items() if entry[0] == wedding_id]:
+        del public_bootstrap_cache[endpoint]
+    for endpoint in map(public_bootstrap_endpoint, page_paths):
+        public_bootstrap_cache.pop(endpoint, None)
+        public_bootstrap_misses.pop(endpoint, None)
+
+def remember_public_bootstrap_miss(endpoint: str):
+    public_bootstrap_misses[endpoint] = time.monotonic()
+    public_bootstrap_misses.move_to_end(endpoint)
+    if len(public_bootstrap_misses) > PUBLIC_BOOTSTRAP_CACHE_SIZE:
+        public_bootstrap_misses.popitem(last=False)
+
+async def public_bootstrap_current(endpoint: str, entry: tuple, read_db) -> bool:
+    """Whether a cached page still shows the wedding as stored"""
+    wedding_id, _, stored_at, _, updated_at = entry
+    if wedding_id is None or updated_at is None:
+        return time.monotonic() - stored_at < PUBLIC_BOOTSTRAP_CACHE_SECONDS
+    stored = await find_projected(read_db.weddings, {"id": wedding_id}, "wedding_version")
+    if stored is None:
+        # Not backed by a stored wedding: TTL-only from now on
+        public_bootstrap_cache[endpoint] = (*entry[:4], None)
+        return time.monotonic() - stored_at < PUBLIC_BOOTSTRAP_CACHE_SECONDS
+    return stored.get("updated_at") == updated_at
+
+def public_bootstrap_endpoint(full_path: str) -> Optional[str]:
+    """The public wedding API endpoint a page route renders, if any"""
+    parts = full_path.strip("/").split("/")
+    if len(parts) == 2 and parts[0] == "share":
+        return f"/api/wedding/share/{parts[1]}"
+    if len(parts) == 1 and parts[0] and parts[0] not in SPA_RESERVED_PATHS and "." not in parts[0]:
+        return f"/api/wedding/user/{parts[0]}"
+    return None
+
+def first_wedding_image(wedding: dict) -> Optional[str]:
+    """The first gallery photo (or story image) - what the public page paints first"""
+    photos = wedding.get("gallery_photos") or []
+    if isinstance(photos, dict):
+        # Default data groups gallery URLs by category
+        photos = [url for urls in photos.values() for url in urls or []]
+    candidates = [photo.get("url") or photo.get("src") if isinstance(photo, dict) else photo for photo in photos]
+    candidates += [item.get("image") for item in wedding.get("story_timeline") or [] if isinstance(item, dict)]
+    for url in candidates:
+        # data: URLs are already inline; anything that could break the Link header is skipped
+        if (isinstance(url, str) and url.startswith(("https://", "http://", "/"))
+                and not any(char in url for char in '<>", \r\n')):
+            return url
+    return None
+
+async def public_bootstrap_script(full_path: str) -> Optional[bytes]:
+    """Inline <script> with the public wedding JSON for /share/{id} and /{username}"""
+    endpoint = public_bootstrap_endpoint(full_path)
+    if endpoint is None:
+        return None
+    parts = full_path.strip("/").split("/")
+    
+    missed_at = public_bootstrap_misses.get(endpoint)
+    if missed_at is not None and time.monotonic() - missed_at < PUBLIC_BOOTSTRAP_MISS_SECONDS:
+        return None
+    # Never hold up the page on the database - the client falls back to fetching
+    if database is None or (mongodb_client is not None and mongo_breaker.state == "open"):
+        return None
+    
+    read_db = await get_read_db(None)
+    try:
+        cached = public_bootstrap_cache.get(endpoint)
+        if cached and await public_bootstrap_current(endpoint, cached, read_db):
+            public_bootstrap_cache.move_to_end(endpoint)
+            return cached[1]
+        if parts[0] == "share":
+            data = await get_wedding_by_shareable_id(parts[1], read_db=read_db)
+        else:
+            data = await get_wedding_by_username(parts[0], read_db=read_db)
+    except HTTPException as e:
+        if e.status_code == status.HTTP_404_NOT_FOUND:
+            remember_public_bootstrap_miss(endpoint)
+        return None
+    except ConnectionFailure as e:
+        mongo_breaker.record_failure(f"{type(e).__name__}: {e}")
+        return None
+    if not data:
+        remember_public_bootstrap_miss(endpoint)
+        return None
+    
+    # "<" escaped so wedding text can never close the script element
+    payload = json.dumps({"endpoint": endpoint, "data": jsonable_encoder(data)}, separators=(",", ":")).replace("<", "\\u003c")
+    script = f'<script id="wedding-bootstrap" type="application/json">{payload}</script>'.encode()
+    # Default data carries an updated_at but no stored wedding to compare it with
+    updated_at = data.get("updated_at") if data.get("id") != "default" else None
+    public_bootstrap_cache[endpoint] = (
+        data.get("id"), script, time.monotonic(), first_wedding_image(data), updated_at
+    )
+    public_bootstrap_cache.move_to_end(endpoint)
+    if len(public_bootstrap_cache) > PUBLIC_BOOTSTRAP_CACHE_SIZE:
+        public_bootstrap_cache.popitem(last=False)
+    return script
+
+def page_preload_links(full_path: str) -> List[str]:
+    """Link: rel=preload values for a page route - the build's entrypoint
+    bundles plus, on public wedding pages already in the bootstrap cache, the
+    hero image"""
+    endpoint = public_bootstrap_endpoint(full_path)
+    cached = public_bootstrap_cache.get(endpoint) if endpoint else None
+    return static_manifest.preload_links([cached[3]] if cached and cached[3] else [])
+
+class EarlyHintsMiddleware:
+    """Sends 103 Early Hints for page routes before the handler looks up the
+    wedding, on ASGI servers that advertise the http.response.early_hint
+    extension; elsewhere the same links only go out as the page's Link header"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] == "http" and scope["method"] == "GET"
+                and "http.response.early_hint" in scope.get("extensions", {})):
+            full_path = scope["path"].lstrip("/")
+            if not full_path.startswith("api") and static_manifest.get(full_path) is None:
+                links = page_preload_links(full_path)
+                if links:
+                    await send({"type": "http.response.early_hint", "links": [link.encode() for link in links]})
+        await self.app(scope, receive, send)
 
 # Include the API router first (higher priority)
 app.include_router(api_router)
 
+# Degraded mode while the MongoDB breaker is open: public page reads are
+# answered from the last-known-good cache, everything else fails fast with 503
+PUBLIC_CACHEABLE_PREFIXES = ("/api/wedding/public/", "/api/wedding/share/", "/api/wedding/user/", "/api/guestbook/")
+BREAKER_EXEMPT_PATHS = ("/api/metrics", "/api/test")
+
+def is_public_cacheable(request: Request) -> bool:
+    path = request.url.path
+    return (
+        request.method == "GET"
+        and path.startswith(PUBLIC_CACHEABLE_PREFIXES)
+        and not path.startswith("/api/guestbook/moderation")
+    )
+
+def last_known_good_key(request: Request) -> str:
+    return f"{request.url.path}?{request.url.query}"
+
+def degraded_response(request: Request) -> Response:
+    if is_public_cacheable(request):
+        cached = last_known_good.get(last_known_good_key(request))
+        if cached:
+            body, media_type, stored_at = cached
+            return Response(
+                body,
+                media_type=media_type,
+                headers={"X-Degraded": "stale", "Age": str(int(time.time() - stored_at))}
+            )
+    return JSONResponse(
+        {"detail": "Database temporarily unavailable"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(mongo_breaker.retry_after())}
+    )
+
+class MongoCircuitBreakerMiddleware:
+    """Pure ASGI (not @app.middleware) so page and asset requests pass straight
+    through, and streamed API responses are never buffered"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (scope["type"] != "http" or not MONGO_BREAKER_ENABLED or mongodb_client is None
+                or not path.startswith("/api/") or path in BREAKER_EXEMPT_PATHS):
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        if not mongo_breaker.allow_request():
+            return await degraded_response(request)(scope, receive, send)
+        
+        cacheable = is_public_cacheable(request)
+        response_started = False
+        response_status = None
+        content_type = None
+        body = []
+        
+        async def send_and_remember(message):
+            nonlocal response_started, response_status, content_type
+            if message["type"] == "http.response.start":
+                response_started = True
+                response_status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"").decode() or None
+            elif message["type"] == "http.response.body" and cacheable and response_status == 200:
+                body.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    last_known_good.store(last_known_good_key(request), b"".join(body), content_type)
+            await send(message)
+        
+        token = breaker_in_request.set(True)
+        try:
+            await self.app(scope, receive, send_and_remember)
+        except ConnectionFailure as e:
+            # Server selection timeouts never reach the command listener
+            mongo_breaker.record_failure(f"{type(e).__name__}: {e}")
+            if response_started:
+                raise
+            await degraded_response(request)(scope, receive, send)
+        finally:
+            breaker_in_request.reset(token)
+
+app.add_middleware(MongoCircuitBreakerMiddleware)
+app.add_middleware(EarlyHintsMiddleware)
+
+async def run_mongo_breaker_probe():
+    """Ping MongoDB while the breaker is open; a success half-opens it"""
+    while True:
+        try:
+            await asyncio.sleep(1)
+            if not mongo_breaker.probe_due():
+                continue
+            try:
+                await asyncio.wait_for(database.command("ping"), MONGO_BREAKER_PROBE_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                mongo_breaker.probe_failed(f"probe: {type(e).__name__}")
+            else:
+                mongo_breaker.probe_succeeded()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ MongoDB breaker probe failed: {e}")
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -970,30 +2328,44 @@ app.add_middleware(
 
 # Serve static files and React app
 if FRONTEND_BUILD_PATH.exists():
-    print(f"✅ Frontend build found at: {FRONTEND_BUILD_PATH}")
-    app.mount("/static", StaticFiles(directory=str(FRONTEND_BUILD_PATH / "static")), name="static")
+    print(f"✅ Frontend build found at: {FRONTEND_BUILD_PATH} ({static_manifest.scan()} files, "
+          f"{static_manifest.metrics()['precompressed']} precompressed)")
     
     @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
+    async def serve_react_app(full_path: str, request: Request):
         """Serve React app for all non-API routes"""
-        print(f"🌐 Serving route: {full_path}")
-        
         # Skip API routes (they are handled by api_router)
         if full_path.startswith("api"):
-            print(f"❌ API route not found: {full_path}")
             raise HTTPException(status_code=404, detail="API endpoint not found")
         
-        # Check if it's a direct file request
-        if full_path and not full_path.startswith("api"):
-            static_file_path = FRONTEND_BUILD_PATH / full_path
-            if static_file_path.exists() and static_file_path.is_file():
-                print(f"📁 Serving static file: {static_file_path}")
-                return FileResponse(static_file_path)
+        # Direct file request - answered from the startup manifest, no stat
+        asset = static_manifest.get(full_path)
+        if asset is None and full_path.startswith("static/"):
+            # A stale chunk name must not get index.html back as JavaScript
+            raise HTTPException(status_code=404, detail="Static file not found")
         
-        # For all other routes (including custom wedding URLs), serve React index.html
-        index_path = FRONTEND_BUILD_PATH / "index.html"
-        print(f"⚛️ Serving React app: {index_path}")
-        return FileResponse(index_path)
+        if asset is not None:
+            # Precompressed .br/.gz sibling when the client accepts one
+            variant = static_manifest.negotiate(asset, request.headers.get("accept-encoding", ""))
+            return static_manifest.response(variant, etag_matches(request, variant.etag), compressible=bool(asset.variants))
+        
+        # For all other routes (including custom wedding URLs), serve React
+        # index.html from memory - with the wedding inlined on public pages
+        page = None
+        script = await public_bootstrap_script(full_path)
+        if script:
+            page = static_manifest.render_index(script)
+        if page is None:
+            index = static_manifest.get("index.html")
+            if index is None:
+                raise HTTPException(status_code=404, detail="Frontend build has no index.html")
+            variant = static_manifest.negotiate(index, request.headers.get("accept-encoding", ""))
+            page = static_manifest.response(variant, etag_matches(request, variant.etag), compressible=bool(index.variants))
+        # Entrypoint bundles (and the hero image) start downloading with the HTML
+        links = page_preload_links(full_path)
+        if links:
+            page.headers["Link"] = ", ".join(links)
+        return page
 else:
     print(f"❌ Frontend build not found at: {FRONTEND_BUILD_PATH}")
     print("React static file serving disabled")
@@ -1005,14 +2377,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def create_indexes():
+    """Apply the declarative index spec (see indexes.py) - idempotent"""
+    if database is None:
+        return
+    try:
+        # Messages from before moderation existed are already public
+        await database.guestbook.update_many({"status": {"$exists": False}}, {"$set": {"status": "published"}})
+        failed = await apply_indexes(database)
+        if failed:
+            logger.error(f"❌ Some MongoDB indexes could not be created: {', '.join(failed)}")
+        else:
+            logger.info("✅ MongoDB indexes ensured")
+    except Exception as e:
+        logger.error(f"❌ Error creating MongoDB indexes: {e}")
+
 # Startup and shutdown events for MongoDB
 @app.on_event("startup")
 async def startup_event():
+    global rsvp_counter_reconciler_task, wedding_filter_refresher_task, change_stream_task, mongo_breaker_probe_task
+    global static_manifest_watcher_task, rsvp_dedupe_task
     await connect_to_mongo()
+    await create_indexes()
+    rsvp_counter_reconciler_task = asyncio.create_task(run_rsvp_counter_reconciler())
+    if database is not None and RSVP_DEDUPE_ON_STARTUP:
+        rsvp_dedupe_task = asyncio.create_task(run_rsvp_dedupe_job())
+    start_rsvp_ingest_queue()
+    start_moderation_workers()
+    wedding_filter_refresher_task = asyncio.create_task(run_wedding_filter_refresher())
+    if database is not None:
+        change_stream_task = asyncio.create_task(watch_change_streams(database, live_feed, change_stream_ready, canonical_wedding_id))
+    if MONGO_BREAKER_ENABLED and mongodb_client is not None:
+        mongo_breaker_probe_task = asyncio.create_task(run_mongo_breaker_probe())
+    if static_manifest.assets:
+        static_manifest_watcher_task = asyncio.create_task(run_static_manifest_watcher())
     logger.info("✅ Wedding Card API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if rsvp_ingest_queue is not None:
+        # Flush every RSVP we already acknowledged before closing the client
+        await rsvp_ingest_queue.drain(RSVP_QUEUE_DRAIN_SECONDS)
+    if rsvp_counter_reconciler_task:
+        rsvp_counter_reconciler_task.cancel()
+    if rsvp_dedupe_task:
+        rsvp_dedupe_task.cancel()
+    if wedding_filter_refresher_task:
+        wedding_filter_refresher_task.cancel()
+    if change_stream_task:
+        change_stream_task.cancel()
+    if mongo_breaker_probe_task:
+        mongo_breaker_probe_task.cancel()
+    if static_manifest_watcher_task:
+        static_manifest_watcher_task.cancel()
+    for task in moderation_tasks:
+        task.cancel()
     await close_mongo_connection()
     active_sessions.clear()
     # Note: Sessions are persisted in MongoDB and will be restored on restart
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+In-memory manifest of the React build served by the catch-all route.
+
+frontend/build is scanned once at startup into {relative path: StaticAsset}
+with size, mtime, ETag and MIME type, so serving a file never touches the
+filesystem metadata again (FileResponse gets the recorded stat_result).
+Content-hashed bundles (CRA names them main.3f2a1b4c.js, 123.ab12cd34.chunk.css,
+media/logo.0a1b2c3d.svg) never change under the same name and are cached for a
+year as immutable; everything else (index.html, manifest.json, favicon)
+revalidates with If-None-Match.
+
+Compressible files get .br and .gz siblings, written once (at build time with
+the CLI below, otherwise during the startup scan) and picked per request from
+Accept-Encoding - no compression work happens while serving:
+
+    python static_manifest.py compress ../frontend/build
+
+index.html (and its siblings) are held in memory. A deploy rewrites index.html,
+so index_changed() is the cue to rescan the whole build. render_index() inlines
+a bootstrap <script> into the page for routes whose data is known up front.
+
+The entrypoints listed in CRA's asset-manifest.json are the page's critical
+assets; preload_links() turns them (plus any per-route extras) into
+Link: rel=preload values so the browser fetches them without waiting to parse
+the HTML.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # gzip siblings only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}(\.chunk)?\.\w+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/manifest+json",
+    "application/xml", "image/svg+xml",
+)
+MIN_COMPRESS_BYTES = 1024
+# Content-Encoding -> sibling suffix, in server preference order
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+# Siblings are written under this prefix and renamed into place
+PRECOMPRESS_TEMP_PREFIX = ".precompress-"
+INDEX_HTML = "index.html"
+IN_MEMORY_ASSETS = {INDEX_HTML}
+ASSET_MANIFEST = "asset-manifest.json"
+# File extension -> preload destination (the Link header's as=)
+PRELOAD_AS = {
+    ".js": "script", ".css": "style",
+    ".woff2": "font", ".woff": "font", ".ttf": "font",
+    ".jpg": "image", ".jpeg": "image", ".png": "image", ".webp": "image",
+    ".avif": "image", ".gif": "image", ".svg": "image",
+}
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return tuple(encoding for encoding in ENCODING_SUFFIXES if encoding != "br" or brotli is not None)
+
+
+class StaticAsset(NamedTuple):
+    path: Path
+    stat: os.stat_result
+    etag: str
+    media_type: str
+    cache_control: str
+    # Set on precompressed variants
+    encoding: Optional[str] = None
+    # Precompressed variants of this file, in preference order
+    variants: Tuple["StaticAsset", ...] = ()
+    # Contents, for files served from memory (IN_MEMORY_ASSETS)
+    body: Optional[bytes] = None
+
+
+def is_hashed_asset(relative_path: str) -> bool:
+    return relative_path.startswith("static/") and bool(HASHED_ASSET.search(relative_path))
+
+
+def is_compressible(media_type: str, size: int) -> bool:
+    return size >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def encoding_qualities(accept_encoding: str) -> dict:
+    """Content coding -> q value for every coding an Accept-Encoding header names"""
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0
+        qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings the client accepts (q > 0) from an Accept-Encoding header"""
+    return {coding for coding, quality in encoding_qualities(accept_encoding).items() if quality > 0}
+
+
+def inject_script(html: bytes, script: bytes) -> bytes:
+    """html with script inserted before </head> (or </body>, or at the end)"""
+    for marker in (b"</head>", b"</body>"):
+        position = html.find(marker)
+        if position != -1:
+            return html[:position] + script + html[position:]
+    return html + script
+
+
+def preload_link(url: str, destination: Optional[str] = None) -> Optional[str]:
+    """Link header value preloading url, or None when its type is unknown"""
+    destination = destination or PRELOAD_AS.get(os.path.splitext(url.split("?", 1)[0])[1].lower())
+    if destination is None:
+        return None
+    # Fonts are always fetched in CORS mode; without crossorigin the preload is wasted
+    return f"<{url}>; rel=preload; as={destination}" + ("; crossorigin" if destination == "font" else "")
+
+
+def critical_assets(root: Path, assets: Dict[str, "StaticAsset"]) -> Tuple[str, ...]:
+    """URLs of the entrypoint bundles in asset-manifest.json that are in the build"""
+    path = root / ASSET_MANIFEST
+    if not path.exists():
+        return ()
+    try:
+        entrypoints = json.loads(path.read_text()).get("entrypoints", [])
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"⚠️ Could not read {ASSET_MANIFEST}: {e}")
+        return ()
+    return tuple(f"/{path.lstrip('/')}" for path in entrypoints if path.lstrip("/") in assets)
+
+
+def _replace_atomically(target: Path, data: bytes):
+    """Write via a temp file in the same directory and rename it over target, so
+    another worker scanning or serving the build never sees a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=PRECOMPRESS_TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def precompress(path: Path) -> Dict[str, int]:
+    """Write missing or outdated siblings for one file; returns encoding -> size of the kept siblings.
+
+    A sibling that isn't smaller than the original is not kept - serving it
+    would only cost bytes.
+    """
+    data = None
+    sizes = {}
+    source_stat = path.stat()
+    for encoding in available_encodings():
+        sibling = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        if not sibling.exists() or sibling.stat().st_mtime < source_stat.st_mtime:
+            data = path.read_bytes() if data is None else data
+            compressed = compress(encoding, data)
+            if len(compressed) < source_stat.st_size:
+                _replace_atomically(sibling, compressed)
+            else:
+                sibling.unlink(missing_ok=True)
+        if not sibling.exists():
+            continue
+        size = sibling.stat().st_size
+        if size >= source_stat.st_size:
+            sibling.unlink(missing_ok=True)
+            continue
+        sizes[encoding] = size
+    return sizes
+
+
+class StaticManifest:
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        self.not_modified = 0
+        self.served_encodings: Dict[str, int] = {}
+        self.index_mtime: Optional[float] = None
+        self.critical_assets: Tuple[str, ...] = ()
+
+    def _asset(self, path: Path, relative_path: str, media_type: str, encoding: Optional[str] = None) -> StaticAsset:
+        data = path.read_bytes()
+        return StaticAsset(
+            path=path,
+            stat=path.stat(),
+            etag=f'"{hashlib.sha1(data).hexdigest()}"',
+            media_type=media_type,
+            cache_control=IMMUTABLE_CACHE_CONTROL if is_hashed_asset(relative_path) else REVALIDATE_CACHE_CONTROL,
+            encoding=encoding,
+            body=data if relative_path in IN_MEMORY_ASSETS else None,
+        )
+
+    def scan(self, compress_assets: bool = True) -> int:
+        """(Re)build the manifest from disk; returns the number of files"""
+        index_path = self.root / INDEX_HTML
+        index_mtime = index_path.stat().st_mtime if index_path.exists() else None
+        files = {
+            path.relative_to(self.root).as_posix(): path for path in sorted(self.root.rglob("*"))
+            if path.is_file() and not path.name.startswith(PRECOMPRESS_TEMP_PREFIX)
+        }
+        siblings = {
+            relative_path for relative_path in files
+            if any(relative_path.endswith(suffix) and relative_path[:-len(suffix)] in files
+                   for suffix in ENCODING_SUFFIXES.values())
+        }
+        assets = {}
+        for relative_path, path in files.items():
+            if relative_path in siblings:
+                continue
+            media_type = mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
+            asset = self._asset(path, relative_path, media_type)
+            if is_compressible(media_type, asset.stat.st_size):
+                if compress_assets:
+                    try:
+                        precompress(path)
+                    except OSError as e:
+                        logger.warning(f"⚠️ Could not precompress {relative_path}: {e}")
+                variants = []
+                for encoding, suffix in ENCODING_SUFFIXES.items():
+                    sibling = path.with_name(path.name + suffix)
+                    if sibling.exists():
+                        variants.append(self._asset(sibling, relative_path, media_type, encoding))
+                asset = asset._replace(variants=tuple(variants))
+            assets[relative_path] = asset
+        self.assets = assets
+        self.critical_assets = critical_assets(self.root, assets)
+        self.index_mtime = index_mtime
+        return len(assets)
+
+    def index_changed(self) -> bool:
+        """Whether index.html was rewritten (a new build deployed) since the last scan"""
+        try:
+            return (self.root / INDEX_HTML).stat().st_mtime != self.index_mtime
+        except FileNotFoundError:
+            return self.index_mtime is not None
+
+    def get(self, relative_path: str) -> Optional[StaticAsset]:
+        return self.assets.get(relative_path)
+
+    def negotiate(self, asset: StaticAsset, accept_encoding: str) -> StaticAsset:
+        """The smallest variant of asset the client accepts"""
+        if asset.variants:
+            qualities = encoding_qualities(accept_encoding)
+            for variant in asset.variants:
+                # A coding named with q=0 is refused even when "*" is accepted
+                if qualities.get(variant.encoding, qualities.get("*", 0)) > 0:
+                    return variant
+        return asset
+
+    def response(self, asset: StaticAsset, not_modified: bool = False, compressible: bool = False) -> Response:
+        """The file, or a 304 when the client's If-None-Match already matches.
+
+        compressible marks responses that depend on Accept-Encoding (Vary),
+        including the identity fallback.
+        """
+        headers = {"ETag": asset.etag, "Cache-Control": asset.cache_control}
+        if compressible or asset.encoding:
+            headers["Vary"] = "Accept-Encoding"
+        if not_modified:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        if asset.encoding:
+            headers["Content-Encoding"] = asset.encoding
+        encoding = asset.encoding or "identity"
+        self.served_encodings[encoding] = self.served_encodings.get(encoding, 0) + 1
+        if asset.body is not None:
+            return Response(asset.body, headers=headers, media_type=asset.media_type)
+        return FileResponse(asset.path, headers=headers, media_type=asset.media_type, stat_result=asset.stat)
+
+    def render_index(self, script: bytes) -> Optional[Response]:
+        """index.html with script inlined; uncompressed and unvalidated since
+        the body differs per route"""
+        index = self.assets.get(INDEX_HTML)
+        if index is None:
+            return None
+        self.served_encodings["identity"] = self.served_encodings.get("identity", 0) + 1
+        return Response(
+            inject_script(index.body, script),
+            headers={"Cache-Control": REVALIDATE_CACHE_CONTROL},
+            media_type=index.media_type,
+        )
+
+    def preload_links(self, images: Iterable[str] = ()) -> List[str]:
+        """Link values for the critical assets, then images (e.g. a wedding's hero photo)"""
+        links = [preload_link(url) for url in self.critical_assets]
+        links += [preload_link(url, "image") for url in images]
+        return [link for link in links if link]
+
+    def savings(self) -> Dict[str, Dict[str, int]]:
+        """relative path -> {"identity": size, encoding: bytes saved, ...} for compressed assets"""
+        return {
+            relative_path: {
+                "identity": asset.stat.st_size,
+                **{variant.encoding: asset.stat.st_size - variant.stat.st_size for variant in asset.variants},
+            }
+            for relative_path, asset in self.assets.items() if asset.variants
+        }
+
+    def metrics(self) -> dict:
+        savings = self.savings().values()
+        return {
+            "files": len(self.assets),
+            "bytes": sum(asset.stat.st_size for asset in self.assets.values()),
+            "immutable": sum(asset.cache_control == IMMUTABLE_CACHE_CONTROL for asset in self.assets.values()),
+            "not_modified": self.not_modified,
+            "precompressed": len(savings),
+            "bytes_saved": {encoding: sum(saved.get(encoding, 0) for saved in savings) for encoding in available_encodings()},
+            "served_encodings": dict(self.served_encodings),
+            "critical_assets": list(self.critical_assets),
+        }
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="React build manifest tools")
+
+    @cli.callback()
+    def main():
+        """React build manifest tools"""
+
+    @cli.command("compress")
+    def compress_build(build: Path = typer.Argument(Path(__file__).parent.parent / "frontend" / "build")):
+        """Write .br/.gz siblings for every compressible file and report bytes saved"""
+        if brotli is None:
+            print("⚠️ brotli not installed - writing .gz siblings only")
+        manifest = StaticManifest(build)
+        manifest.scan()
+        totals = {"identity": 0}
+        for relative_path, saved in sorted(manifest.savings().items()):
+            size = saved["identity"]
+            columns = "  ".join(
+                f"{encoding} -{saved[encoding]:>9,} B ({saved[encoding] / size:.0%})"
+                for encoding in available_encodings() if encoding in saved
+            )
+            print(f"{relative_path:<48} {size:>10,} B  {columns}")
+            for encoding, value in saved.items():
+                totals[encoding] = totals.get(encoding, 0) + value
+        print(f"✅ {len(manifest.savings())} assets precompressed, "
+              + ", ".join(f"{encoding} saves {totals.get(encoding, 0):,} B" for encoding in available_encodings())
+              + f" of {totals['identity']:,} B")
+
+    cli()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unbounded wedding arrays stored outside the wedding document.
+
+gallery_photos, registry_items and the legacy rsvp_responses grow without
+limit, so each item lives in a collection of the same name as
+{wedding_id, position, item}. The wedding document keeps only the small, hot
+fields. The API shape is unchanged: attach_arrays() puts the lists back on
+reads and save_arrays() rewrites only the positions that changed on writes.
+
+Weddings written before the split still carry the arrays inline. Reads use
+those as-is, and the next save or the backfill moves them out:
+
+    python wedding_arrays.py migrate --batch-size 100
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from pymongo import DeleteMany, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Wedding field -> collection holding its items
+ARRAY_COLLECTIONS = {
+    "gallery_photos": "gallery_photos",
+    "registry_items": "registry_items",
+    "rsvp_responses": "rsvp_responses",
+}
+ARRAY_FIELDS = tuple(ARRAY_COLLECTIONS)
+
+
+def split_arrays(wedding: dict) -> Tuple[dict, Dict[str, list]]:
+    """(wedding without the array fields, the array fields it had)"""
+    core = {k: v for k, v in wedding.items() if k not in ARRAY_COLLECTIONS}
+    arrays = {k: wedding[k] or [] for k in ARRAY_FIELDS if k in wedding}
+    return core, arrays
+
+
+async def load_array(database, wedding_id: str, field: str) -> list:
+    cursor = database[ARRAY_COLLECTIONS[field]].find(
+        {"wedding_id": wedding_id}, {"_id": 0, "item": 1}
+    ).sort("position", 1)
+    return [row["item"] async for row in cursor]
+
+
+async def attach_arrays(database, wedding: dict) -> dict:
+    """Fill in the array fields a wedding document doesn't carry inline"""
+    missing = [field for field in ARRAY_FIELDS if field not in wedding]
+    if missing:
+        loaded = await asyncio.gather(*(load_array(database, wedding["id"], field) for field in missing))
+        wedding.update(zip(missing, loaded))
+    return wedding
+
+
+async def save_array(database, wedding_id: str, field: str, items: List[dict], overwrite: bool = True) -> int:
+    """Store one array, writing only changed positions; returns the number of writes.
+
+    With overwrite=False existing positions are left alone (used by the
+    backfill so it never clobbers a newer save).
+    """
+    collection = database[ARRAY_COLLECTIONS[field]]
+    stored = {
+        row["position"]: row["item"]
+        async for row in collection.find({"wedding_id": wedding_id}, {"_id": 0, "position": 1, "item": 1})
+    }
+    operator = "$set" if overwrite else "$setOnInsert"
+    operations = [
+        UpdateOne({"wedding_id": wedding_id, "position": position}, {operator: {"item": item}}, upsert=True)
+        for position, item in enumerate(items)
+        if stored.get(position) != item
+    ]
+    if overwrite and len(stored) > len(items):
+        operations.append(DeleteMany({"wedding_id": wedding_id, "position": {"$gte": len(items)}}))
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def save_arrays(database, wedding_id: str, arrays: Dict[str, list], overwrite: bool = True) -> int:
+    writes = await asyncio.gather(*(
+        save_array(database, wedding_id, field, items, overwrite) for field, items in arrays.items()
+    ))
+    return sum(writes)
+
+
+async def migrate_wedding_arrays(database, batch_size: int = 100) -> int:
+    """Move inline arrays out of every wedding document, batch_size weddings at a time"""
+    inline = {"$or": [{field: {"$exists": True}} for field in ARRAY_FIELDS]}
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in ARRAY_FIELDS}}
+    migrated = 0
+    while True:
+        batch = await database.weddings.find(inline, projection).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return migrated
+        for wedding in batch:
+            await save_arrays(database, wedding["id"], split_arrays(wedding)[1], overwrite=False)
+        await database.weddings.bulk_write([
+            UpdateOne({"id": wedding["id"]}, {"$unset": {field: "" for field in ARRAY_FIELDS}})
+            for wedding in batch
+        ], ordered=False)
+        migrated += len(batch)
+        logger.info(f"📦 Moved arrays out of {migrated} wedding(s)")
+
+
+async def _migrate(batch_size: int) -> int:
+    from indexes import _connect, apply_indexes
+
+    client, database = _connect()
+    try:
+        await apply_indexes(database, ARRAY_COLLECTIONS.values())
+        migrated = await migrate_wedding_arrays(database, batch_size)
+        print(f"✅ Moved arrays out of {migrated} wedding document(s)")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="Wedding array storage maintenance")
+
+    @cli.callback()
+    def main():
+        """Wedding array storage maintenance"""
+
+    @cli.command()
+    def migrate(batch_size: int = typer.Option(100, help="Weddings per batch")):
+        """Backfill gallery/registry/RSVP arrays into their own collections"""
+        raise typer.Exit(asyncio.run(_migrate(batch_size)))
+
+    cli()
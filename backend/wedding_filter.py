@@ -0,0 +1,134 @@
+"""
+In-memory membership filter for wedding ids.
+
+RSVP and guestbook writes are checked against a Bloom filter of every known
+wedding id and shareable_id before anything touches Mongo. A negative answer
+rejects the write for free; a positive answer is confirmed with an exact
+indexed lookup, so false positives never let junk through, and a false positive
+confirmed absent is remembered for negative_ttl seconds.
+
+Weddings created on this worker are added as they are created (add()); ones
+created on other workers are picked up by the periodic rebuild, so keep its
+interval short. Until the first rebuild every id goes to the exact lookup.
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Kirsch-Mitzenmacher double hashing over one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class WeddingIdFilter:
+    def __init__(
+        self,
+        exact_check: Callable[[str], Awaitable[bool]],
+        error_rate: float = 0.001,
+        negative_ttl: float = 5.0,
+        negative_cache_size: int = 10000,
+    ):
+        self._exact_check = exact_check
+        self._error_rate = error_rate
+        self._bloom: Optional[BloomFilter] = None
+        self._negative_ttl = negative_ttl
+        self._negative_cache_size = negative_cache_size
+        # wedding id -> monotonic time its absence was last confirmed
+        self._negatives: "OrderedDict[str, float]" = OrderedDict()
+        # Added since the last rebuild - the scan feeding the next one may have
+        # started before they were inserted
+        self._added = set()
+        self.stats = {
+            "rejected_empty": 0,
+            "rejected_cached": 0,
+            "rejected_bloom": 0,
+            "rejected_exact": 0,
+            "false_positives": 0,
+            "accepted": 0,
+            "refreshes": 0,
+        }
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def rebuild(self, ids: Iterable[str]):
+        """Swap in a fresh filter built from the complete set of valid ids"""
+        ids = {i for i in ids if i} | self._added
+        # Headroom so weddings created before the next refresh don't degrade it
+        bloom = BloomFilter(max(len(ids) * 2, 1024), self._error_rate)
+        for wedding_id in ids:
+            bloom.add(wedding_id)
+        self._bloom = bloom
+        self._added = set()
+        self._negatives.clear()
+        self.stats["refreshes"] += 1
+
+    def add(self, *ids: str):
+        for wedding_id in ids:
+            if wedding_id:
+                self._negatives.pop(wedding_id, None)
+                self._added.add(wedding_id)
+                if self._bloom is not None:
+                    self._bloom.add(wedding_id)
+
+    def _remember_negative(self, wedding_id: str):
+        self._negatives[wedding_id] = time.monotonic()
+        self._negatives.move_to_end(wedding_id)
+        if len(self._negatives) > self._negative_cache_size:
+            self._negatives.popitem(last=False)
+
+    async def contains(self, wedding_id: str) -> bool:
+        if not wedding_id:
+            self.stats["rejected_empty"] += 1
+            return False
+        confirmed_at = self._negatives.get(wedding_id)
+        if confirmed_at is not None:
+            if time.monotonic() - confirmed_at < self._negative_ttl:
+                self.stats["rejected_cached"] += 1
+                return False
+            del self._negatives[wedding_id]
+        if self._bloom is not None and wedding_id not in self._bloom:
+            self.stats["rejected_bloom"] += 1
+            return False
+        if not await self._exact_check(wedding_id):
+            self._remember_negative(wedding_id)
+            if self._bloom is not None:
+                self.stats["false_positives"] += 1
+            self.stats["rejected_exact"] += 1
+            return False
+        self.stats["accepted"] += 1
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            **self.stats,
+            "ready": self.ready,
+            "entries": self._bloom.count if self._bloom else 0,
+            "cached_negatives": len(self._negatives),
+            "bits": self._bloom.size if self._bloom else 0,
+        }
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import { useParams, useLocation } from 'react-router-dom';
+import { takeBootstrapData } from '../utils/bootstrapData';
 
 const UserDataContext = createContext();
 
@@ -70,6 +71,13 @@ export const UserDataProvider = ({ children }) => {
           return;
         }
         
+        // Server-rendered page already carries the wedding - skip the fetch
+        const inlinedData = takeBootstrapData(endpoint);
+        if (inlinedData) {
+          setWeddingData(inlinedData);
+          return;
+        }
+        
         console.log('Loading wedding data from:', endpoint);
         const response = await fetch(`${backendUrl}${endpoint}`);
         
@@ -120,11 +128,9 @@ export const UserDataProvider = ({ children }) => {
           method: 'PUT',
           headers: {
             'Content-Type': 'application/json',
+            'Authorization': `Bearer ${userInfo.sessionId}`,
           },
-          body: JSON.stringify({
-            ...newData,
-            session_id: userInfo.sessionId
-          })
+          body: JSON.stringify(newData)
         });
         
         if (response.ok) {
@@ -167,7 +173,11 @@ export const UserDataProvider = ({ children }) => {
     // Load user's wedding data
     try {
       const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const response = await fetch(`${backendUrl}/api/wedding?session_id=${sessionId}`);
+      // Session goes in the Authorization header so the URL stays stable and the
+      // browser can revalidate the cached copy with If-None-Match
+      const response = await fetch(`${backendUrl}/api/wedding`, {
+        headers: { 'Authorization': `Bearer ${sessionId}` }
+      });
       
       if (response.ok) {
         const userWeddingData = await response.json();
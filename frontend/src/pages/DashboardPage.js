@@ -125,9 +125,9 @@ const DashboardPage = () => {
           method: 'PUT',
           headers: {
             'Content-Type': 'application/json',
+            'Authorization': `Bearer ${sessionId}`,
           },
           body: JSON.stringify({
-            session_id: sessionId,
             [field]: value
           })
         });
@@ -1268,6 +1268,7 @@ const OurStoryFormContent = ({ initialData, theme, onSave }) => {
 // RSVP Admin Content Component
 const RSVPAdminContent = ({ weddingData, theme }) => {
   const [rsvps, setRsvps] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [stats, setStats] = useState({
@@ -1281,6 +1282,25 @@ const RSVPAdminContent = ({ weddingData, theme }) => {
     fetchRSVPs();
   }, [weddingData]);
 
+  // Live updates: append RSVPs as guests submit them
+  useEffect(() => {
+    const weddingId = weddingData?.id;
+    if (!weddingId || typeof EventSource === 'undefined') return;
+    
+    const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+    // RSVP events are only streamed to the wedding's owner, recognised by the
+    // httponly session cookie (EventSource can't send an Authorization header)
+    const source = new EventSource(`${backendUrl}/api/live/${weddingId}`, { withCredentials: true });
+    source.addEventListener('rsvp', (event) => {
+      const rsvp = JSON.parse(event.data);
+      setRsvps(prev => prev.some(r => r.id === rsvp.id)
+        ? prev.map(r => r.id === rsvp.id ? rsvp : r)
+        : [...prev, rsvp]);
+    });
+    
+    return () => source.close();
+  }, [weddingData?.id]);
+
   const fetchRSVPs = async () => {
     setLoading(true);
     setError('');
@@ -1299,18 +1319,21 @@ const RSVPAdminContent = ({ weddingData, theme }) => {
       
       if (data.success) {
         setRsvps(data.rsvps);
+        setNextCursor(data.next_cursor || null);
         
-        // Calculate statistics
-        const attending = data.rsvps.filter(rsvp => rsvp.attendance === 'yes');
-        const notAttending = data.rsvps.filter(rsvp => rsvp.attendance === 'no');
-        const totalGuests = attending.reduce((sum, rsvp) => sum + (rsvp.guest_count || 1), 0);
-        
-        setStats({
-          total: data.rsvps.length,
-          attending: attending.length,
-          notAttending: notAttending.length,
-          totalGuests: totalGuests
-        });
+        // Statistics are aggregated server-side
+        if (weddingData?.id) {
+          const summaryResponse = await fetch(`${backendUrl}/api/rsvp/${weddingData.id}/summary`);
+          const summary = await summaryResponse.json();
+          if (summary.success) {
+            setStats({
+              total: summary.total,
+              attending: summary.attending,
+              notAttending: summary.not_attending,
+              totalGuests: summary.total_guests
+            });
+          }
+        }
       } else {
         setError(data.message || 'Failed to fetch RSVPs');
       }
@@ -1322,6 +1345,26 @@ const RSVPAdminContent = ({ weddingData, theme }) => {
     }
   };
 
+  const loadMoreRSVPs = async () => {
+    if (!nextCursor) return;
+    
+    try {
+      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+      const weddingId = weddingData?.shareable_id || weddingData?.id;
+      const response = await fetch(
+        `${backendUrl}/api/rsvp/shareable/${weddingId}?after=${encodeURIComponent(nextCursor)}`
+      );
+      const data = await response.json();
+      
+      if (data.success) {
+        setRsvps(prev => [...prev, ...data.rsvps]);
+        setNextCursor(data.next_cursor || null);
+      }
+    } catch (err) {
+      console.error('Error loading more RSVPs:', err);
+    }
+  };
+
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       year: 'numeric',
@@ -1389,7 +1432,7 @@ const RSVPAdminContent = ({ weddingData, theme }) => {
       <div className="space-y-4">
         <div className="flex items-center justify-between">
           <h4 className="text-xl font-semibold" style={{ color: theme.primary }}>
-            Guest Responses ({rsvps.length})
+            Guest Responses ({stats.total || rsvps.length})
           </h4>
           <button
             onClick={fetchRSVPs}
@@ -1482,6 +1525,15 @@ const RSVPAdminContent = ({ weddingData, theme }) => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <button
+                onClick={loadMoreRSVPs}
+                className="w-full px-4 py-2 rounded-xl bg-white/10 hover:bg-white/20 transition-colors"
+                style={{ color: theme.text }}
+              >
+                Load more
+              </button>
+            )}
           </div>
         )}
       </div>
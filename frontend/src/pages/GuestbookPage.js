@@ -15,9 +15,11 @@ const GuestbookPage = () => {
   });
 
   const [messages, setMessages] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
+  const [notice, setNotice] = useState('');
 
   // Get wedding ID for API calls
   const weddingId = weddingData?.id || 'default';
@@ -26,6 +28,20 @@ const GuestbookPage = () => {
     fetchMessages();
   }, [weddingId]);
 
+  // Live updates: new messages are pushed by the server instead of re-fetching
+  useEffect(() => {
+    if (!weddingId || weddingId === 'default' || typeof EventSource === 'undefined') return;
+    
+    const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+    const source = new EventSource(`${backendUrl}/api/live/${weddingId}`);
+    source.addEventListener('guestbook', (event) => {
+      const message = JSON.parse(event.data);
+      setMessages(prev => prev.some(m => m.id === message.id) ? prev : [message, ...prev]);
+    });
+    
+    return () => source.close();
+  }, [weddingId]);
+
   const fetchMessages = async () => {
     setLoading(true);
     setError('');
@@ -37,6 +53,7 @@ const GuestbookPage = () => {
       
       if (data.success) {
         setMessages(data.messages || []);
+        setNextCursor(data.next_cursor || null);
       } else {
         setError('Failed to load messages');
       }
@@ -48,10 +65,30 @@ const GuestbookPage = () => {
     }
   };
 
+  const loadMoreMessages = async () => {
+    if (!nextCursor) return;
+    
+    try {
+      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+      const response = await fetch(
+        `${backendUrl}/api/guestbook/${weddingId}?before=${encodeURIComponent(nextCursor)}`
+      );
+      const data = await response.json();
+      
+      if (data.success) {
+        setMessages(prev => [...prev, ...data.messages]);
+        setNextCursor(data.next_cursor || null);
+      }
+    } catch (err) {
+      console.error('Error loading more messages:', err);
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setSubmitting(true);
     setError('');
+    setNotice('');
     
     try {
       const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
@@ -70,10 +107,16 @@ const GuestbookPage = () => {
       
       if (data.success) {
         setNewMessage({ name: '', message: '', relationship: '' });
-        // Refresh messages to show the new one
-        await fetchMessages();
+        // The live feed delivers the new message; this only covers browsers without EventSource
+        if (typeof EventSource === 'undefined') {
+          await fetchMessages();
+        }
         // Show success message without alert
         setError('');
+        // Held for moderation: it won't show up in the list until it is approved
+        if (data.status && data.status !== 'published') {
+          setNotice('Thank you! Your message is awaiting moderation and will appear once it has been approved.');
+        }
       } else {
         setError('Failed to send message. Please try again.');
       }
@@ -173,6 +216,15 @@ const GuestbookPage = () => {
               </div>
             )}
             
+            {notice && (
+              <div
+                className="p-4 rounded-xl text-center"
+                style={{ background: `${theme.accent}20`, border: `1px solid ${theme.accent}40`, color: theme.text }}
+              >
+                {notice}
+              </div>
+            )}
+            
             <div className="grid md:grid-cols-2 gap-6">
               <div>
                 <label 
@@ -367,6 +419,20 @@ const GuestbookPage = () => {
                 </div>
               ))
             )}
+            {!loading && !error && nextCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMoreMessages}
+                  className="px-6 py-3 rounded-xl font-semibold transition-all duration-300 hover:scale-105"
+                  style={{
+                    background: theme.gradientAccent,
+                    color: theme.primary
+                  }}
+                >
+                  Load More Messages
+                </button>
+              </div>
+            )}
           </div>
         </div>
 
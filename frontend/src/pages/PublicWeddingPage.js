@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { useAppTheme } from '../App';
 import { Calendar, MapPin, Heart, Clock, User, MessageCircle, Camera, ArrowLeft, Home, BookOpen, Mail, Users, Gift, HelpCircle, Star, Menu, X } from 'lucide-react';
 import FloatingNavbar from '../components/FloatingNavbar';
+import { takeBootstrapData } from '../utils/bootstrapData';
 
 // Default wedding data for fallback
 const defaultWeddingData = {
@@ -87,6 +88,15 @@ const PublicWeddingPage = () => {
       const identifier = shareableId || weddingId;
       
       if (identifier) {
+        // Server-rendered page already carries the wedding - skip the fetch
+        const inlinedData = takeBootstrapData(
+          shareableId ? `/api/wedding/share/${shareableId}` : `/api/wedding/public/${weddingId}`
+        );
+        if (inlinedData) {
+          setWeddingData(inlinedData);
+          return;
+        }
+        
         try {
           // Use REACT_APP_BACKEND_URL environment variable or fallback to localhost:8001
           let backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
@@ -0,0 +1,24 @@
+// Public wedding data the server inlines into index.html for /share/{id} and
+// /{username} (see public_bootstrap_script in backend/server.py), so the first
+// render doesn't have to fetch it again
+
+const BOOTSTRAP_ELEMENT_ID = 'wedding-bootstrap';
+
+// Returns the inlined API response for `endpoint` (e.g. "/api/wedding/user/alice")
+// the first time it is asked for, otherwise null
+export const takeBootstrapData = (endpoint) => {
+  const element = document.getElementById(BOOTSTRAP_ELEMENT_ID);
+  if (!element) {
+    return null;
+  }
+  // Only valid for the page load it came with
+  element.remove();
+
+  try {
+    const bootstrap = JSON.parse(element.textContent);
+    return bootstrap.endpoint === endpoint ? bootstrap.data : null;
+  } catch (error) {
+    console.error('Invalid bootstrap data:', error);
+    return null;
+  }
+};
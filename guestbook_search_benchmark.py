@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: guestbook full-text search latency at 10k messages per wedding.
+
+Seeds one wedding with 10,000 messages (plus noise from other weddings) in a
+scratch database "<DB_NAME>_benchmark", builds the same text index the server
+uses and times ranked searches. The database is dropped afterwards.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+
+from indexes import GUESTBOOK_TEXT_INDEX, GUESTBOOK_TEXT_WEIGHTS  # noqa: E402
+
+MONGO_URL = os.getenv("MONGO_URL")
+DB_NAME = os.getenv("DB_NAME", "weddingcard") + "_benchmark"
+MESSAGES = 10000
+OTHER_WEDDINGS = 20
+QUERIES = ["Rita", "aunt", "congratulations forever", "college roommate", "zzzz"]
+RUNS = 50
+
+NAMES = ["Rita", "James", "Emma", "Oliver", "Grace", "David", "Lisa", "Alex"]
+RELATIONSHIPS = ["Aunt", "Uncle", "Cousin", "College roommate", "Friend", "Colleague"]
+WORDS = ("love happiness forever congratulations wishing beautiful couple journey "
+         "together laughter memories celebrate joy family friends adventure").split()
+
+
+def make_message(wedding_id, created_at):
+    return {
+        "id": str(uuid.uuid4()),
+        "wedding_id": wedding_id,
+        "name": f"{random.choice(NAMES)} {random.choice(['Smith', 'Lee', 'Patel', 'Garcia'])}",
+        "relationship": random.choice(RELATIONSHIPS),
+        "message": " ".join(random.choice(WORDS) for _ in range(40)),
+        "status": "published",
+        "created_at": created_at.isoformat(),
+    }
+
+
+async def seed(database, wedding_id):
+    start = datetime.utcnow()
+    for offset in range(0, MESSAGES, 1000):
+        batch = [make_message(wedding_id, start - timedelta(minutes=offset + i)) for i in range(1000)]
+        await database.guestbook.insert_many(batch, ordered=False)
+
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    database = client[DB_NAME]
+    wedding_id = str(uuid.uuid4())
+
+    try:
+        print(f"🌱 Seeding {MESSAGES} messages (+{OTHER_WEDDINGS} other weddings)")
+        await seed(database, wedding_id)
+        for _ in range(OTHER_WEDDINGS):
+            await seed(database, str(uuid.uuid4()))
+        await database.guestbook.create_index(GUESTBOOK_TEXT_INDEX, weights=GUESTBOOK_TEXT_WEIGHTS)
+
+        print(f"🔎 {RUNS} runs per query, first page of 20")
+        for q in QUERIES:
+            start = time.perf_counter()
+            for _ in range(RUNS):
+                results = await database.guestbook.find(
+                    {"wedding_id": wedding_id, "status": "published", "$text": {"$search": q}},
+                    {"_id": 0, "score": {"$meta": "textScore"}}
+                ).sort([("score", {"$meta": "textScore"}), ("created_at", -1)]).limit(20).to_list(length=20)
+            elapsed = (time.perf_counter() - start) / RUNS * 1000
+            print(f"   {q!r:<28} {elapsed:8.2f} ms  ({len(results)} results)")
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: live feed fan-out with thousands of idle SSE subscribers.
+
+Opens N in-process subscriptions spread over a set of weddings, measures the
+memory they hold while idle and the time to publish an event to every
+subscriber of a busy wedding. No Mongo or HTTP server needed.
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from live_feed import FeedBroker  # noqa: E402
+
+SUBSCRIBER_COUNTS = [1000, 5000, 20000]
+WEDDINGS = 50
+PUBLISHES = 200
+
+
+async def bench(subscribers):
+    broker = FeedBroker()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions = [broker.subscribe(f"wedding-{i % WEDDINGS}") for i in range(subscribers)]
+    idle_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    event = {"id": "x", "wedding_id": "wedding-0", "name": "Aunt Rita", "message": "Congratulations! " * 5}
+    start = time.perf_counter()
+    for _ in range(PUBLISHES):
+        broker.publish("wedding-0", "guestbook", event)
+        # Idle subscribers drain their queues
+        for subscription in subscriptions[::WEDDINGS]:
+            subscription.queue.get_nowait()
+    per_publish = (time.perf_counter() - start) / PUBLISHES * 1000
+
+    print(f"   {subscribers:>6} subscribers  {idle_bytes / subscribers:8.0f} B/subscriber idle  "
+          f"{per_publish:7.3f} ms/publish to {subscribers // WEDDINGS} listeners")
+
+    for subscription in subscriptions:
+        broker.unsubscribe(subscription)
+
+
+async def main():
+    print(f"📡 Live feed fan-out ({WEDDINGS} weddings)")
+    for subscribers in SUBSCRIBER_COUNTS:
+        await bench(subscribers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
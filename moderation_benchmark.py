@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: guestbook moderation filter throughput.
+
+Runs batches of synthetic guestbook messages through ModerationFilter with word
+lists of increasing size and reports messages/second. No Mongo needed.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from moderation import ModerationFilter  # noqa: E402
+
+WORDLIST_SIZES = [0, 100, 1000, 10000]
+MESSAGES = 20000
+BATCH_SIZE = 100
+
+WORDS = ("love happiness forever congratulations wishing beautiful couple journey "
+         "together laughter memories celebrate joy family friends adventure").split()
+
+
+def make_messages():
+    messages = []
+    for i in range(MESSAGES):
+        text = " ".join(random.choice(WORDS) for _ in range(60))
+        if i % 50 == 0:
+            text += " cheap pills at http://spam.example and http://more.example"
+        messages.append({"name": f"Guest {i}", "relationship": "Friend", "message": text})
+    return messages
+
+
+def main():
+    messages = make_messages()
+    print(f"🛡️ {MESSAGES} messages, batches of {BATCH_SIZE}")
+    for size in WORDLIST_SIZES:
+        words = [f"blocked{i}" for i in range(size)] + (["pills"] if size else [])
+        moderation_filter = ModerationFilter(words, [r"\bcasino\b"], max_urls=1)
+
+        start = time.perf_counter()
+        flagged = 0
+        for offset in range(0, MESSAGES, BATCH_SIZE):
+            verdicts = moderation_filter.check_batch(messages[offset:offset + BATCH_SIZE])
+            flagged += sum(1 for reasons in verdicts if reasons)
+        elapsed = time.perf_counter() - start
+        print(f"   {size:>6} blocked words  {MESSAGES / elapsed:10.0f} messages/s  ({flagged} flagged)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first-visit load time of a public wedding page under simulated latency.
+
+Serves a throwaway CRA-style build (with asset-manifest.json) through server.py
+in-process, and models a cold browser cache over a link with RTT_MS round
+trips and SERVER_THINK_MS of page handling:
+
+  no hints     - bundles found by parsing the HTML, hero photo once the JS renders
+  Link header  - everything in the page's Link: rel=preload fetched as soon as
+                 its headers arrive
+  Early Hints  - the same links delivered in a 103 before the server starts on
+                 the page (the http.response.early_hint ASGI extension)
+
+Bandwidth is not modelled, so the numbers are the round-trip bound only.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).parent
+RTT_MS = [50, 100, 200]
+SERVER_THINK_MS = 80
+ROUNDS = 5
+HERO_IMAGE = "https://images.example/hero.jpg?w=1600"
+ENTRYPOINTS = ["static/css/main.0a1b2c3d.css", "static/js/main.3f2a1b4c.js"]
+
+
+def write_build(build: Path):
+    (build / "index.html").write_text(
+        "<!doctype html><html><head><title>Wedding Card</title>"
+        '<script defer src="/static/js/main.3f2a1b4c.js"></script>'
+        '<link href="/static/css/main.0a1b2c3d.css" rel="stylesheet"></head>'
+        '<body><div id="root"></div></body></html>'
+    )
+    (build / "asset-manifest.json").write_text(
+        '{"files": {}, "entrypoints": [' + ", ".join(f'"{path}"' for path in ENTRYPOINTS) + "]}"
+    )
+    for relative_path in ENTRYPOINTS:
+        path = build / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 50_000)
+
+
+async def fetch(app, url: str, rtt: float, think: float = 0, on_hint=None) -> dict:
+    """One GET over the simulated link; images on other hosts cost a round trip"""
+    await asyncio.sleep(rtt / 2)
+    if not url.startswith("/"):
+        await asyncio.sleep(rtt / 2)
+        return {"headers": {}, "body": b""}
+    response = {"headers": {}, "body": b""}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": url, "raw_path": url.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"identity")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        "extensions": {"http.response.early_hint": {}} if on_hint else {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.early_hint":
+            # The 103 travels back while the server keeps working on the page
+            asyncio.get_running_loop().call_later(rtt / 2, on_hint, [link.decode() for link in message["links"]])
+        elif message["type"] == "http.response.start":
+            await asyncio.sleep(think)
+            response["headers"] = {key.decode().lower(): value.decode() for key, value in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    await asyncio.sleep(rtt / 2)
+    return response
+
+
+def link_urls(values) -> list:
+    return [match for value in values for match in re.findall(r"<([^>]+)>", value)]
+
+
+async def load_page(app, path: str, mode: str, rtt: float) -> float:
+    """Milliseconds until the HTML, the entrypoint bundles and the hero photo are all in"""
+    requested = {}
+
+    def request(urls):
+        for url in urls:
+            if url not in requested:
+                requested[url] = asyncio.ensure_future(fetch(app, url, rtt))
+
+    start = time.perf_counter()
+    on_hint = (lambda links: request(link_urls(links))) if mode == "Early Hints" else None
+    page = await fetch(app, path, rtt, SERVER_THINK_MS / 1000, on_hint=on_hint)
+    if mode != "no hints":
+        request(link_urls([page["headers"].get("link", "")]))
+    request(url.decode() for url in re.findall(rb'(?:src|href)="(/static/[^"]+)"', page["body"]))
+    await asyncio.gather(*requested.values())
+    # Rendering the gallery is what discovers the hero photo without a hint
+    request([HERO_IMAGE])
+    await asyncio.gather(*requested.values())
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        build = Path(tmp)
+        write_build(build)
+        os.environ["FRONTEND_BUILD_PATH"] = str(build)
+        os.environ["STORAGE_BACKEND"] = "embedded"
+        os.environ["EMBEDDED_DB_PATH"] = str(build / "benchmark.db")
+        sys.path.insert(0, str(ROOT_DIR / "backend"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            import server  # noqa: E402
+        server.USERS_FILE = build / "users.json"
+        server.WEDDINGS_FILE = build / "weddings.json"
+        await server.startup_event()
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                username = f"bench{int(time.time())}"
+                session = (await client.post("/api/auth/register", json={"username": username, "password": "bench"})).json()
+                headers = {"Authorization": f"Bearer {session['session_id']}"}
+                wedding = (await client.get("/api/wedding", headers=headers)).json()
+                wedding["gallery_photos"] = [{"url": HERO_IMAGE, "caption": "Us"}]
+                await client.put("/api/wedding", headers=headers, json=wedding)
+                # Warm the bootstrap cache the Early Hints read the hero photo from
+                await client.get(f"/{username}")
+
+            modes = ["no hints", "Link header", "Early Hints"]
+            print(f"{'RTT':>6} " + " ".join(f"{mode:>13}" for mode in modes) + "   (ms to HTML + bundles + hero photo)")
+            for rtt_ms in RTT_MS:
+                timings = []
+                for mode in modes:
+                    runs = [await load_page(server.app, f"/{username}", mode, rtt_ms / 1000) for _ in range(ROUNDS)]
+                    timings.append(sorted(runs)[len(runs) // 2])
+                print(f"{rtt_ms:>4}ms " + " ".join(f"{timing:>13.0f}" for timing in timings))
+        finally:
+            await server.shutdown_event()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: RSVP stats read cost vs. number of RSVPs per wedding.
+
+Compares the incrementally maintained counters document (GET /api/rsvp/{id}/counts)
+against the aggregation pipeline (GET /api/rsvp/{id}/summary). Runs against a
+scratch database "<DB_NAME>_benchmark" which is dropped afterwards.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+
+from server import rsvp_summary_pipeline, RSVP_COUNT_ACCUMULATORS  # noqa: E402
+
+MONGO_URL = os.getenv("MONGO_URL")
+DB_NAME = os.getenv("DB_NAME", "weddingcard") + "_benchmark"
+RSVP_COUNTS = [100, 1000, 10000, 50000]
+READS = 200
+
+
+def make_rsvp(wedding_id, i):
+    return {
+        "id": str(uuid.uuid4()),
+        "wedding_id": wedding_id,
+        "guest_name": f"Guest {i}",
+        "guest_email": f"guest{i}@example.com",
+        "attendance": "yes" if i % 3 else "no",
+        "guest_count": 1 + i % 4,
+        "dietary_restrictions": ["", "vegetarian", "vegan", "gluten free"][i % 4],
+        "special_message": "Congratulations! " * 10,
+    }
+
+
+async def timed(label, func):
+    start = time.perf_counter()
+    for _ in range(READS):
+        await func()
+    elapsed = (time.perf_counter() - start) / READS * 1000
+    print(f"   {label:<12} {elapsed:8.3f} ms/read")
+    return elapsed
+
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    database = client[DB_NAME]
+    await database.rsvps.create_index("wedding_id")
+    await database.rsvp_counters.create_index("wedding_id", unique=True)
+
+    try:
+        for count in RSVP_COUNTS:
+            wedding_id = str(uuid.uuid4())
+            print(f"📊 {count} RSVPs")
+            for offset in range(0, count, 1000):
+                batch = [make_rsvp(wedding_id, i) for i in range(offset, min(offset + 1000, count))]
+                await database.rsvps.insert_many(batch, ordered=False)
+
+            # Seed the counters document the way the reconciler does
+            pipeline = [{"$match": {"wedding_id": wedding_id}},
+                        {"$group": {"_id": "$wedding_id", **RSVP_COUNT_ACCUMULATORS}}]
+            row = (await database.rsvps.aggregate(pipeline).to_list(length=1))[0]
+            row.pop("_id")
+            await database.rsvp_counters.insert_one({"wedding_id": wedding_id, **row})
+
+            await timed("counters", lambda: database.rsvp_counters.find_one(
+                {"wedding_id": wedding_id}, {"_id": 0}))
+            await timed("aggregation", lambda: database.rsvps.aggregate(
+                rsvp_summary_pipeline(wedding_id)).to_list(length=1))
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
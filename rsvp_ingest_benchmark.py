@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sustained RSVP ingestion rate, direct upsert vs. batched queue.
+
+Simulates a deadline-day surge of concurrent submitters against a scratch
+database "<DB_NAME>_benchmark" (dropped afterwards) and reports RSVPs/second
+for both ingestion modes. Both go through server.py's own write path - the
+direct mode calls upsert_rsvp as submit_rsvp does, the queue mode is the one
+start_rsvp_ingest_queue builds - with the production indexes applied and a
+distinct guest email per RSVP, so every write is a real upsert.
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+
+import server  # noqa: E402
+from indexes import apply_indexes  # noqa: E402
+from rsvp_ingest import IngestQueueFull  # noqa: E402
+
+MONGO_URL = os.getenv("MONGO_URL")
+DB_NAME = os.getenv("DB_NAME", "weddingcard") + "_benchmark"
+SUBMITTERS = 200
+DURATION = 10.0
+
+guest_numbers = itertools.count()
+
+
+def make_rsvp(wedding_id):
+    email = f"guest{next(guest_numbers)}@example.com"
+    return {
+        "id": str(uuid.uuid4()),
+        "wedding_id": wedding_id,
+        "guest_name": "Benchmark Guest",
+        "guest_email": email,
+        "guest_email_normalized": server.normalize_email(email),
+        "guest_phone": "",
+        "attendance": "yes",
+        "guest_count": 2,
+        "dietary_restrictions": "",
+        "special_message": "See you there!",
+        "submitted_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def run_submitters(database, submit):
+    wedding_id = str(uuid.uuid4())
+    await database.weddings.insert_one({"id": wedding_id, "shareable_id": wedding_id[:8]})
+    accepted = rejected = 0
+    deadline = time.perf_counter() + DURATION
+
+    async def submitter():
+        nonlocal accepted, rejected
+        while time.perf_counter() < deadline:
+            try:
+                await submit(make_rsvp(wedding_id))
+                accepted += 1
+            except IngestQueueFull:
+                rejected += 1
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(submitter() for _ in range(SUBMITTERS)))
+    return accepted, rejected
+
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    database = client[DB_NAME]
+    server.database = database
+    await apply_indexes(database, ["weddings", "rsvps", "rsvp_counters"])
+
+    async def direct(rsvp):
+        rsvp_id = await server.upsert_rsvp(rsvp)
+        await server.publish_live_event(rsvp["wedding_id"], "rsvp", {**rsvp, "id": rsvp_id})
+
+    try:
+        print(f"📊 {SUBMITTERS} concurrent submitters for {DURATION:.0f}s per mode")
+
+        start = time.perf_counter()
+        accepted, _ = await run_submitters(database, direct)
+        elapsed = time.perf_counter() - start
+        print(f"   direct  {accepted / elapsed:10.1f} RSVPs/s")
+
+        server.RSVP_INGEST_MODE = "queue"
+        server.start_rsvp_ingest_queue()
+        queue = server.rsvp_ingest_queue
+
+        async def enqueue(rsvp):
+            queue.submit(rsvp)
+            await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        accepted, rejected = await run_submitters(database, enqueue)
+        await queue.drain()
+        elapsed = time.perf_counter() - start
+        print(f"   queue   {(queue.inserted + queue.updated) / elapsed:10.1f} RSVPs/s written "
+              f"({accepted} acknowledged, {rejected} rejected with 503, {queue.failed} failed)")
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SPA route and static asset serving throughput.
+
+Builds a throwaway CRA-style build (index.html, hashed JS/CSS bundles) and
+serves the same requests through the previous catch-all handler (a stat per
+request, three prints, FileResponse without cache headers) and through
+server.py's manifest-backed handler, in-process via httpx's ASGI transport.
+Also counts the bundle requests a returning visitor still has to send.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+
+ROOT_DIR = Path(__file__).parent
+REQUESTS = 2000
+SPA_ROUTES = ["/", "/share/ab12cd34", "/alice", "/alice/gallery", "/dashboard"]
+ASSETS = {
+    "static/js/main.3f2a1b4c.js": 600_000,
+    "static/js/453.9c8d7e6f.chunk.js": 120_000,
+    "static/css/main.0a1b2c3d.css": 80_000,
+}
+
+
+def write_build(build: Path):
+    (build / "index.html").write_text(
+        "<!doctype html><html><head><title>Wedding Card</title>"
+        '<script defer src="/static/js/main.3f2a1b4c.js"></script>'
+        '<link href="/static/css/main.0a1b2c3d.css" rel="stylesheet"></head>'
+        '<body><div id="root"></div></body></html>' + "<!-- padding -->" * 100
+    )
+    (build / "manifest.json").write_text('{"short_name": "Wedding Card"}')
+    for relative_path, size in ASSETS.items():
+        path = build / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+
+
+def legacy_app(build: Path) -> FastAPI:
+    """The catch-all handler (and /static mount) as it was before the static manifest"""
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=str(build / "static")), name="static")
+
+    @app.get("/{full_path:path}")
+    async def serve_react_app(full_path: str):
+        print(f"🌐 Serving route: {full_path}")
+        if full_path.startswith("api"):
+            raise HTTPException(status_code=404, detail="API endpoint not found")
+        if full_path and not full_path.startswith("api"):
+            static_file_path = build / full_path
+            if static_file_path.exists() and static_file_path.is_file():
+                print(f"📁 Serving static file: {static_file_path}")
+                return FileResponse(static_file_path)
+        index_path = build / "index.html"
+        print(f"⚛️ Serving React app: {index_path}")
+        return FileResponse(index_path)
+
+    return app
+
+
+async def throughput(app, paths) -> float:
+    transport = httpx.ASGITransport(app=app)
+    # identity so client-side decompression doesn't count against precompressed assets
+    headers = {"Accept-Encoding": "identity"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            response = await client.get(paths[i % len(paths)])
+            assert response.status_code == 200, response.status_code
+        return REQUESTS / (time.perf_counter() - start)
+
+
+async def repeat_visit_requests(app) -> int:
+    """Bundle requests a returning visitor still sends (immutable ones come from the browser cache)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = [await client.get(f"/{relative_path}") for relative_path in ASSETS]
+    return sum("immutable" not in response.headers.get("cache-control", "") for response in responses)
+
+
+def bare_app(handler) -> FastAPI:
+    """Just the catch-all route, so both handlers are timed without the API middleware"""
+    app = FastAPI()
+    app.add_api_route("/{full_path:path}", handler, methods=["GET"])
+    return app
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        build = Path(tmp)
+        write_build(build)
+        os.environ["FRONTEND_BUILD_PATH"] = str(build)
+        os.environ.setdefault("STORAGE_BACKEND", "embedded")
+        os.environ.setdefault("EMBEDDED_DB_PATH", str(build / "benchmark.db"))
+        sys.path.insert(0, str(ROOT_DIR / "backend"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            import server  # noqa: E402
+
+        apps = {
+            "legacy": legacy_app(build),
+            "manifest": bare_app(server.serve_react_app),
+            "manifest + API middleware": server.app,
+        }
+        asset_paths = [f"/{relative_path}" for relative_path in ASSETS]
+        print(f"{'handler':<26} {'SPA routes/s':>14} {'assets/s':>10} {'repeat-visit requests':>22}")
+        for name, app in apps.items():
+            # Keep the legacy handler's per-request prints off the terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                spa = await throughput(app, SPA_ROUTES)
+                assets = await throughput(app, asset_paths)
+                repeat = await repeat_visit_requests(app)
+            print(f"{name:<26} {spa:>14.0f} {assets:>10.0f} {repeat:>22}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the same API workload against MongoDB and the embedded SQLite store.
+
+Runs registration/login/session lookups, RSVP upserts with counter updates,
+keyset-paginated RSVP listing, the summary aggregation and guestbook
+posting/listing against both backends and reports operations per second.
+MongoDB uses a scratch database "<DB_NAME>_benchmark" (skipped if unreachable);
+the embedded store uses a temporary file. Both are removed afterwards.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+
+from embedded_store import EmbeddedDatabase  # noqa: E402
+from indexes import apply_indexes  # noqa: E402
+from server import rsvp_summary_pipeline  # noqa: E402
+
+MONGO_URL = os.getenv("MONGO_URL")
+DB_NAME = os.getenv("DB_NAME", "weddingcard") + "_benchmark"
+USERS = 500
+RSVPS = 5000
+GUESTBOOK_MESSAGES = 2000
+PAGE_SIZE = 100
+READS = 200
+
+
+def make_rsvp(wedding_id, i):
+    return {
+        "id": str(uuid.uuid4()),
+        "wedding_id": wedding_id,
+        "guest_name": f"Guest {i}",
+        "guest_email": f"guest{i}@example.com",
+        "guest_email_normalized": f"guest{i}@example.com",
+        "attendance": "yes" if i % 3 else "no",
+        "guest_count": 1 + i % 4,
+        "dietary_restrictions": ["", "vegetarian", "vegan", "gluten free"][i % 4],
+        "special_message": "Congratulations! " * 10,
+        "submitted_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def register_users(database):
+    for i in range(USERS):
+        username = f"user{i}"
+        if await database.users.find_one({"username": username}, {"_id": 1}):
+            continue
+        user_id = str(uuid.uuid4())
+        await database.users.insert_one({"id": user_id, "username": username, "password": "secret"})
+        await database.weddings.insert_one({"id": str(uuid.uuid4()), "user_id": user_id,
+                                            "shareable_id": uuid.uuid4().hex[:8], "couple_name_1": "A"})
+    return USERS
+
+
+async def login_and_sessions(database):
+    for i in range(USERS):
+        user = await database.users.find_one({"username": f"user{i}", "password": "secret"}, {"_id": 0, "id": 1})
+        session_id = str(uuid.uuid4())
+        await database.sessions.insert_one({"session_id": session_id, "user_id": user["id"],
+                                            "created_at": datetime.utcnow()})
+        await database.sessions.find_one({"session_id": session_id})
+        await database.weddings.find_one({"user_id": user["id"]})
+    return USERS * 4
+
+
+async def upsert_rsvps(database, wedding_id):
+    for i in range(RSVPS):
+        rsvp = make_rsvp(wedding_id, i)
+        await database.rsvps.find_one_and_update(
+            {"wedding_id": wedding_id, "guest_email_normalized": rsvp["guest_email_normalized"]},
+            {"$set": rsvp}, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+        await database.rsvp_counters.update_one(
+            {"wedding_id": wedding_id}, {"$inc": {"responses": 1, "attending": int(rsvp["attendance"] == "yes")}},
+            upsert=True
+        )
+    return RSVPS * 2
+
+
+async def page_rsvps(database, wedding_id):
+    pages, after = 0, None
+    while True:
+        query = {"wedding_id": wedding_id}
+        if after:
+            query["$or"] = [{"submitted_at": {"$gt": after[0]}}, {"submitted_at": after[0], "id": {"$gt": after[1]}}]
+        rsvps = await database.rsvps.find(query, {"_id": 0}).sort(
+            [("submitted_at", 1), ("id", 1)]).limit(PAGE_SIZE).to_list(length=PAGE_SIZE)
+        pages += 1
+        if len(rsvps) < PAGE_SIZE:
+            return pages
+        after = (rsvps[-1]["submitted_at"], rsvps[-1]["id"])
+
+
+async def summarize(database, wedding_id):
+    for _ in range(READS // 10):
+        await database.rsvps.aggregate(rsvp_summary_pipeline(wedding_id)).to_list(length=1)
+    return READS // 10
+
+
+async def post_guestbook(database, wedding_id):
+    for i in range(GUESTBOOK_MESSAGES):
+        await database.guestbook.insert_one({
+            "id": str(uuid.uuid4()), "wedding_id": wedding_id, "name": f"Guest {i}", "relationship": "Friend",
+            "message": "Wishing you a lifetime of love and laughter", "status": "published",
+            "created_at": datetime.utcnow().isoformat(),
+        })
+    return GUESTBOOK_MESSAGES
+
+
+async def list_guestbook(database, wedding_id):
+    query = {"wedding_id": wedding_id, "status": "published"}
+    for _ in range(READS):
+        await database.guestbook.find(query, {"_id": 0}).sort([("created_at", -1), ("id", -1)]).limit(50).to_list(length=50)
+        await database.guestbook.count_documents(query)
+    return READS * 2
+
+
+WORKLOAD = [
+    ("register", register_users),
+    ("login + sessions", login_and_sessions),
+    ("rsvp upserts", upsert_rsvps),
+    ("rsvp pages", page_rsvps),
+    ("rsvp summary", summarize),
+    ("guestbook posts", post_guestbook),
+    ("guestbook list", list_guestbook),
+]
+
+
+async def run_workload(label, database):
+    print(f"🏁 {label}")
+    failed = await apply_indexes(database)
+    if failed:
+        print(f"   ⚠️ indexes not created: {', '.join(failed)}")
+    wedding_id = str(uuid.uuid4())
+    results = {}
+    for name, step in WORKLOAD:
+        start = time.perf_counter()
+        args = (database,) if step in (register_users, login_and_sessions) else (database, wedding_id)
+        operations = await step(*args)
+        elapsed = time.perf_counter() - start
+        results[name] = operations / elapsed
+        print(f"   {name:<18} {operations:>6} ops  {results[name]:10.0f} ops/s")
+    return results
+
+
+async def main():
+    results = {}
+
+    client = None
+    try:
+        client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=2000)
+        await client[DB_NAME].command("ping")
+    except Exception as e:
+        print(f"⚠️ MongoDB unavailable, skipping: {e}")
+    else:
+        try:
+            results["mongo"] = await run_workload("MongoDB", client[DB_NAME])
+        finally:
+            await client.drop_database(DB_NAME)
+    if client:
+        client.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = EmbeddedDatabase(Path(tmp) / "benchmark.db", DB_NAME)
+        try:
+            results["embedded"] = await run_workload("Embedded SQLite (WAL)", database)
+        finally:
+            database.close()
+
+    if len(results) == 2:
+        print("📊 embedded / mongo throughput")
+        for name, _ in WORKLOAD:
+            print(f"   {name:<18} {results['embedded'][name] / results['mongo'][name]:6.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
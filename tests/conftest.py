@@ -0,0 +1,29 @@
+"""
+Shared fixtures.
+
+`server` imports a fresh backend/server.py against embedded storage in a temp
+directory, with the JSON backups kept out of the repository.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    monkeypatch.setenv("STORAGE_BACKEND", "embedded")
+    monkeypatch.setenv("EMBEDDED_DB_PATH", str(tmp_path / "server.db"))
+    monkeypatch.syspath_prepend(str(BACKEND_DIR))
+    sys.modules.pop("server", None)
+    module = importlib.import_module("server")
+    monkeypatch.setattr(module, "USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr(module, "WEDDINGS_FILE", tmp_path / "weddings.json")
+    yield module
+    sys.modules.pop("server", None)
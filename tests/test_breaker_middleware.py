@@ -0,0 +1,49 @@
+"""
+MongoCircuitBreakerMiddleware while the breaker is open: writes fail fast,
+public GETs fall back to their last known good response, exempt paths pass.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+class FakeMongoClient:
+    """The middleware only guards MongoDB-backed deployments"""
+
+    def close(self):
+        pass
+
+
+def test_open_breaker_serves_stale_reads_and_rejects_writes(server):
+    with TestClient(server.app) as client:
+        session_id = client.post("/api/auth/register", json={"username": f"cb{time.time_ns()}", "password": "pw"}).json()["session_id"]
+        wedding_id = client.get("/api/wedding", headers={"Authorization": f"Bearer {session_id}"}).json()["id"]
+        server.mongodb_client = FakeMongoClient()
+        try:
+            fresh = client.get(f"/api/guestbook/{wedding_id}")
+            assert fresh.status_code == 200 and "x-degraded" not in fresh.headers
+
+            for _ in range(server.mongo_breaker.failure_threshold):
+                server.mongo_breaker.record_failure("AutoReconnect")
+            assert server.mongo_breaker.state == "open"
+
+            stale = client.get(f"/api/guestbook/{wedding_id}")
+            assert stale.status_code == 200 and stale.headers["x-degraded"] == "stale"
+            assert stale.json() == fresh.json()
+
+            never_cached = client.get(f"/api/guestbook/{wedding_id}?limit=5")
+            assert never_cached.status_code == 503 and int(never_cached.headers["retry-after"]) >= 1
+            write = client.post("/api/rsvp", json={"wedding_id": wedding_id, "guest_name": "Ada", "attendance": "yes"})
+            assert write.status_code == 503
+
+            assert client.get("/api/test").status_code == 200
+            assert client.get("/api/metrics").json()["mongo_breaker"]["state"] == "open"
+        finally:
+            server.mongodb_client = None
@@ -0,0 +1,83 @@
+"""
+CircuitBreaker state machine: trips on failures or slow calls, half-opens after
+a successful probe and closes after enough healthy commands.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from circuit_breaker import BreakerCommandListener, CircuitBreaker, LastKnownGoodCache, in_request  # noqa: E402
+
+
+def test_trips_after_failure_threshold():
+    breaker = CircuitBreaker(failure_threshold=3)
+    for _ in range(2):
+        breaker.record_failure("AutoReconnect")
+    assert breaker.allow_request()
+    breaker.record_failure("AutoReconnect")
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.metrics()["rejected"] == 1
+
+
+def test_trips_on_slow_calls():
+    breaker = CircuitBreaker(slow_call_threshold=2, latency_threshold_ms=100)
+    breaker.record_success(50)
+    breaker.record_success(150)
+    assert breaker.state == "closed"
+    breaker.record_success(150)
+    assert breaker.state == "open"
+
+
+def test_probe_half_opens_and_successes_close():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0, half_open_successes=2)
+    breaker.record_failure("timeout")
+    assert breaker.probe_due()
+    breaker.probe_succeeded()
+    assert breaker.state == "half_open"
+    breaker.record_success(1)
+    breaker.record_success(1)
+    assert breaker.state == "closed"
+
+
+def test_failure_in_half_open_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0)
+    breaker.record_failure("timeout")
+    breaker.probe_succeeded()
+    breaker.record_failure("timeout again")
+    assert breaker.state == "open"
+    assert breaker.last_trip_reason == "timeout again"
+
+
+def test_last_known_good_evicts_least_recent():
+    cache = LastKnownGoodCache(max_entries=2)
+    cache.store("a", b"1", "application/json")
+    cache.store("b", b"2", "application/json")
+    cache.get("a")
+    cache.store("c", b"3", "application/json")
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == b"1"
+
+
+def test_listener_counts_only_request_path_commands():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=1, latency_threshold_ms=100)
+    listener = BreakerCommandListener(breaker)
+    # A change stream getMore waiting out maxAwaitTimeMS, then a dropped connection
+    slow = type("Event", (), {"duration_micros": 1_000_000, "command_name": "getMore"})()
+    dropped = type("Event", (), {"duration_micros": 10, "command_name": "aggregate",
+                                 "failure": {"errtype": "AutoReconnect"}})()
+    listener.succeeded(slow)
+    listener.failed(dropped)
+    assert breaker.state == "closed"
+
+    token = in_request.set(True)
+    try:
+        listener.failed(dropped)
+    finally:
+        in_request.reset(token)
+    assert breaker.state == "open"
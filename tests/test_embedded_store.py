@@ -0,0 +1,157 @@
+"""
+EmbeddedDatabase against the query shapes in queries.py: filters compiled to
+SQL and matched in Python agree with MongoDB's semantics, pipelines group and
+facet like the summary endpoint expects, upserts seed from the filter and
+unique indexes from INDEX_SPEC reject duplicates.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from pymongo import InsertOne, ReturnDocument  # noqa: E402
+from pymongo.errors import BulkWriteError, DuplicateKeyError  # noqa: E402
+
+from embedded_store import EmbeddedDatabase, matches  # noqa: E402
+from indexes import apply_indexes  # noqa: E402
+from queries import (  # noqa: E402
+    RSVP_PAGE_SORT,
+    guest_email_rsvps_query,
+    rsvp_identity_filters,
+    rsvp_page_query,
+    rsvp_summary_pipeline,
+)
+
+DOCUMENTS = [
+    {"id": "a", "wedding_id": "w1", "attendance": "yes", "guest_count": 2, "submitted_at": "2025-01-01",
+     "guest_email_normalized": "ada@example.com", "meta": {"source": "form"}},
+    {"id": "b", "wedding_id": "w1", "attendance": "no", "submitted_at": "2025-01-01",
+     "guest_email_normalized": "", "meta": {"source": "code"}, "guest_id": "g1"},
+    {"id": "c", "wedding_id": "w1", "attendance": "yes", "guest_count": None, "submitted_at": "2025-01-02",
+     "dietary_restrictions": " Vegan "},
+    {"id": "d", "wedding_id": "w2", "attendance": "yes", "guest_count": 4, "submitted_at": "2025-01-01",
+     "dietary_restrictions": "vegan", "meta": {}},
+]
+
+
+def run(tmp_path, scenario):
+    async def wrapped():
+        database = EmbeddedDatabase(tmp_path / "store.db")
+        try:
+            return await scenario(database)
+        finally:
+            database.close()
+
+    return asyncio.run(wrapped())
+
+
+@pytest.mark.parametrize("query, expected", [
+    ({"guest_count": {"$in": [2, None]}}, {"a", "b", "c"}),
+    ({"guest_count": {"$nin": [2, None]}}, {"d"}),
+    ({"guest_count": {"$exists": True}}, {"a", "c", "d"}),
+    ({"guest_id": {"$exists": False}}, {"a", "c", "d"}),
+    ({"meta.source": "code"}, {"b"}),
+    ({"meta.source": {"$in": ["form", "code"]}}, {"a", "b"}),
+    ({"meta.source": {"$exists": False}}, {"c", "d"}),
+    ({"$or": [{"meta.source": "form"}, {"dietary_restrictions": {"$exists": True}}]}, {"a", "c", "d"}),
+    (rsvp_page_query("w1", attendance="yes"), {"a", "c"}),
+    (rsvp_page_query("w1", ("2025-01-01", "a")), {"b", "c"}),
+    (guest_email_rsvps_query("w1", ["ada@example.com", "bob@example.com"]), {"a"}),
+    ({"$or": rsvp_identity_filters({"wedding_id": "w1", "guest_id": "g1", "guest_email_normalized": "x"})}, {"b"}),
+])
+def test_sql_and_python_filters_agree(tmp_path, query, expected):
+    async def scenario(database):
+        await database.rsvps.insert_many([dict(document) for document in DOCUMENTS])
+        return {document["id"] for document in await database.rsvps.find(query).to_list(length=None)}
+
+    assert run(tmp_path, scenario) == expected
+    assert {document["id"] for document in DOCUMENTS if matches(document, query)} == expected
+
+
+def test_keyset_pages_follow_the_sort(tmp_path):
+    async def scenario(database):
+        await database.rsvps.insert_many([dict(document) for document in DOCUMENTS])
+        page = await database.rsvps.find(rsvp_page_query("w1"), {"_id": 0, "id": 1}).sort(RSVP_PAGE_SORT).to_list(2)
+        after = await database.rsvps.find(rsvp_page_query("w1", ("2025-01-01", page[-1]["id"])), {"_id": 0, "id": 1}) \
+            .sort(RSVP_PAGE_SORT).to_list(2)
+        return [document["id"] for document in page + after]
+
+    assert run(tmp_path, scenario) == ["a", "b", "c"]
+
+
+def test_group_and_facet_produce_the_summary_shape(tmp_path):
+    async def scenario(database):
+        await database.rsvps.insert_many([dict(document) for document in DOCUMENTS])
+        return (
+            await database.rsvps.aggregate(rsvp_summary_pipeline("w1")).to_list(length=None),
+            await database.rsvps.aggregate(rsvp_summary_pipeline("nobody")).to_list(length=None),
+        )
+
+    summary, empty = run(tmp_path, scenario)
+    assert summary == [{
+        # guest_count null counts as one guest, as $ifNull does on MongoDB
+        "totals": [{"_id": None, "responses": 3, "attending": 2, "not_attending": 1, "total_guests": 3}],
+        "dietary_restrictions": [{"_id": "vegan", "count": 1, "guests": 1}],
+    }]
+    assert empty == [{"totals": [], "dietary_restrictions": []}]
+
+
+def test_upserts_seed_from_the_filter_and_apply_set_on_insert_once(tmp_path):
+    async def scenario(database):
+        query = {"wedding_id": "w1", "guest_email_normalized": "ada@example.com"}
+        update = {"$set": {"attendance": "yes"}, "$setOnInsert": {"id": "r1"}, "$inc": {"revisions": 1}}
+        first = await database.rsvps.update_one(query, update, upsert=True)
+        before = await database.rsvps.find_one_and_update(
+            query, {**update, "$setOnInsert": {"id": "r2"}}, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+        counter = await database.rsvp_counters.find_one_and_update(
+            {"wedding_id": "w1"}, {"$inc": {"responses": 1, "attending": 1}},
+            {"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        stored = await database.rsvps.find({}, {"_id": 0}).to_list(length=None)
+        return first.upserted_id is not None, before, counter, stored
+
+    upserted, before, counter, stored = run(tmp_path, scenario)
+    assert upserted
+    assert before["id"] == "r1" and before["revisions"] == 1
+    assert counter == {"wedding_id": "w1", "responses": 1, "attending": 1}
+    assert stored == [{
+        "wedding_id": "w1", "guest_email_normalized": "ada@example.com",
+        "attendance": "yes", "id": "r1", "revisions": 2,
+    }]
+
+
+def test_unique_indexes_from_the_spec_reject_duplicates(tmp_path):
+    async def scenario(database):
+        assert await apply_indexes(database, ["rsvps", "guests"]) == []
+        rsvp = {"wedding_id": "w1", "guest_email_normalized": "ada@example.com"}
+        await database.rsvps.insert_one({"id": "r1", **rsvp})
+        with pytest.raises(DuplicateKeyError):
+            await database.rsvps.insert_one({"id": "r2", **rsvp})
+        # Outside the partial index: empty emails never collide
+        await database.rsvps.insert_many([{"id": f"e{i}", "wedding_id": "w1", "guest_email_normalized": ""} for i in range(2)])
+
+        await database.guests.insert_one({"id": "g1", "wedding_id": "w1", "invitation_code": "ABC"})
+        with pytest.raises(DuplicateKeyError):
+            await database.guests.update_one(
+                {"wedding_id": "w1", "email_normalized": "bob@example.com"},
+                {"$setOnInsert": {"id": "g2", "invitation_code": "ABC"}}, upsert=True
+            )
+        with pytest.raises(BulkWriteError) as error:
+            await database.guests.bulk_write([
+                InsertOne({"id": "g3", "wedding_id": "w1", "invitation_code": "ABC"}),
+                InsertOne({"id": "g4", "wedding_id": "w1", "invitation_code": "DEF"}),
+            ], ordered=False)
+        guests = await database.guests.distinct("id")
+        return error.value.details, sorted(guests), await database.rsvps.count_documents({})
+
+    details, guests, rsvps = run(tmp_path, scenario)
+    assert [(e["index"], e["code"]) for e in details["writeErrors"]] == [(0, 11000)]
+    assert details["nInserted"] == 1
+    assert guests == ["g1", "g4"]
+    assert rsvps == 3
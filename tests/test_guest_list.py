@@ -0,0 +1,70 @@
+"""
+The couple's guest list: CSV uploads keyed on email, and the invited-vs-
+responded view joining it to RSVPs by invitation code or email.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def register(client) -> dict:
+    username = f"guests{time.time_ns()}"
+    session_id = client.post("/api/auth/register", json={"username": username, "password": "pw"}).json()["session_id"]
+    headers = {"Authorization": f"Bearer {session_id}"}
+    return {"headers": headers, "wedding": client.get("/api/wedding", headers=headers).json()}
+
+
+def upload(client, headers, content: bytes):
+    return client.post("/api/guests/upload", headers=headers, files={"file": ("guests.csv", content, "text/csv")})
+
+
+def test_reuploads_update_guests_instead_of_duplicating_them(server):
+    with TestClient(server.app) as client:
+        owner = register(client)
+        csv = "name,email,phone,party_size\nAda,ada@example.com,,2\nBob,,,1\n,nobody@example.com,,1\nAda L.,ADA@example.com ,,3\n"
+        assert upload(client, owner["headers"], csv.encode()).json() == {
+            "success": True, "inserted": 2, "updated": 0, "skipped": 2,
+        }
+        code = client.get("/api/guests", headers=owner["headers"]).json()["guests"][0]["invitation_code"]
+
+        again = upload(client, owner["headers"], b"name,email,party_size\nAda Lovelace,ada@example.com,4\n").json()
+        assert (again["inserted"], again["updated"]) == (0, 1)
+        guests = client.get("/api/guests", headers=owner["headers"]).json()["guests"]
+        assert [(guest["name"], guest["party_size"]) for guest in guests] == [("Ada Lovelace", 4), ("Bob", 1)]
+        # The printed invitation stays valid
+        assert guests[0]["invitation_code"] == code
+
+
+def test_unreadable_uploads_are_rejected(server):
+    with TestClient(server.app) as client:
+        owner = register(client)
+        assert upload(client, owner["headers"], "name\nZoë\n".encode("latin-1")).status_code == 400
+        # Past the csv module's field size limit
+        assert upload(client, owner["headers"], b"name\n" + b"a" * 200000 + b"\n").status_code == 400
+
+
+def test_guests_are_matched_to_rsvps_by_code_or_email(server):
+    with TestClient(server.app) as client:
+        owner = register(client)
+        wedding_id = owner["wedding"]["id"]
+        upload(client, owner["headers"], b"name,email\nAda,ada@example.com\nBob,bob@example.com\nCy,\n")
+        guests = {guest["name"]: guest for guest in client.get("/api/guests", headers=owner["headers"]).json()["guests"]}
+
+        client.post("/api/rsvp", json={"invitation_code": guests["Ada"]["invitation_code"], "attendance": "yes", "guest_count": 2})
+        # Bob answered from the public form, without his code
+        client.post("/api/rsvp", json={
+            "wedding_id": wedding_id, "guest_name": "Bob", "guest_email": " Bob@Example.com", "attendance": "no",
+        })
+
+        view = client.get("/api/guests", headers=owner["headers"]).json()
+        assert {guest["name"]: (guest.get("rsvp") or {}).get("attendance") for guest in view["guests"]} == {
+            "Ada": "yes", "Bob": "no", "Cy": None,
+        }
+        assert (view["invited"], view["responded"], view["attending"], view["awaiting"]) == (3, 2, 1, 1)
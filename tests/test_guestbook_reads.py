@@ -0,0 +1,57 @@
+"""
+Guestbook read endpoints over a fixed set of stored messages: keyset pages
+newest first and ranked search, published messages only.
+"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+MESSAGES = [
+    {"id": "m1", "wedding_id": "w1", "name": "Ada", "message": "Congratulations to you both, love from Ada and Bob",
+     "status": "published", "created_at": "2025-01-01T10:00:00"},
+    {"id": "m2", "wedding_id": "w1", "name": "Bob", "message": "See you on the dance floor",
+     "status": "published", "created_at": "2025-01-02T10:00:00"},
+    {"id": "m3", "wedding_id": "w1", "name": "Cy", "message": "Wishing you a lifetime of happiness",
+     "status": "published", "created_at": "2025-01-02T10:00:00"},
+    {"id": "m4", "wedding_id": "w1", "name": "Di", "message": "Cheers to the happy couple",
+     "status": "published", "created_at": "2025-01-03T10:00:00"},
+    {"id": "m5", "wedding_id": "w1", "name": "Eve", "message": "Bob told me the news",
+     "status": "pending", "created_at": "2025-01-04T10:00:00"},
+    {"id": "m6", "wedding_id": "w2", "name": "Bob", "message": "Congratulations!",
+     "status": "published", "created_at": "2025-01-04T10:00:00"},
+]
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as client:
+        client.portal.call(server.database.guestbook.insert_many, [dict(message) for message in MESSAGES])
+        yield client
+
+
+def test_pages_split_ties_on_id_and_end_without_a_cursor(client):
+    first = client.get("/api/guestbook/w1", params={"limit": 2}).json()
+    # m3 and m2 share a created_at: the page boundary falls inside the tie
+    assert [message["id"] for message in first["messages"]] == ["m4", "m3"]
+    assert first["next_cursor"] == "2025-01-02T10:00:00,m3" and first["total_count"] == 4
+
+    last = client.get("/api/guestbook/w1", params={"limit": 2, "before": first["next_cursor"]}).json()
+    assert [message["id"] for message in last["messages"]] == ["m2", "m1"]
+    assert last["next_cursor"] is None and "total_count" not in last
+
+
+def test_search_ranks_published_messages_of_one_wedding(client):
+    # A name match (m2) outranks a mention in a message (m1); the pending
+    # message and the other wedding's never match
+    found = client.get("/api/guestbook/w1/search", params={"q": "bob"}).json()
+    assert [message["id"] for message in found["messages"]] == ["m2", "m1"]
+    assert found["next_offset"] is None
+
+    paged = client.get("/api/guestbook/w1/search", params={"q": "bob", "limit": 1}).json()
+    assert [message["id"] for message in paged["messages"]] == ["m2"] and paged["next_offset"] == 1
+    assert client.get("/api/guestbook/w1/search", params={"q": "  "}).status_code == 400
@@ -0,0 +1,53 @@
+"""
+INDEX_SPEC bootstrap and QUERY_SHAPES verification against embedded storage:
+every shape the handlers issue is index-served once the spec is applied, and a
+missing index fails verification.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from embedded_store import EmbeddedDatabase  # noqa: E402
+from indexes import INDEX_SPEC, QUERY_SHAPES, apply_indexes, verify_indexes  # noqa: E402
+
+
+def run(tmp_path, scenario):
+    async def wrapped():
+        database = EmbeddedDatabase(tmp_path / "indexes.db")
+        try:
+            return await scenario(database)
+        finally:
+            database.close()
+
+    return asyncio.run(wrapped())
+
+
+def test_every_query_shape_is_index_served(tmp_path, capsys):
+    async def scenario(database):
+        # Idempotent: applying twice changes nothing and fails nothing
+        failed = await apply_indexes(database) + await apply_indexes(database)
+        created = {name: await database[name].index_information() for name in INDEX_SPEC}
+        return failed, created, await verify_indexes(database)
+
+    failed, created, verified = run(tmp_path, scenario)
+    assert failed == []
+    for name, models in INDEX_SPEC.items():
+        assert {model.document["name"] for model in models} <= set(created[name])
+    assert verified is True
+    assert capsys.readouterr().out.count("✅") == len(QUERY_SHAPES)
+
+
+def test_a_missing_index_fails_verification(tmp_path, capsys):
+    async def scenario(database):
+        await apply_indexes(database, [name for name in INDEX_SPEC if name != "rsvp_counters"])
+        await database.rsvp_counters.insert_one({"wedding_id": "w1", "responses": 1})
+        return await verify_indexes(database)
+
+    assert run(tmp_path, scenario) is False
+    assert "❌ rsvp counters" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+"""
+FeedBroker: replay by event id, per-subscriber field limits and eviction of
+idle replay buffers.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from live_feed import FeedBroker  # noqa: E402
+
+PUBLIC = {"guestbook": frozenset({"id", "name", "message"})}
+
+
+def test_replay_orders_ids_by_time_and_limits_fields():
+    broker = FeedBroker()
+    broker.publish("w1", "rsvp", {"id": "r1", "guest_email": "ada@example.com"}, event_id="1700000000-7")
+    broker.publish("w1", "guestbook", {"id": "g1", "name": "Ada", "message": "Hi", "moderation_claim": "x"}, event_id="1700000001-1")
+
+    assert [event["id"] for event in broker.replay_after("w1", "1700000000-5")] == ["1700000000-7", "1700000001-1"]
+    assert [event["id"] for event in broker.replay_after("w1", "1700000000-7")] == ["1700000001-1"]
+    assert broker.replay_after("w1", "12") == []
+
+    public = broker.replay_after("w1", "0-0", PUBLIC)
+    assert [event["data"] for event in public] == [{"id": "g1", "name": "Ada", "message": "Hi"}]
+    subscription = broker.subscribe("w1", PUBLIC)
+    broker.publish("w1", "rsvp", {"id": "r2"})
+    assert subscription.queue.empty()
+
+
+def test_idle_replay_buffers_are_evicted():
+    broker = FeedBroker(replay_ttl=0.05, max_replay_weddings=5)
+    broker.subscribe("watched")
+    broker.publish("watched", "rsvp", {"id": "r"})
+    for i in range(3):
+        broker.publish(f"w{i}", "rsvp", {"id": "r"})
+    time.sleep(0.1)
+    broker.publish("fresh", "rsvp", {"id": "r"})
+    # Idle and unwatched buffers go; a watched one stays for reconnects
+    assert set(broker._recent) == {"watched", "fresh"}
+    # The cap holds even for watched weddings
+    for i in range(5):
+        broker.publish(f"x{i}", "rsvp", {"id": "r"})
+    assert list(broker._recent) == [f"x{i}" for i in range(5)]
+    assert broker.metrics()["evicted_replay_buffers"] == 5
+
+
+def test_rsvps_posted_by_share_link_reach_the_owners_feed(server):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        session_id = client.post("/api/auth/register", json={"username": f"live{time.time_ns()}", "password": "pw"}).json()["session_id"]
+        wedding = client.get("/api/wedding", headers={"Authorization": f"Bearer {session_id}"}).json()
+        response = client.post("/api/rsvp", json={
+            "wedding_id": wedding["shareable_id"], "guest_name": "Ada", "guest_email": "ada@example.com", "attendance": "yes",
+        })
+        assert response.status_code == 200
+
+        # The dashboard subscribes under the wedding id
+        events = server.live_feed.replay_after(wedding["id"], "0-0")
+        assert [event["data"]["id"] for event in events] == [response.json()["rsvp_id"]]
+        assert server.live_feed.replay_after(wedding["shareable_id"], "0-0") == []
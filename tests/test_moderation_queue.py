@@ -0,0 +1,43 @@
+"""
+The couple's moderation decision wins over a worker still holding the message.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def server(server, monkeypatch):
+    # Claims are taken by hand below
+    monkeypatch.setattr(server, "start_moderation_workers", lambda: None)
+    return server
+
+
+def test_rejection_is_not_overwritten_by_the_claiming_worker(server):
+    published = []
+
+    async def publish_live_event(wedding_key, kind, document):
+        published.append(document["id"])
+
+    server.publish_live_event = publish_live_event
+    with TestClient(server.app) as client:
+        session_id = client.post("/api/auth/register", json={"username": f"mod{time.time_ns()}", "password": "pw"}).json()["session_id"]
+        headers = {"Authorization": f"Bearer {session_id}"}
+        wedding_id = client.get("/api/wedding", headers=headers).json()["id"]
+        message_id = client.post("/api/guestbook", json={"wedding_id": wedding_id, "name": "Ada", "message": "Congrats!"}).json()["message_id"]
+
+        claimed = client.portal.call(server.claim_pending_messages, 10)
+        assert [message["id"] for message in client.get("/api/guestbook/moderation/queue", headers=headers).json()["messages"]] == [message_id]
+        assert client.post(f"/api/guestbook/moderation/{message_id}", headers=headers, json={"action": "reject"}).status_code == 200
+        client.portal.call(server.moderate_batch, claimed)
+
+        stored = client.portal.call(server.database.guestbook.find_one, {"id": message_id})
+        assert stored["status"] == "rejected" and "moderation_claim" not in stored
+        assert published == []
@@ -0,0 +1,102 @@
+"""
+Handlers only fetch the fields they use.
+
+Every find_projected() result is wrapped in a dict that records which keys the
+handler reads with [] or get(); after driving the auth, wedding, RSVP and
+guestbook routes against embedded storage, the fields read for each use case
+must be exactly the fields its projection fetches. Use cases that hand the
+whole document to the client are only checked for the fields they exclude.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+# Returned to the client as-is, so every field is used
+WHOLE_DOCUMENT_USE_CASES = {"wedding_owner", "wedding_public"}
+
+
+class ReadTrackingDict(dict):
+    """dict that remembers which keys were looked up by name"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+
+@pytest.fixture
+def server(server, monkeypatch):
+    server.lookups = []
+    find_projected = server.find_projected
+
+    async def tracking_find_projected(collection, query, use_case):
+        document = await find_projected(collection, query, use_case)
+        if document is None:
+            return None
+        document = ReadTrackingDict(document)
+        server.lookups.append((use_case, document))
+        return document
+
+    monkeypatch.setattr(server, "find_projected", tracking_find_projected)
+    return server
+
+
+def test_handlers_read_every_fetched_field(server):
+    username = f"proj{int(time.time() * 1000)}"
+    with TestClient(server.app) as client:
+        assert client.post("/api/auth/register", json={"username": username, "password": "pw"}).status_code == 200
+        assert client.post("/api/auth/register", json={"username": username, "password": "pw"}).status_code == 400
+        session_id = client.post("/api/auth/login", json={"username": username, "password": "pw"}).json()["session_id"]
+        headers = {"Authorization": f"Bearer {session_id}"}
+
+        # Force the session to be restored from storage
+        server.active_sessions.clear()
+        assert client.get("/api/profile", headers=headers).status_code == 200
+
+        wedding = client.get("/api/wedding", headers=headers).json()
+        assert client.post("/api/wedding", headers=headers, json={}).status_code == 400
+        assert client.put("/api/wedding", headers=headers, json={**wedding, "couple_name_1": "Ada"}).status_code == 200
+        assert client.put("/api/wedding/party", headers=headers, json={"bridal_party": []}).status_code == 200
+
+        server.shareable_id_cache.clear()
+        assert client.get(f"/api/wedding/share/{wedding['shareable_id']}").status_code == 200
+        assert "user_id" not in client.get(f"/api/wedding/public/{wedding['id']}").json()
+        assert client.get(f"/api/wedding/user/{username}").json()["couple_name_1"] == "Ada"
+        assert client.get(f"/api/wedding/user/{username}/rsvp").status_code == 200
+        # Second render revalidates the cached page
+        for _ in range(2):
+            assert client.portal.call(server.public_bootstrap_script, username) is not None
+
+        assert client.post("/api/rsvp", json={
+            "wedding_id": wedding["id"], "guest_name": "Guest", "guest_email": "guest@example.com", "attendance": "yes",
+        }).status_code == 200
+        server.shareable_id_cache.clear()
+        assert client.get(f"/api/rsvp/shareable/{wedding['shareable_id']}").status_code == 200
+        assert client.get("/api/guestbook/moderation/queue", headers=headers).status_code == 200
+
+    read_by_use_case = {}
+    for use_case, document in server.lookups:
+        read_by_use_case.setdefault(use_case, set()).update(document.read)
+    assert set(read_by_use_case) == set(server.PROJECTIONS)
+    for use_case, read in read_by_use_case.items():
+        projection = server.PROJECTIONS[use_case]
+        if use_case in WHOLE_DOCUMENT_USE_CASES:
+            excluded = {field for field, include in projection.items() if not include}
+            assert not any(excluded & set(document) for case, document in server.lookups if case == use_case)
+        else:
+            fetched = {field for field, include in projection.items() if include} - {"_id"}
+            assert read == fetched, f"{use_case} fetches {sorted(fetched)} but reads {sorted(read)}"
@@ -0,0 +1,81 @@
+"""
+The inlined public wedding data: cached pages are revalidated against the
+stored wedding, and unknown names are remembered only briefly.
+"""
+
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def bootstrapped(script: bytes) -> dict:
+    return json.loads(script.decode().split(">", 1)[1].rsplit("<", 1)[0])["data"]
+
+
+def test_edits_from_another_worker_replace_the_cached_page(server):
+    username = f"boot{time.time_ns()}"
+    with TestClient(server.app) as client:
+        client.post("/api/auth/register", json={"username": username, "password": "pw"})
+        assert bootstrapped(client.portal.call(server.public_bootstrap_script, username))["couple_name_1"] == "Sarah"
+
+        # Written straight to the database, as another worker would - this
+        # process's forget_public_bootstrap never runs
+        client.portal.call(server.database.weddings.update_one, {"shareable_id": {"$exists": True}}, {
+            "$set": {"couple_name_1": "Ada", "updated_at": "2999-01-01T00:00:00"}
+        })
+        assert bootstrapped(client.portal.call(server.public_bootstrap_script, username))["couple_name_1"] == "Ada"
+
+
+def test_unknown_usernames_are_remembered_briefly(server):
+    username = f"late{time.time_ns()}"
+    with TestClient(server.app) as client:
+        assert client.portal.call(server.public_bootstrap_script, username) is None
+        assert f"/api/wedding/user/{username}" in server.public_bootstrap_misses
+
+        lookups = []
+        get_wedding_by_username = server.get_wedding_by_username
+        server.get_wedding_by_username = lambda *args, **kwargs: lookups.append(args)
+        try:
+            assert client.portal.call(server.public_bootstrap_script, username) is None
+        finally:
+            server.get_wedding_by_username = get_wedding_by_username
+        assert lookups == []
+
+        # Registering here clears the miss straight away
+        client.post("/api/auth/register", json={"username": username, "password": "pw"})
+        assert client.portal.call(server.public_bootstrap_script, username) is not None
+
+
+def test_pages_without_a_stored_wedding_are_only_kept_for_the_ttl(server, monkeypatch):
+    username = f"plain{time.time_ns()}"
+    with TestClient(server.app) as client:
+        client.post("/api/auth/register", json={"username": username, "password": "pw"})
+        # No stored wedding: the page shows default data
+        client.portal.call(server.database.weddings.delete_many, {})
+        assert bootstrapped(client.portal.call(server.public_bootstrap_script, username))["id"] == "default"
+
+        lookups = []
+        find_projected = server.find_projected
+
+        async def tracking_find_projected(collection, query, shape):
+            lookups.append(shape)
+            return await find_projected(collection, query, shape)
+
+        monkeypatch.setattr(server, "find_projected", tracking_find_projected)
+        # Cached default data is served without revalidating
+        assert client.portal.call(server.public_bootstrap_script, username) is not None
+        assert "wedding_version" not in lookups
+
+        # An entry whose wedding is gone is looked up once, then kept for the TTL
+        endpoint = f"/api/wedding/user/{username}"
+        server.public_bootstrap_cache[endpoint] = ("gone", b"<script></script>", time.monotonic(), None, "2024-01-01")
+        for _ in range(2):
+            assert client.portal.call(server.public_bootstrap_script, username) == b"<script></script>"
+        assert lookups.count("wedding_version") == 1
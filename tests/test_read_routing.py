@@ -0,0 +1,189 @@
+"""
+Read-preference routing against a local three-node replica set.
+
+The replica_set fixture starts three mongod processes (skipped when mongod is
+not on PATH), and a CommandListener records which member served each find so
+the tests can check public reads land on secondaries while an owner who just
+wrote keeps reading from the primary.
+"""
+
+import asyncio
+import importlib
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+pytest.importorskip("fastapi")
+
+from pymongo import MongoClient, WriteConcern, monitoring  # noqa: E402
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+REPLICA_SET = "rs_read_routing"
+MEMBERS = 3
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(predicate, timeout=60, message="condition"):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return
+        except pymongo.errors.PyMongoError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Timed out waiting for {message}")
+
+
+@pytest.fixture(scope="module")
+def replica_set():
+    """Three local mongod processes as one replica set; yields the connection URL"""
+    mongod = shutil.which("mongod")
+    if not mongod:
+        pytest.skip("mongod not installed")
+
+    data_dir = tempfile.mkdtemp(prefix="read-routing-")
+    ports = [free_port() for _ in range(MEMBERS)]
+    processes = []
+    try:
+        for i, port in enumerate(ports):
+            db_path = Path(data_dir) / f"node{i}"
+            db_path.mkdir()
+            processes.append(subprocess.Popen(
+                [mongod, "--replSet", REPLICA_SET, "--port", str(port), "--dbpath", str(db_path),
+                 "--bind_ip", "127.0.0.1", "--quiet"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+
+        seed = MongoClient("127.0.0.1", ports[0], directConnection=True, serverSelectionTimeoutMS=2000)
+        wait_for(lambda: seed.admin.command("ping"), message="mongod to start")
+        seed.admin.command("replSetInitiate", {
+            "_id": REPLICA_SET,
+            "members": [
+                # node0 is always elected so the tests know which member is primary
+                {"_id": i, "host": f"127.0.0.1:{port}", "priority": 2 if i == 0 else 1}
+                for i, port in enumerate(ports)
+            ],
+        })
+        wait_for(
+            lambda: sorted(m["stateStr"] for m in seed.admin.command("replSetGetStatus")["members"])
+            == ["PRIMARY", "SECONDARY", "SECONDARY"],
+            message="replica set election",
+        )
+        seed.close()
+
+        hosts = ",".join(f"127.0.0.1:{port}" for port in ports)
+        yield {"url": f"mongodb://{hosts}/?replicaSet={REPLICA_SET}", "primary": ("127.0.0.1", ports[0])}
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+class FindRecorder(monitoring.CommandListener):
+    """Remembers the member address of every find command"""
+
+    def __init__(self):
+        self.finds = []
+
+    def started(self, event):
+        if event.command_name == "find":
+            self.finds.append((event.command.get("find"), event.connection_id))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server(replica_set):
+    os.environ.update({
+        "MONGO_URL": replica_set["url"],
+        "DB_NAME": f"read_routing_{uuid.uuid4().hex[:8]}",
+        "MONGO_PUBLIC_READ_PREFERENCE": "secondaryPreferred",
+        "MONGO_MAX_STALENESS_SECONDS": "90",
+    })
+    sys.path.insert(0, str(BACKEND_DIR))
+    recorder = FindRecorder()
+    monitoring.register(recorder)
+    module = importlib.import_module("server")
+
+    # Motor binds the client to the loop it was created on, so every test
+    # shares this one
+    module.test_loop = asyncio.new_event_loop()
+    module.test_loop.run_until_complete(module.connect_to_mongo())
+    module.recorder = recorder
+    yield module
+    module.test_loop.run_until_complete(module.mongodb_client.drop_database(os.environ["DB_NAME"]))
+    module.mongodb_client.close()
+    module.test_loop.close()
+
+
+def run(server, coro):
+    return server.test_loop.run_until_complete(coro)
+
+
+def served_by(server, collection):
+    return [address for name, address in server.recorder.finds if name == collection]
+
+
+def test_public_reads_go_to_secondaries(server, replica_set):
+    wedding_id = str(uuid.uuid4())
+    # w=3 so every secondary already has the document
+    weddings = server.database.weddings.with_options(write_concern=WriteConcern(w=MEMBERS))
+    run(server, weddings.insert_one({"id": wedding_id, "user_id": "owner", "couple_name_1": "A"}))
+    server.recorder.finds.clear()
+
+    for _ in range(5):
+        read_db = run(server, server.get_read_db(None))
+        run(server, server.get_public_wedding_data(wedding_id, read_db=read_db))
+
+    addresses = served_by(server, "weddings")
+    assert len(addresses) == 5
+    assert replica_set["primary"] not in addresses
+    assert server.read_routing_stats["public"] >= 5
+
+
+def test_owner_reads_stay_on_primary_after_write(server, replica_set):
+    user_id = str(uuid.uuid4())
+    session_id = str(uuid.uuid4())
+    server.active_sessions[session_id] = {"session_id": session_id, "user_id": user_id}
+    server.recent_writers.mark(user_id)
+    server.recorder.finds.clear()
+
+    read_db = run(server, server.get_read_db(session_id))
+    assert read_db is server.database
+    run(server, read_db.weddings.find_one({"user_id": user_id}))
+    assert served_by(server, "weddings") == [replica_set["primary"]]
+
+
+def test_owner_without_recent_write_uses_public_reads(server):
+    user_id = str(uuid.uuid4())
+    session_id = str(uuid.uuid4())
+    server.active_sessions[session_id] = {"session_id": session_id, "user_id": user_id}
+
+    assert run(server, server.get_read_db(session_id)) is server.public_db
+
+
+def test_unknown_session_stays_on_primary(server):
+    # Sessions created by another worker aren't in memory yet
+    assert run(server, server.get_read_db(str(uuid.uuid4()))) is server.database
@@ -0,0 +1,57 @@
+"""
+RSVP exports: only the wedding's owner can download them, as CSV or NDJSON
+with the exported fields in listing order.
+"""
+
+import csv
+import io
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def register(client) -> dict:
+    session_id = client.post(
+        "/api/auth/register", json={"username": f"export{time.time_ns()}", "password": "pw"}
+    ).json()["session_id"]
+    headers = {"Authorization": f"Bearer {session_id}"}
+    return {"headers": headers, "wedding": client.get("/api/wedding", headers=headers).json()}
+
+
+def test_exports_are_owner_only_in_both_formats(server):
+    with TestClient(server.app) as client:
+        owner = register(client)
+        stranger = register(client)
+        client.cookies.clear()
+        wedding_id = owner["wedding"]["id"]
+        client.portal.call(server.database.rsvps.insert_many, [
+            {"id": "r2", "wedding_id": wedding_id, "guest_name": "Bob, Jr.", "attendance": "no",
+             "submitted_at": "2025-01-02T00:00:00", "guest_email_normalized": "bob@example.com"},
+            {"id": "r1", "wedding_id": wedding_id, "guest_name": "Ada", "attendance": "yes", "guest_count": 2,
+             "submitted_at": "2025-01-01T00:00:00"},
+        ])
+        url = f"/api/rsvp/{wedding_id}/export"
+
+        assert client.get(url).status_code == 401
+        assert client.get(url, headers=stranger["headers"]).status_code == 404
+        assert client.get(url, headers=owner["headers"], params={"format": "xml"}).status_code == 400
+
+        exported = client.get(url, headers=owner["headers"])
+        assert exported.headers["content-type"] == "text/csv; charset=utf-8"
+        assert exported.headers["content-disposition"] == f'attachment; filename="rsvps-{wedding_id}.csv"'
+        rows = list(csv.DictReader(io.StringIO(exported.text)))
+        assert [(row["id"], row["guest_name"], row["guest_count"]) for row in rows] == [("r1", "Ada", "2"), ("r2", "Bob, Jr.", "")]
+        assert "guest_email_normalized" not in rows[0]
+
+        exported = client.get(url, headers=owner["headers"], params={"format": "ndjson"})
+        assert exported.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in exported.text.splitlines()]
+        assert [line["id"] for line in lines] == ["r1", "r2"]
+        assert "guest_email_normalized" not in lines[1]
@@ -0,0 +1,56 @@
+"""
+RSVPIngestQueue keeps acknowledged RSVPs through a database outage.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from pymongo.errors import AutoReconnect  # noqa: E402
+from rsvp_ingest import RSVPIngestQueue  # noqa: E402
+
+
+class FlakyCollection:
+    """bulk_write fails like an unreachable server for the first `outages` calls"""
+
+    def __init__(self, outages: int):
+        self.outages = outages
+        self.stored = []
+
+    async def bulk_write(self, operations, ordered=False):
+        if self.outages:
+            self.outages -= 1
+            raise AutoReconnect("connection refused")
+        self.stored.extend(operation._doc for operation in operations)
+        return type("Result", (), {"upserted_ids": {}})()
+
+
+def test_batches_survive_an_outage_and_bad_documents():
+    collection = FlakyCollection(outages=6)
+
+    def upsert_filter(document):
+        return {"guest": document["id"]} if document.get("malformed") else None
+
+    def upsert_update(document):
+        raise ValueError("no wedding_id")
+
+    async def scenario():
+        queue = RSVPIngestQueue(
+            collection_getter=lambda: collection, upsert_filter=upsert_filter, upsert_update=upsert_update,
+            flush_interval=0.01, max_backoff=0.05,
+        )
+        queue.start()
+        for i in range(5):
+            queue.submit({"id": f"r{i}"})
+        queue.submit({"id": "bad", "malformed": True})
+        await asyncio.wait_for(queue.drain(), 5)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert sorted(document["id"] for document in collection.stored) == [f"r{i}" for i in range(5)]
+    assert (queue.inserted, queue.failed) == (5, 1)
@@ -0,0 +1,76 @@
+"""
+RSVP read endpoints over a fixed set of stored RSVPs: the aggregated summary
+and keyset-paginated listing.
+"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+RSVPS = [
+    {"id": "r1", "wedding_id": "w1", "attendance": "yes", "guest_count": 2, "dietary_restrictions": "Vegan",
+     "submitted_at": "2025-01-01T10:00:00"},
+    {"id": "r2", "wedding_id": "w1", "attendance": "yes", "guest_count": 1, "dietary_restrictions": " vegan ",
+     "submitted_at": "2025-01-01T10:00:00"},
+    {"id": "r3", "wedding_id": "w1", "attendance": "yes", "dietary_restrictions": "Nut allergy",
+     "submitted_at": "2025-01-01T10:00:00"},
+    {"id": "r4", "wedding_id": "w1", "attendance": "no", "guest_count": 3, "dietary_restrictions": "Vegan",
+     "submitted_at": "2025-01-02T09:00:00"},
+    {"id": "r5", "wedding_id": "w1", "attendance": "yes", "guest_count": 4, "dietary_restrictions": "",
+     "submitted_at": "2025-01-03T09:00:00"},
+    {"id": "r6", "wedding_id": "w2", "attendance": "yes", "guest_count": 9, "submitted_at": "2025-01-01T10:00:00"},
+]
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as client:
+        client.portal.call(server.database.rsvps.insert_many, [dict(rsvp) for rsvp in RSVPS])
+        yield client
+
+
+def test_summary_aggregates_one_wedding(client):
+    assert client.get("/api/rsvp/w1/summary").json() == {
+        "success": True,
+        "wedding_id": "w1",
+        "total": 5,
+        "attending": 4,
+        "not_attending": 1,
+        # r3 has no guest_count and counts as one
+        "total_guests": 8,
+        # Attending guests only, grouped case- and whitespace-insensitively
+        "dietary_restrictions": [
+            {"restriction": "vegan", "count": 2, "guests": 3},
+            {"restriction": "nut allergy", "count": 1, "guests": 1},
+        ],
+    }
+    assert client.get("/api/rsvp/nobody/summary").json()["total"] == 0
+
+
+def test_pages_split_ties_on_id_and_end_without_a_cursor(client):
+    seen = []
+    after = None
+    while True:
+        page = client.get("/api/rsvp/w1", params={"limit": 2, **({"after": after} if after else {})}).json()
+        seen.append([rsvp["id"] for rsvp in page["rsvps"]])
+        after = page["next_cursor"]
+        if after is None:
+            break
+    # r1-r3 share a submitted_at: the page boundary falls inside the tie
+    assert seen == [["r1", "r2"], ["r3", "r4"], ["r5"]]
+
+
+def test_a_full_last_page_has_no_cursor(client):
+    first = client.get("/api/rsvp/w1", params={"limit": 3}).json()
+    assert first["next_cursor"] == "2025-01-01T10:00:00,r3"
+    last = client.get("/api/rsvp/w1", params={"limit": 2, "after": first["next_cursor"]}).json()
+    assert [rsvp["id"] for rsvp in last["rsvps"]] == ["r4", "r5"] and last["next_cursor"] is None
+    assert client.get("/api/rsvp/w1", params={"attendance": "no"}).json()["rsvps"][0]["id"] == "r4"
+
+
+def test_malformed_cursors_are_rejected(client):
+    assert client.get("/api/rsvp/w1", params={"after": "no-comma"}).status_code == 400
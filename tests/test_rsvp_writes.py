@@ -0,0 +1,97 @@
+"""
+RSVP writes and the per-wedding counters they maintain, against embedded
+storage.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+async def counters(server, wedding_id):
+    return await server.database.rsvp_counters.find_one(
+        {"wedding_id": wedding_id}, {"_id": 0, **{field: 1 for field in server.RSVP_COUNTER_FIELDS}}
+    )
+
+
+def test_reconciler_leaves_counters_bumped_during_the_pass(server):
+    async def scenario():
+        await server.connect_to_mongo()
+        try:
+            await server.database.rsvps.insert_many([
+                {"id": "r1", "wedding_id": "w1", "attendance": "yes", "guest_count": 2},
+                {"id": "r2", "wedding_id": "w2", "attendance": "no"},
+            ])
+            # w1 drifted long ago; w2 and w3 were $inc'ed after the pass started
+            await server.database.rsvp_counters.insert_many([
+                {"wedding_id": "w1", "responses": 5, "updated_at": "2020-01-01T00:00:00"},
+                {"wedding_id": "w2", "responses": 7, "updated_at": "2999-01-01T00:00:00"},
+                {"wedding_id": "w3", "responses": 1, "updated_at": "2999-01-01T00:00:00"},
+                {"wedding_id": "w4", "responses": 1, "updated_at": "2020-01-01T00:00:00"},
+            ])
+            corrected = await server.reconcile_rsvp_counters()
+            return corrected, {wedding_id: await counters(server, wedding_id) for wedding_id in ("w1", "w2", "w3", "w4")}
+        finally:
+            await server.close_mongo_connection()
+
+    corrected, stored = asyncio.run(scenario())
+    assert corrected == 2
+    assert stored["w1"] == {"responses": 1, "attending": 1, "not_attending": 0, "total_guests": 2}
+    assert stored["w2"] == {"responses": 7}
+    assert stored["w3"] == {"responses": 1}
+    assert stored["w4"] is None
+
+
+def register(client) -> dict:
+    username = f"rsvp{time.time_ns()}"
+    session_id = client.post("/api/auth/register", json={"username": username, "password": "pw"}).json()["session_id"]
+    headers = {"Authorization": f"Bearer {session_id}"}
+    return {"headers": headers, "wedding": client.get("/api/wedding", headers=headers).json()}
+
+
+def test_queued_resubmission_keeps_the_stored_id_and_moves_the_counters(server, monkeypatch):
+    monkeypatch.setattr(server, "RSVP_INGEST_MODE", "queue")
+    with TestClient(server.app) as client:
+        wedding_id = register(client)["wedding"]["id"]
+        rsvp = {"wedding_id": wedding_id, "guest_name": "Ada", "guest_email": "Ada@example.com", "attendance": "yes", "guest_count": 2}
+
+        first = client.post("/api/rsvp", json=rsvp).json()["rsvp_id"]
+        # Still queued: shares the queued RSVP's id
+        assert client.post("/api/rsvp", json=rsvp).json()["rsvp_id"] == first
+        client.portal.call(server.rsvp_ingest_queue._queue.join)
+        # Already stored: acknowledged without a lookup, the batch upsert
+        # collapses it into the stored RSVP and the counters swap yes for no
+        assert client.post("/api/rsvp", json={**rsvp, "attendance": "no"}).json()["queued"] is True
+        client.portal.call(server.rsvp_ingest_queue._queue.join)
+
+        stored = client.portal.call(lambda: server.database.rsvps.find({"wedding_id": wedding_id}, {"_id": 0}).to_list(10))
+        assert [(row["id"], row["attendance"]) for row in stored] == [(first, "no")]
+        assert client.get(f"/api/rsvp/{wedding_id}/counts").json() == {
+            "success": True, "wedding_id": wedding_id,
+            "responses": 1, "attending": 0, "not_attending": 1, "total_guests": 0,
+        }
+
+
+def test_invitation_rsvp_merges_into_the_guests_email_rsvp(server):
+    with TestClient(server.app) as client:
+        wedding_id = register(client)["wedding"]["id"]
+        client.portal.call(server.database.guests.insert_one, {
+            "id": "g1", "wedding_id": wedding_id, "name": "Ada", "email": "ada@example.com", "invitation_code": "ADA123",
+        })
+        by_email = client.post("/api/rsvp", json={
+            "wedding_id": wedding_id, "guest_name": "Ada", "guest_email": "ada@example.com", "attendance": "yes",
+        }).json()["rsvp_id"]
+        by_code = client.post("/api/rsvp", json={"invitation_code": "ada123", "attendance": "yes", "guest_count": 3})
+
+        assert by_code.status_code == 200 and by_code.json()["rsvp_id"] == by_email
+        stored = client.portal.call(lambda: server.database.rsvps.find({"wedding_id": wedding_id}, {"_id": 0}).to_list(10))
+        assert [(row["id"], row.get("guest_id"), row["guest_count"]) for row in stored] == [(by_email, "g1", 3)]
+        counts = client.get(f"/api/rsvp/{wedding_id}/counts").json()
+        assert (counts["responses"], counts["attending"], counts["total_guests"]) == (1, 1, 3)
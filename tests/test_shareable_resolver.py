@@ -0,0 +1,61 @@
+"""
+The shared shareable_id resolver: one projected lookup per shareable_id across
+every shareable route, misses never cached, and the cache LRU-bounded.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def lookups(server, monkeypatch):
+    lookups = []
+    find_projected = server.find_projected
+
+    async def tracking_find_projected(collection, query, use_case):
+        if "shareable_id" in query:
+            lookups.append(query["shareable_id"])
+        return await find_projected(collection, query, use_case)
+
+    monkeypatch.setattr(server, "find_projected", tracking_find_projected)
+    return lookups
+
+
+def test_shareable_routes_share_one_cached_lookup(server, lookups):
+    with TestClient(server.app) as client:
+        session_id = client.post(
+            "/api/auth/register", json={"username": f"share{time.time_ns()}", "password": "pw"}
+        ).json()["session_id"]
+        wedding = client.get("/api/wedding", headers={"Authorization": f"Bearer {session_id}"}).json()
+        shareable_id = wedding["shareable_id"]
+        # As on a worker that didn't register the wedding
+        server.shareable_id_cache.clear()
+
+        assert client.get(f"/api/wedding/share/{shareable_id}").json()["id"] == wedding["id"]
+        assert client.get(f"/api/rsvp/shareable/{shareable_id}").status_code == 200
+        assert client.get(f"/api/guestbook/shareable/{shareable_id}").status_code == 200
+        assert lookups == [shareable_id]
+
+        # The wedding may be created later, so unknown ids are looked up every time
+        for _ in range(2):
+            assert client.get("/api/guestbook/shareable/nope").status_code == 404
+        assert lookups == [shareable_id, "nope", "nope"]
+
+
+def test_cache_evicts_the_least_recently_used(server, monkeypatch):
+    monkeypatch.setattr(server, "SHAREABLE_ID_CACHE_SIZE", 2)
+    server.shareable_id_cache.clear()
+    server.remember_shareable_id("a", "w1")
+    server.remember_shareable_id("b", "w2")
+    # A cache hit refreshes "a"
+    assert asyncio.run(server.resolve_shareable_id("a")) == "w1"
+    server.remember_shareable_id("c", "w3")
+    assert list(server.shareable_id_cache) == ["a", "c"]
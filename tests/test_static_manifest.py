@@ -0,0 +1,121 @@
+"""
+StaticManifest: cache headers for hashed bundles and Accept-Encoding
+negotiation over precompressed siblings, preload links for the entrypoints.
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("starlette")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from static_manifest import (  # noqa: E402
+    IMMUTABLE_CACHE_CONTROL,
+    PRECOMPRESS_TEMP_PREFIX,
+    REVALIDATE_CACHE_CONTROL,
+    StaticManifest,
+    accepted_encodings,
+    inject_script,
+    preload_link,
+)
+
+BUNDLE = "static/js/main.3f2a1b4c.js"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / BUNDLE).write_text("console.log('wedding');\n" * 500)
+    (tmp_path / "index.html").write_text("<!doctype html><div id=root></div>")
+    (tmp_path / "favicon.ico").write_bytes(b"\x00" * 2048)
+    manifest = StaticManifest(tmp_path)
+    manifest.scan()
+    return manifest
+
+
+def test_hashed_bundles_are_immutable(manifest):
+    assert manifest.get(BUNDLE).cache_control == IMMUTABLE_CACHE_CONTROL
+    assert manifest.get("index.html").cache_control == REVALIDATE_CACHE_CONTROL
+
+
+def test_siblings_are_variants_not_assets(manifest, tmp_path):
+    assert (tmp_path / (BUNDLE + ".gz")).exists()
+    assert BUNDLE + ".gz" not in manifest.assets
+    gz = next(variant for variant in manifest.get(BUNDLE).variants if variant.encoding == "gzip")
+    assert gzip.decompress(gz.path.read_bytes()) == (tmp_path / BUNDLE).read_bytes()
+    # Too small or not compressible: served as-is
+    assert manifest.get("index.html").variants == ()
+    assert manifest.get("favicon.ico").variants == ()
+
+
+def test_siblings_are_renamed_into_place(manifest, tmp_path):
+    # Leftovers of a worker killed mid-write are never served
+    (tmp_path / "static" / "js" / (PRECOMPRESS_TEMP_PREFIX + "abc123")).write_bytes(b"partial")
+    bundle = tmp_path / BUNDLE
+    bundle.write_text("console.log('rebuilt');\n" * 500)
+    manifest.scan()
+    assert sorted(manifest.assets) == sorted(["favicon.ico", "index.html", BUNDLE])
+    assert gzip.decompress((tmp_path / (BUNDLE + ".gz")).read_bytes()) == bundle.read_bytes()
+
+
+def test_negotiation_and_vary(manifest):
+    bundle = manifest.get(BUNDLE)
+    chosen = manifest.negotiate(bundle, "gzip, deflate")
+    assert chosen.encoding == "gzip"
+    response = manifest.response(chosen, compressible=True)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == chosen.stat.st_size
+
+    identity = manifest.negotiate(bundle, "gzip;q=0, identity")
+    assert identity is bundle
+    response = manifest.response(identity, compressible=True)
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_wildcard_does_not_override_a_refused_coding(manifest):
+    bundle = manifest.get(BUNDLE)
+    assert manifest.negotiate(bundle, "*").encoding is not None
+    assert manifest.negotiate(bundle, "br;q=0, gzip;q=0, *") is bundle
+    assert manifest.negotiate(bundle, "gzip;q=0, *;q=0.5").encoding != "gzip"
+    assert manifest.negotiate(bundle, "*;q=0") is bundle
+
+
+def test_accepted_encodings_honours_quality():
+    assert accepted_encodings("br;q=1.0, gzip;q=0.5, deflate;q=0") == {"br", "gzip"}
+    assert accepted_encodings("") == {""}
+
+
+def test_index_served_from_memory_with_inlined_script(manifest, tmp_path):
+    index = manifest.get("index.html")
+    assert index.body == (tmp_path / "index.html").read_bytes()
+    assert not manifest.index_changed()
+
+    script = b'<script id="wedding-bootstrap"></script>'
+    assert manifest.render_index(script).body == index.body + script
+    assert inject_script(b"<html><head></head><body></body></html>", script) == \
+        b"<html><head>" + script + b"</head><body></body></html>"
+
+
+def test_preload_links_follow_asset_manifest(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / BUNDLE).write_text("console.log('wedding');")
+    (tmp_path / "asset-manifest.json").write_text(json.dumps({
+        "files": {"main.js": "/" + BUNDLE},
+        # Entrypoints missing from the build are never preloaded
+        "entrypoints": [BUNDLE, "static/css/main.deadbeef.css"],
+    }))
+    manifest = StaticManifest(tmp_path)
+    manifest.scan()
+    assert manifest.critical_assets == ("/" + BUNDLE,)
+    assert manifest.preload_links(["https://images.example/hero?w=800"]) == [
+        f"</{BUNDLE}>; rel=preload; as=script",
+        "<https://images.example/hero?w=800>; rel=preload; as=image",
+    ]
+    assert preload_link("/static/media/font.0a1b2c3d.woff2").endswith("as=font; crossorigin")
+    assert preload_link("/robots.txt") is None
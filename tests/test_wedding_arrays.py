@@ -0,0 +1,66 @@
+"""
+Wedding arrays stored in their own collections (wedding_arrays.py), checked
+against embedded storage.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from embedded_store import EmbeddedDatabase  # noqa: E402
+from wedding_arrays import attach_arrays, migrate_wedding_arrays, save_arrays  # noqa: E402
+
+PHOTOS = [{"url": f"https://example.com/{i}.jpg", "caption": f"Photo {i}"} for i in range(4)]
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = EmbeddedDatabase(str(tmp_path / "arrays.db"))
+    yield database
+    database.close()
+
+
+def test_round_trip_keeps_order(database):
+    async def scenario():
+        await save_arrays(database, "w1", {"gallery_photos": PHOTOS, "registry_items": [{"name": "Toaster"}]})
+        return await attach_arrays(database, {"id": "w1"})
+
+    wedding = asyncio.run(scenario())
+    assert wedding["gallery_photos"] == PHOTOS
+    assert wedding["registry_items"] == [{"name": "Toaster"}]
+    assert wedding["rsvp_responses"] == []
+
+
+def test_save_writes_only_changed_positions(database):
+    async def scenario():
+        await save_arrays(database, "w1", {"gallery_photos": PHOTOS})
+        edited = [*PHOTOS[:2], {**PHOTOS[2], "caption": "Edited"}]
+        writes = await save_arrays(database, "w1", {"gallery_photos": edited})
+        return writes, edited, await attach_arrays(database, {"id": "w1"})
+
+    writes, edited, wedding = asyncio.run(scenario())
+    # One changed item plus one delete for the trimmed tail
+    assert writes == 2
+    assert wedding["gallery_photos"] == edited
+
+
+def test_migration_moves_inline_arrays_in_batches(database):
+    async def scenario():
+        await database.weddings.insert_many([
+            {"id": f"w{i}", "user_id": f"u{i}", "gallery_photos": PHOTOS, "registry_items": [], "rsvp_responses": [{"guest": "A"}]}
+            for i in range(5)
+        ])
+        migrated = await migrate_wedding_arrays(database, batch_size=2)
+        stored = await database.weddings.find_one({"id": "w3"}, {"_id": 0})
+        return migrated, stored, await attach_arrays(database, dict(stored))
+
+    migrated, stored, wedding = asyncio.run(scenario())
+    assert migrated == 5
+    assert stored == {"id": "w3", "user_id": "u3"}
+    assert wedding["gallery_photos"] == PHOTOS
+    assert wedding["rsvp_responses"] == [{"guest": "A"}]
@@ -0,0 +1,46 @@
+"""
+GET /api/wedding with header or cookie sessions: a private, revalidatable
+response that answers 304 while the wedding is unchanged.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def test_wedding_revalidates_with_its_etag(server):
+    with TestClient(server.app) as client:
+        session_id = client.post(
+            "/api/auth/register", json={"username": f"etag{time.time_ns()}", "password": "pw"}
+        ).json()["session_id"]
+        headers = {"Authorization": f"Bearer {session_id}"}
+
+        first = client.get("/api/wedding", headers=headers)
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+        assert first.headers["vary"] == "Authorization, Cookie"
+
+        unchanged = client.get("/api/wedding", headers={**headers, "If-None-Match": etag})
+        assert unchanged.status_code == 304 and unchanged.content == b""
+        assert unchanged.headers["etag"] == etag and unchanged.headers["vary"] == "Authorization, Cookie"
+        # The session cookie set at registration works the same way
+        assert client.get("/api/wedding", headers={"If-None-Match": etag}).status_code == 304
+
+        client.portal.call(server.database.weddings.update_one, {"user_id": {"$exists": True}}, {
+            "$set": {"couple_name_1": "Ada"}
+        })
+        edited = client.get("/api/wedding", headers={**headers, "If-None-Match": etag})
+        assert edited.status_code == 200 and edited.headers["etag"] != etag
+        assert edited.json()["couple_name_1"] == "Ada"
+
+
+def test_wedding_requires_a_session(server):
+    with TestClient(server.app) as client:
+        assert client.get("/api/wedding").status_code == 401
@@ -0,0 +1,62 @@
+"""
+WeddingIdFilter rejects Bloom negatives without a lookup, confirms positives
+with the exact check and keeps weddings added since the last rebuild.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from wedding_filter import WeddingIdFilter  # noqa: E402
+
+
+def test_negatives_never_reach_the_exact_check():
+    existing = {"w1", "w2"}
+    checked = []
+
+    async def exact_check(wedding_id):
+        checked.append(wedding_id)
+        return wedding_id in existing
+
+    async def scenario():
+        wedding_filter = WeddingIdFilter(exact_check, negative_ttl=60)
+        # Before the first rebuild everything is looked up
+        unbuilt = await wedding_filter.contains("w2")
+        wedding_filter.rebuild(["w1"])
+        found = [await wedding_filter.contains(wedding_id) for wedding_id in ("w1", "w2", "nope", "nope")]
+        # Created on this worker: known straight away
+        wedding_filter.add("w3")
+        existing.add("w3")
+        # ...and kept by a rebuild whose scan started before the insert
+        wedding_filter.rebuild(["w1"])
+        created = await wedding_filter.contains("w3")
+        # Created on another worker: known from the next rebuild on
+        wedding_filter.rebuild(existing)
+        return unbuilt, found, created, await wedding_filter.contains("w2"), wedding_filter.metrics()
+
+    unbuilt, found, created, after_rebuild, metrics = asyncio.run(scenario())
+    assert unbuilt is True
+    assert found == [True, False, False, False]
+    assert created is True and after_rebuild is True
+    assert checked == ["w2", "w1", "w3", "w2"]
+    assert metrics["rejected_bloom"] == 3 and metrics["accepted"] == 4
+
+
+def test_false_positives_are_rejected_and_remembered():
+    checked = []
+
+    async def exact_check(wedding_id):
+        checked.append(wedding_id)
+        return False
+
+    async def scenario():
+        wedding_filter = WeddingIdFilter(exact_check, negative_ttl=60)
+        wedding_filter.rebuild(["gone"])
+        return [await wedding_filter.contains("gone") for _ in range(2)], wedding_filter.metrics()
+
+    answers, metrics = asyncio.run(scenario())
+    assert answers == [False, False]
+    assert checked == ["gone"]
+    assert metrics["false_positives"] == 1 and metrics["rejected_cached"] == 1